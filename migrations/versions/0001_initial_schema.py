@@ -0,0 +1,66 @@
+"""Initial schema: vehicles, parking_spots, parking_sessions.
+
+Databases created by ``init_db`` before migrations existed already have these
+tables, so they are only created when missing.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.shared.custom_types import UTCDateTime
+
+revision = "0001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "vehicles" not in existing:
+        op.create_table(
+            "vehicles",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("license_plate", sa.String, unique=True),
+            sa.Column("color", sa.String, nullable=False),
+            sa.Column("brand", sa.String, nullable=False),
+            sa.Column("created_at", UTCDateTime),
+        )
+        op.create_index("ix_vehicles_id", "vehicles", ["id"])
+        op.create_index("ix_vehicles_license_plate", "vehicles", ["license_plate"], unique=True)
+
+    if "parking_spots" not in existing:
+        op.create_table(
+            "parking_spots",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("spot_number", sa.String),
+            sa.Column("is_occupied", sa.Boolean),
+            sa.Column("floor", sa.Integer),
+            sa.Column("spot_type", sa.String),
+        )
+        op.create_index("ix_parking_spots_id", "parking_spots", ["id"])
+        op.create_index("ix_parking_spots_spot_number", "parking_spots", ["spot_number"], unique=True)
+
+    if "parking_sessions" not in existing:
+        op.create_table(
+            "parking_sessions",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("vehicle_id", sa.Integer, sa.ForeignKey("vehicles.id")),
+            sa.Column("parking_spot_id", sa.Integer, sa.ForeignKey("parking_spots.id")),
+            sa.Column("entry_time", UTCDateTime, nullable=False),
+            sa.Column("exit_time", UTCDateTime, nullable=True),
+            sa.Column("amount_paid", sa.Float, nullable=True),
+            sa.Column("payment_status", sa.String),
+            sa.Column("hourly_rate", sa.Float),
+        )
+        op.create_index("ix_parking_sessions_id", "parking_sessions", ["id"])
+
+
+def downgrade():
+    op.drop_table("parking_sessions")
+    op.drop_table("parking_spots")
+    op.drop_table("vehicles")
@@ -0,0 +1,50 @@
+"""Composite and partial indexes for the parking_sessions hot queries.
+
+Revision ID: 0002_parking_sessions_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_parking_sessions_indexes"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_parking_sessions_vehicle_id", "parking_sessions", ["vehicle_id"], if_not_exists=True)
+    op.create_index(
+        "ix_parking_sessions_parking_spot_id", "parking_sessions", ["parking_spot_id"], if_not_exists=True
+    )
+    op.create_index("ix_parking_sessions_entry_time", "parking_sessions", ["entry_time"], if_not_exists=True)
+    op.create_index(
+        "ix_parking_sessions_status_exit_time",
+        "parking_sessions",
+        ["payment_status", "exit_time", "amount_paid"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_parking_sessions_active",
+        "parking_sessions",
+        ["vehicle_id", "entry_time", "exit_time"],
+        sqlite_where=sa.text("exit_time IS NULL"),
+        postgresql_where=sa.text("exit_time IS NULL"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_parking_spots_type_free",
+        "parking_spots",
+        ["spot_type", "is_occupied", "floor", "spot_number"],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_parking_spots_type_free", table_name="parking_spots")
+    op.drop_index("ix_parking_sessions_active", table_name="parking_sessions")
+    op.drop_index("ix_parking_sessions_status_exit_time", table_name="parking_sessions")
+    op.drop_index("ix_parking_sessions_entry_time", table_name="parking_sessions")
+    op.drop_index("ix_parking_sessions_parking_spot_id", table_name="parking_sessions")
+    op.drop_index("ix_parking_sessions_vehicle_id", table_name="parking_sessions")
@@ -0,0 +1,47 @@
+"""Daily rollup tables for revenue and usage reports, backfilled from parking_sessions.
+
+Revision ID: 0003_daily_stats
+Revises: 0002_parking_sessions_indexes
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import daily_stats_rebuild_statements
+
+revision = "0003_daily_stats"
+down_revision = "0002_parking_sessions_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "daily_stats" not in existing:
+        op.create_table(
+            "daily_stats",
+            sa.Column("date", sa.Date, primary_key=True),
+            sa.Column("floor", sa.Integer, primary_key=True),
+            sa.Column("spot_type", sa.String, primary_key=True),
+            sa.Column("entries", sa.Integer, nullable=False),
+            sa.Column("exits", sa.Integer, nullable=False),
+            sa.Column("revenue", sa.Float, nullable=False),
+            sa.Column("distinct_vehicles", sa.Integer, nullable=False),
+            sa.Column("total_duration_hours", sa.Float, nullable=False),
+        )
+    if "daily_vehicles" not in existing:
+        op.create_table(
+            "daily_vehicles",
+            sa.Column("date", sa.Date, primary_key=True),
+            sa.Column("vehicle_id", sa.Integer, sa.ForeignKey("vehicles.id"), primary_key=True),
+        )
+
+    connection = op.get_bind()
+    for statement in daily_stats_rebuild_statements():
+        connection.execute(statement)
+
+
+def downgrade():
+    op.drop_table("daily_vehicles")
+    op.drop_table("daily_stats")
@@ -0,0 +1,114 @@
+"""Canonical colors and brands, referenced from vehicles by indexed foreign keys.
+
+Revision ID: 0004_color_brand_dimensions
+Revises: 0003_daily_stats
+Create Date: 2026-10-17
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_color_brand_dimensions"
+down_revision = "0003_daily_stats"
+branch_labels = None
+depends_on = None
+
+# Frozen copy of src.domain.normalization as of this revision: the backfill must
+# write the same names whenever it is replayed, whatever the live mapping becomes.
+COLOR_SYNONYMS = {
+    "grey": "gray",
+}
+BRAND_SYNONYMS = {
+    "vw": "volkswagen",
+    "volkswagon": "volkswagen",
+    "chevy": "chevrolet",
+    "merc": "mercedes",
+    "mercedes-benz": "mercedes",
+    "mercedes benz": "mercedes",
+    "benz": "mercedes",
+    "alfa": "alfa romeo",
+    "land-rover": "land rover",
+}
+BRAND_DISPLAY = {
+    "bmw": "BMW",
+    "byd": "BYD",
+    "gmc": "GMC",
+    "mg": "MG",
+    "ds": "DS",
+}
+
+
+def _words(value: str) -> str:
+    return re.sub(r"\s+", " ", value.strip().lower())
+
+
+def canonical_color(color: str) -> str:
+    return " ".join(COLOR_SYNONYMS.get(word, word) for word in _words(color).split(" ")).title()
+
+
+def canonical_brand(brand: str) -> str:
+    name = _words(brand)
+    name = BRAND_SYNONYMS.get(name, name)
+    return BRAND_DISPLAY.get(name, name.title())
+
+
+DIMENSIONS = (
+    ("colors", "color", canonical_color),
+    ("brands", "brand", canonical_brand),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+    vehicle_columns = {column["name"] for column in inspector.get_columns("vehicles")}
+
+    for table, _, _ in DIMENSIONS:
+        if table not in existing:
+            op.create_table(
+                table,
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("name", sa.String, nullable=False, unique=True),
+            )
+
+    with op.batch_alter_table("vehicles") as batch:
+        for table, column, _ in DIMENSIONS:
+            if f"{column}_id" not in vehicle_columns:
+                batch.add_column(sa.Column(f"{column}_id", sa.Integer, nullable=True))
+                batch.create_foreign_key(f"fk_vehicles_{column}_id_{table}", table, [f"{column}_id"], ["id"])
+    for _, column, _ in DIMENSIONS:
+        op.create_index(f"ix_vehicles_{column}_id", "vehicles", [f"{column}_id"], if_not_exists=True)
+
+    # Backfill: one UPDATE per distinct spelling. The text itself is left as entered;
+    # only the reference carries the canonical name.
+    connection = op.get_bind()
+    for table, column, canonical in DIMENSIONS:
+        dimension = sa.table(table, sa.column("id"), sa.column("name"))
+        vehicles = sa.table("vehicles", sa.column(column), sa.column(f"{column}_id"))
+        spellings = connection.execute(
+            sa.select(vehicles.c[column]).where(vehicles.c[f"{column}_id"].is_(None)).distinct()
+        ).scalars().all()
+        ids = dict(connection.execute(sa.select(dimension.c.name, dimension.c.id)).all())
+        for spelling in spellings:
+            name = canonical(spelling)
+            if name not in ids:
+                ids[name] = connection.execute(
+                    sa.insert(dimension).values(name=name).returning(dimension.c.id)
+                ).scalar_one()
+            connection.execute(
+                sa.update(vehicles)
+                .where(vehicles.c[column] == spelling, vehicles.c[f"{column}_id"].is_(None))
+                .values({f"{column}_id": ids[name]})
+            )
+
+
+def downgrade():
+    for _, column, _ in DIMENSIONS:
+        op.drop_index(f"ix_vehicles_{column}_id", table_name="vehicles")
+    with op.batch_alter_table("vehicles") as batch:
+        for table, column, _ in DIMENSIONS:
+            batch.drop_constraint(f"fk_vehicles_{column}_id_{table}", type_="foreignkey")
+            batch.drop_column(f"{column}_id")
+    op.drop_table("brands")
+    op.drop_table("colors")
@@ -0,0 +1,53 @@
+"""Occupancy counters per floor and spot type, maintained by triggers on parking_spots.
+
+Revision ID: 0005_occupancy_counters
+Revises: 0004_color_brand_dimensions
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.infrastructure.persistence.models.models import OCCUPANCY_TRIGGERS
+from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import (
+    occupancy_counters_rebuild_statements,
+)
+
+revision = "0005_occupancy_counters"
+down_revision = "0004_color_brand_dimensions"
+branch_labels = None
+depends_on = None
+
+TRIGGER_NAMES = {
+    "sqlite": [
+        "trg_parking_spots_counters_insert",
+        "trg_parking_spots_counters_delete",
+        "trg_parking_spots_counters_occupancy",
+        "trg_parking_spots_counters_move",
+    ],
+    "postgresql": ["trg_parking_spots_counters ON parking_spots"],
+}
+
+
+def upgrade():
+    connection = op.get_bind()
+    if "occupancy_counters" not in sa.inspect(connection).get_table_names():
+        op.create_table(
+            "occupancy_counters",
+            sa.Column("floor", sa.Integer, primary_key=True),
+            sa.Column("spot_type", sa.String, primary_key=True),
+            sa.Column("total", sa.Integer, nullable=False),
+            sa.Column("occupied", sa.Integer, nullable=False),
+        )
+    for statement in OCCUPANCY_TRIGGERS.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+    for statement in occupancy_counters_rebuild_statements():
+        connection.execute(statement)
+
+
+def downgrade():
+    connection = op.get_bind()
+    for name in TRIGGER_NAMES.get(connection.dialect.name, []):
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("DROP FUNCTION IF EXISTS parking_spots_counters()")
+    op.drop_table("occupancy_counters")
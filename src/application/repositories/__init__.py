@@ -2,10 +2,12 @@ from .abstract_repositories import (
     AbstractVehicleRepository,
     AbstractParkingSpotRepository,
     AbstractParkingSessionRepository,
+    AbstractDailyStatsRepository,
 )
 
 __all__ = [
     "AbstractVehicleRepository",
     "AbstractParkingSpotRepository",
     "AbstractParkingSessionRepository",
+    "AbstractDailyStatsRepository",
 ]
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 from src.domain.entities import Vehicle, ParkingSpot, ParkingSession
 
@@ -9,10 +10,18 @@ class AbstractVehicleRepository(ABC):
     async def get_by_license_plate(self, license_plate: str) -> Optional[Vehicle]:
         pass
 
+    @abstractmethod
+    async def get_by_license_plates(self, license_plates: List[str]) -> Dict[str, Vehicle]:
+        pass
+
     @abstractmethod
     async def add(self, vehicle: Vehicle) -> Vehicle:
         pass
 
+    @abstractmethod
+    async def add_many(self, vehicles: List[Vehicle]) -> List[Vehicle]:
+        pass
+
     @abstractmethod
     async def count_by_color(self, color: str, active_only: bool = True) -> int:
         pass
@@ -21,6 +30,10 @@ class AbstractVehicleRepository(ABC):
     async def get_brand_distribution(self, active_only: bool = True) -> dict:
         pass
 
+    @abstractmethod
+    async def get_color_distribution(self, active_only: bool = True) -> dict:
+        pass
+
     @abstractmethod
     async def get_by_id(self, vehicle_id: int) -> Optional[Vehicle]:
         pass
@@ -31,6 +44,22 @@ class AbstractParkingSpotRepository(ABC):
     async def get_available_spot(self, spot_type: str) -> Optional[ParkingSpot]:
         pass
 
+    @abstractmethod
+    async def claim_spot(self, spot_type: str, spot_id: Optional[int] = None) -> Optional[ParkingSpot]:
+        pass
+
+    @abstractmethod
+    async def claim_spots(self, spot_type: str, count: int) -> List[ParkingSpot]:
+        pass
+
+    @abstractmethod
+    async def release_spot(self, spot_id: int) -> Optional[ParkingSpot]:
+        pass
+
+    @abstractmethod
+    async def release_spots(self, spot_ids: List[int]) -> List[ParkingSpot]:
+        pass
+
     @abstractmethod
     async def update(self, spot: ParkingSpot) -> ParkingSpot:
         pass
@@ -43,6 +72,11 @@ class AbstractParkingSpotRepository(ABC):
     async def get_by_id(self, spot_id: int) -> Optional[ParkingSpot]:
         pass
 
+    @abstractmethod
+    async def get_occupancy_counters(self) -> List[dict]:
+        """``floor``, ``spot_type``, ``total`` and ``occupied`` per group of spots."""
+        pass
+
     @abstractmethod
     async def get_total_spots_count(self) -> int:
         pass
@@ -69,22 +103,84 @@ class AbstractParkingSessionRepository(ABC):
     async def get_active_session_by_license_plate(self, license_plate: str) -> Optional[ParkingSession]:
         pass
 
+    @abstractmethod
+    async def get_active_license_plates(self, license_plates: List[str]) -> Set[str]:
+        pass
+
     @abstractmethod
     async def add(self, session: ParkingSession) -> ParkingSession:
         pass
 
+    @abstractmethod
+    async def add_many(self, sessions: List[ParkingSession]) -> List[ParkingSession]:
+        pass
+
     @abstractmethod
     async def update(self, session: ParkingSession) -> ParkingSession:
         pass
 
     @abstractmethod
-    async def get_active_sessions(self) -> List[ParkingSession]:
+    async def close_active_session(self, license_plate: str, exit_time: datetime) -> Optional[ParkingSession]:
+        pass
+
+    @abstractmethod
+    async def close_active_sessions(self, vehicle_ids: List[int], exit_time: datetime) -> List[ParkingSession]:
+        pass
+
+    @abstractmethod
+    async def get_active_sessions(self, columnar: bool = False) -> Union[List[ParkingSession], Dict[str, tuple]]:
+        pass
+
+    @abstractmethod
+    async def get_potential_revenue(self, at: datetime) -> float:
         pass
 
     @abstractmethod
     async def get_all_sessions(self) -> List[ParkingSession]:
         pass
 
+    @abstractmethod
+    async def get_sessions_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        license_plate: Optional[str] = None,
+        floor: Optional[int] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columnar: bool = False
+    ) -> dict:
+        pass
+
+    @abstractmethod
+    def stream_sessions(
+        self,
+        chunk_size: int = 1000,
+        license_plate: Optional[str] = None,
+        floor: Optional[int] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> AsyncIterator[List[ParkingSession]]:
+        pass
+
+    @abstractmethod
+    def stream_session_rows(
+        self,
+        chunk_size: int = 1000,
+        license_plate: Optional[str] = None,
+        floor: Optional[int] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> AsyncIterator[list]:
+        pass
+
+    @abstractmethod
+    async def get_monthly_fingerprints(self) -> Dict[str, Tuple]:
+        pass
+
     @abstractmethod
     async def get_revenue_last_hours(self, hours: int = 1) -> float:
         pass
@@ -106,13 +202,33 @@ class AbstractParkingSessionRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_hourly_occupancy(self) -> List[dict]:
+    async def get_duration_stats_by_color(self, color: str, percentiles: Sequence[float] = (0.5, 0.9)) -> dict:
+        """``count``, ``average_hours`` and one ``pN`` key per percentile (e.g. ``p50``, ``p90``)."""
+        pass
+
+    @abstractmethod
+    async def get_hourly_occupancy(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        bucket: timedelta = timedelta(hours=1)
+    ) -> List[dict]:
         pass
 
     @abstractmethod
     async def get_revenue_by_day(self, days: int = 7) -> List[dict]:
         pass
 
+    @abstractmethod
+    async def get_daily_report(self, days: int = 30) -> List[dict]:
+        """Per day: ``date``, ``entries``, paid ``exits``, ``revenue`` and ``distinct_vehicles`` paying."""
+        pass
+
+    @abstractmethod
+    async def get_monthly_report(self) -> List[dict]:
+        """Per month: ``month``, ``entries``, paid ``exits`` and ``revenue``."""
+        pass
+
     @abstractmethod
     async def get_parking_analytics(self) -> dict:
         pass
@@ -120,3 +236,49 @@ class AbstractParkingSessionRepository(ABC):
     @abstractmethod
     async def get_by_id(self, session_id: int) -> Optional[ParkingSession]:
         pass
+
+
+class AbstractDailyStatsRepository(ABC):
+    """Daily rollups of entries, exits and revenue, kept in step with every gate event."""
+
+    @abstractmethod
+    async def record_entries(self, entries: List[Tuple[ParkingSpot, datetime]]):
+        pass
+
+    @abstractmethod
+    async def record_exits(self, exits: List[Tuple[ParkingSession, ParkingSpot]]):
+        pass
+
+    @abstractmethod
+    async def rebuild(self) -> int:
+        pass
+
+    @abstractmethod
+    async def get_revenue_by_day(self, days: int = 7) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def get_revenue_by_month(self) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def get_monthly_parking_usage(self) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def get_daily_average_vehicles(self, days: int = 30) -> float:
+        pass
+
+    @abstractmethod
+    async def get_average_daily_spending(self, days: int = 30) -> float:
+        pass
+
+    @abstractmethod
+    async def get_daily_report(self, days: int = 30) -> List[dict]:
+        """Per day: ``date``, ``entries``, ``exits``, ``revenue`` and ``distinct_vehicles``."""
+        pass
+
+    @abstractmethod
+    async def get_monthly_report(self) -> List[dict]:
+        """Per month: ``month``, ``entries``, ``exits`` and ``revenue``."""
+        pass
@@ -1,6 +1,30 @@
-from typing import List, Dict
-
-from src.application.repositories import AbstractVehicleRepository, AbstractParkingSessionRepository, AbstractParkingSpotRepository
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, List, Dict, Optional, Sequence
+
+from src.application.repositories import (
+    AbstractVehicleRepository,
+    AbstractParkingSessionRepository,
+    AbstractParkingSpotRepository,
+    AbstractDailyStatsRepository,
+)
+from src.application.services.parking_service import summarize_occupancy
+from src.application.unit_of_work import AbstractUnitOfWork
+
+
+# Metrics answered by each scan of ``get_metrics``: requesting any of them runs the
+# scan once and answers all of them. Scans are independent of each other.
+METRIC_SCANS: Dict[str, frozenset] = {
+    "_scan_occupancy": frozenset({"parking_status", "floor_distribution"}),
+    "_scan_summary": frozenset({"parking_analytics", "current_vehicle_count"}),
+    "_scan_active_sessions": frozenset({"active_sessions"}),
+    "_scan_days": frozenset({"revenue_by_day", "daily_average_vehicles", "average_daily_spending"}),
+    "_scan_months": frozenset({"revenue_by_month", "monthly_parking_usage"}),
+    "_scan_brands": frozenset({"brand_distribution"}),
+    "_scan_colors": frozenset({"color_distribution"}),
+}
+
+METRICS = frozenset().union(*METRIC_SCANS.values())
 
 
 class AnalyticsService:
@@ -8,11 +32,32 @@ class AnalyticsService:
         self,
         vehicle_repo: AbstractVehicleRepository,
         parking_session_repo: AbstractParkingSessionRepository,
-        parking_spot_repo: AbstractParkingSpotRepository
+        parking_spot_repo: AbstractParkingSpotRepository,
+        daily_stats_repo: Optional[AbstractDailyStatsRepository] = None,
+        unit_of_work_factory: Optional[Callable[[], AbstractUnitOfWork]] = None
     ):
         self.vehicle_repo = vehicle_repo
         self.parking_session_repo = parking_session_repo
         self.parking_spot_repo = parking_spot_repo
+        self.daily_stats_repo = daily_stats_repo
+        # Day/month reports read the rollups when available, else group the sessions table
+        self._daily_reports = daily_stats_repo or parking_session_repo
+        # Lets get_metrics run its scans concurrently, one unit of work (connection) each
+        self.unit_of_work_factory = unit_of_work_factory
+
+    @classmethod
+    def from_unit_of_work(
+        cls,
+        uow: AbstractUnitOfWork,
+        unit_of_work_factory: Optional[Callable[[], AbstractUnitOfWork]] = None
+    ) -> "AnalyticsService":
+        return cls(
+            uow.vehicle_repo,
+            uow.parking_session_repo,
+            uow.parking_spot_repo,
+            daily_stats_repo=uow.daily_stats_repo,
+            unit_of_work_factory=unit_of_work_factory
+        )
 
     async def get_revenue_last_hours(self, hours: int = 1) -> float:
         return await self.parking_session_repo.get_revenue_last_hours(hours)
@@ -24,31 +69,113 @@ class AnalyticsService:
         return await self.parking_session_repo.get_current_vehicle_count()
 
     async def get_daily_average_vehicles(self, days: int = 30) -> float:
-        return await self.parking_session_repo.get_daily_average_vehicles(days)
+        return await self._daily_reports.get_daily_average_vehicles(days)
 
     async def get_average_daily_spending(self, days: int = 30) -> float:
-        return await self.parking_session_repo.get_average_daily_spending(days)
+        return await self._daily_reports.get_average_daily_spending(days)
 
     async def get_average_duration_by_color(self, color: str) -> float:
         return await self.parking_session_repo.get_average_duration_by_color(color)
 
-    async def get_hourly_occupancy(self) -> List[Dict]:
-        return await self.parking_session_repo.get_hourly_occupancy()
+    async def get_duration_stats_by_color(self, color: str, percentiles: Sequence[float] = (0.5, 0.9)) -> Dict:
+        return await self.parking_session_repo.get_duration_stats_by_color(color, tuple(percentiles))
+
+    async def get_hourly_occupancy(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        bucket: timedelta = timedelta(hours=1)
+    ) -> List[Dict]:
+        return await self.parking_session_repo.get_hourly_occupancy(start, end, bucket)
 
     async def get_revenue_by_day(self, days: int = 7) -> List[Dict]:
-        return await self.parking_session_repo.get_revenue_by_day(days)
+        return await self._daily_reports.get_revenue_by_day(days)
 
     async def get_monthly_parking_usage(self) -> List[Dict]:
-        return await self.parking_session_repo.get_monthly_parking_usage()
+        return await self._daily_reports.get_monthly_parking_usage()
 
     async def get_revenue_by_month(self) -> List[Dict]:
-        return await self.parking_session_repo.get_revenue_by_month()
+        return await self._daily_reports.get_revenue_by_month()
 
     async def get_brand_distribution(self, active_only: bool = True) -> Dict[str, int]:
         return await self.vehicle_repo.get_brand_distribution(active_only)
 
+    async def get_color_distribution(self, active_only: bool = True) -> Dict[str, int]:
+        return await self.vehicle_repo.get_color_distribution(active_only)
+
     async def get_floor_distribution(self, active_only: bool = True) -> Dict[int, int]:
         return await self.parking_spot_repo.get_floor_distribution(active_only)
 
     async def get_parking_analytics(self) -> Dict:
-        return await self.parking_session_repo.get_parking_analytics()
\ No newline at end of file
+        return await self.parking_session_repo.get_parking_analytics()
+
+    async def get_metrics(self, requested: Iterable[str], window: int = 30) -> Dict[str, Any]:
+        """Several metrics at once, keyed by name (see ``METRICS``).
+
+        Requested metrics are grouped into the scans of ``METRIC_SCANS``, so metrics
+        read from the same rows cost one query. With a ``unit_of_work_factory`` the
+        scans run concurrently, each in its own unit of work; otherwise they run one
+        after the other on this service's session. ``window`` is the number of days
+        covered by the day-based metrics.
+        """
+        requested = set(requested)
+        unknown = requested - METRICS
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+
+        scans = [scan for scan, metrics in METRIC_SCANS.items() if metrics & requested]
+        if self.unit_of_work_factory is None:
+            results = [await getattr(self, scan)(window) for scan in scans]
+        else:
+            results = await asyncio.gather(*(self._run_scan_in_unit_of_work(scan, window) for scan in scans))
+
+        metrics: Dict[str, Any] = {}
+        for result in results:
+            metrics.update(result)
+        return {metric: metrics[metric] for metric in requested}
+
+    async def _run_scan_in_unit_of_work(self, scan: str, window: int) -> Dict[str, Any]:
+        async with self.unit_of_work_factory() as uow:
+            return await getattr(AnalyticsService.from_unit_of_work(uow), scan)(window)
+
+    async def _scan_occupancy(self, window: int) -> Dict[str, Any]:
+        counters = await self.parking_spot_repo.get_occupancy_counters()
+        floors: Dict[int, int] = {}
+        for counter in counters:
+            if counter["occupied"]:
+                floors[counter["floor"]] = floors.get(counter["floor"], 0) + counter["occupied"]
+        return {"parking_status": summarize_occupancy(counters), "floor_distribution": floors}
+
+    async def _scan_summary(self, window: int) -> Dict[str, Any]:
+        analytics = await self.parking_session_repo.get_parking_analytics()
+        return {"parking_analytics": analytics, "current_vehicle_count": analytics["current_occupancy"]}
+
+    async def _scan_active_sessions(self, window: int) -> Dict[str, Any]:
+        return {"active_sessions": await self.parking_session_repo.get_active_sessions()}
+
+    async def _scan_days(self, window: int) -> Dict[str, Any]:
+        days = await self._daily_reports.get_daily_report(window)
+        entries = [day["entries"] for day in days if day["entries"]]
+        vehicles = sum(day["distinct_vehicles"] for day in days)
+        return {
+            "revenue_by_day": [{"date": day["date"], "revenue": day["revenue"]} for day in days if day["exits"]],
+            "daily_average_vehicles": sum(entries) / len(entries) if entries else 0.0,
+            "average_daily_spending": sum(day["revenue"] for day in days) / vehicles if vehicles else 0.0,
+        }
+
+    async def _scan_months(self, window: int) -> Dict[str, Any]:
+        months = await self._daily_reports.get_monthly_report()
+        return {
+            "revenue_by_month": [
+                {"month": month["month"], "total_revenue": month["revenue"]} for month in months if month["exits"]
+            ],
+            "monthly_parking_usage": [
+                {"month": month["month"], "session_count": month["entries"]} for month in months if month["entries"]
+            ],
+        }
+
+    async def _scan_brands(self, window: int) -> Dict[str, Any]:
+        return {"brand_distribution": await self.vehicle_repo.get_brand_distribution()}
+
+    async def _scan_colors(self, window: int) -> Dict[str, Any]:
+        return {"color_distribution": await self.vehicle_repo.get_color_distribution()}
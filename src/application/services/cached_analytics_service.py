@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from src.application.services.analytics_service import AnalyticsService
+from src.shared.cache import MISSING, TTLCache
+
+
+# Seconds each metric may be served from the cache. Live counters are short; monthly
+# reports barely move and are also dropped on every entry/exit anyway.
+METRIC_TTLS: Dict[str, float] = {
+    "get_current_vehicle_count": 5.0,
+    "get_parking_analytics": 5.0,
+    "get_floor_distribution": 5.0,
+    "get_brand_distribution": 10.0,
+    "get_color_distribution": 10.0,
+    "count_vehicles_by_color": 10.0,
+    "get_revenue_last_hours": 30.0,
+    "get_hourly_occupancy": 30.0,
+    "get_average_duration_by_color": 60.0,
+    "get_duration_stats_by_color": 60.0,
+    "get_revenue_by_day": 300.0,
+    "get_daily_average_vehicles": 300.0,
+    "get_average_daily_spending": 300.0,
+    "get_monthly_parking_usage": 300.0,
+    "get_revenue_by_month": 300.0,
+}
+
+# Metrics a gate event can change
+INVALIDATED_BY: Dict[str, frozenset] = {
+    "entry": frozenset({
+        "get_current_vehicle_count",
+        "get_parking_analytics",
+        "get_floor_distribution",
+        "get_brand_distribution",
+        "get_color_distribution",
+        "count_vehicles_by_color",
+        "get_hourly_occupancy",
+        "get_daily_average_vehicles",
+        "get_monthly_parking_usage",
+    }),
+    "exit": frozenset(METRIC_TTLS),
+}
+
+# Cache key of each ``get_metrics`` name, given the window: the key of the equivalent
+# single-metric call, so both share entries. Live lists (status, active sessions)
+# are not cached.
+METRIC_KEYS: Dict[str, Callable[[int], tuple]] = {
+    "current_vehicle_count": lambda window: ("get_current_vehicle_count",),
+    "parking_analytics": lambda window: ("get_parking_analytics",),
+    "floor_distribution": lambda window: ("get_floor_distribution", True),
+    "brand_distribution": lambda window: ("get_brand_distribution", True),
+    "color_distribution": lambda window: ("get_color_distribution", True),
+    "revenue_by_day": lambda window: ("get_revenue_by_day", window),
+    "daily_average_vehicles": lambda window: ("get_daily_average_vehicles", window),
+    "average_daily_spending": lambda window: ("get_average_daily_spending", window),
+    "monthly_parking_usage": lambda window: ("get_monthly_parking_usage",),
+    "revenue_by_month": lambda window: ("get_revenue_by_month",),
+}
+
+
+class CachedAnalyticsService:
+    """Read-through cache in front of ``AnalyticsService``.
+
+    Results are keyed by metric and arguments and kept in a shared ``TTLCache``, so
+    every dashboard and assistant session of the process reuses them. Entries expire
+    after the metric's TTL, or earlier when ``ParkingService`` reports an entry or exit
+    through ``invalidation_listener``. Cached values are shared: treat them as read-only.
+    """
+
+    def __init__(self, analytics_service: AnalyticsService, cache: TTLCache, ttls: Optional[Dict[str, float]] = None):
+        self.analytics_service = analytics_service
+        self.cache = cache
+        self.ttls = {**METRIC_TTLS, **(ttls or {})}
+
+    @staticmethod
+    def invalidation_listener(cache: TTLCache) -> Callable[[str], None]:
+        """Build a ``ParkingService`` listener dropping the metrics an event changes."""
+        def on_parking_event(event: str):
+            metrics = INVALIDATED_BY.get(event, frozenset())
+            cache.invalidate(lambda key: key[0] in metrics)
+        return on_parking_event
+
+    def stats(self) -> Dict[str, float]:
+        return self.cache.stats()
+
+    async def _cached(self, metric: str, *args):
+        key = (metric, *args)
+        value = self.cache.get(key)
+        if value is MISSING:
+            # An entry/exit while computing makes the result stale: return it, don't keep it
+            generation = self.cache.generation
+            value = await getattr(self.analytics_service, metric)(*args)
+            self.cache.set(key, value, ttl=self.ttls.get(metric), generation=generation)
+        return value
+
+    async def get_revenue_last_hours(self, hours: int = 1) -> float:
+        return await self._cached("get_revenue_last_hours", hours)
+
+    async def count_vehicles_by_color(self, color: str, active_only: bool = True) -> int:
+        return await self._cached("count_vehicles_by_color", color, active_only)
+
+    async def get_current_vehicle_count(self) -> int:
+        return await self._cached("get_current_vehicle_count")
+
+    async def get_daily_average_vehicles(self, days: int = 30) -> float:
+        return await self._cached("get_daily_average_vehicles", days)
+
+    async def get_average_daily_spending(self, days: int = 30) -> float:
+        return await self._cached("get_average_daily_spending", days)
+
+    async def get_average_duration_by_color(self, color: str) -> float:
+        return await self._cached("get_average_duration_by_color", color)
+
+    async def get_duration_stats_by_color(self, color: str, percentiles: Sequence[float] = (0.5, 0.9)) -> Dict:
+        return await self._cached("get_duration_stats_by_color", color, tuple(percentiles))
+
+    async def get_hourly_occupancy(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        bucket: timedelta = timedelta(hours=1)
+    ) -> List[Dict]:
+        return await self._cached("get_hourly_occupancy", start, end, bucket)
+
+    async def get_revenue_by_day(self, days: int = 7) -> List[Dict]:
+        return await self._cached("get_revenue_by_day", days)
+
+    async def get_monthly_parking_usage(self) -> List[Dict]:
+        return await self._cached("get_monthly_parking_usage")
+
+    async def get_revenue_by_month(self) -> List[Dict]:
+        return await self._cached("get_revenue_by_month")
+
+    async def get_brand_distribution(self, active_only: bool = True) -> Dict[str, int]:
+        return await self._cached("get_brand_distribution", active_only)
+
+    async def get_color_distribution(self, active_only: bool = True) -> Dict[str, int]:
+        return await self._cached("get_color_distribution", active_only)
+
+    async def get_floor_distribution(self, active_only: bool = True) -> Dict[int, int]:
+        return await self._cached("get_floor_distribution", active_only)
+
+    async def get_parking_analytics(self) -> Dict:
+        return await self._cached("get_parking_analytics")
+
+    async def get_metrics(self, requested: Iterable[str], window: int = 30) -> Dict[str, Any]:
+        """``AnalyticsService.get_metrics``, only planning the metrics not in the cache."""
+        metrics: Dict[str, Any] = {}
+        missing = set()
+        for metric in set(requested):
+            key = METRIC_KEYS[metric](window) if metric in METRIC_KEYS else None
+            value = self.cache.get(key) if key else MISSING
+            if value is MISSING:
+                missing.add(metric)
+            else:
+                metrics[metric] = value
+        if missing:
+            generation = self.cache.generation
+            fetched = await self.analytics_service.get_metrics(missing, window)
+            for metric, value in fetched.items():
+                if metric in METRIC_KEYS:
+                    key = METRIC_KEYS[metric](window)
+                    self.cache.set(key, value, ttl=self.ttls.get(key[0]), generation=generation)
+            metrics.update(fetched)
+        return metrics
@@ -1,59 +1,179 @@
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict, Tuple, Union
 from loguru import logger
 
-from src.application.repositories import AbstractVehicleRepository, AbstractParkingSpotRepository, AbstractParkingSessionRepository
-from src.domain.common import SpotType, PaymentStatus
-from src.domain.entities import Vehicle, ParkingSession
+from src.application.repositories import (
+    AbstractVehicleRepository,
+    AbstractParkingSpotRepository,
+    AbstractParkingSessionRepository,
+    AbstractDailyStatsRepository,
+)
+from src.application.services.spot_allocator import FreeSpotIndex
+from src.application.unit_of_work import AbstractUnitOfWork
+from src.domain.common import SpotType
+from src.domain.entities import Vehicle, ParkingSpot, ParkingSession
+
+
+def summarize_occupancy(counters: List[Dict]) -> Dict:
+    """Parking status (totals, rate and per-floor breakdown) from the occupancy counters."""
+    total_spots = sum(counter["total"] for counter in counters)
+    occupied_spots = sum(counter["occupied"] for counter in counters)
+    
+    # Floor breakdown
+    floor_stats = {}
+    for counter in counters:
+        stats = floor_stats.setdefault(counter["floor"], {"total": 0, "occupied": 0})
+        stats["total"] += counter["total"]
+        stats["occupied"] += counter["occupied"]
+    
+    floors = []
+    for floor_num in sorted(floor_stats.keys()):
+        stats = floor_stats[floor_num]
+        floors.append({
+            "floor": floor_num,
+            "total": stats["total"],
+            "occupied": stats["occupied"],
+            "available": stats["total"] - stats["occupied"]
+        })
+    
+    available_spots = total_spots - occupied_spots
+    occupancy_rate = (occupied_spots / total_spots * 100) if total_spots > 0 else 0
+    
+    return {
+        "total_spots": total_spots,
+        "occupied_spots": occupied_spots,
+        "available_spots": available_spots,
+        "occupancy_rate": round(occupancy_rate, 2),
+        "floors": floors
+    }
 
 
 class ParkingService:
+    # Stale index candidates in one claim before the index is rebuilt from the table:
+    # one can be a race with another gate, several mean the index has drifted (writes
+    # from another process or worker it never saw)
+    STALE_CLAIMS_BEFORE_RECONCILE = 2
+
     def __init__(
         self,
         vehicle_repo: AbstractVehicleRepository,
         parking_spot_repo: AbstractParkingSpotRepository,
-        parking_session_repo: AbstractParkingSessionRepository
+        parking_session_repo: AbstractParkingSessionRepository,
+        unit_of_work: AbstractUnitOfWork,
+        spot_index: Optional[FreeSpotIndex] = None,
+        daily_stats_repo: Optional[AbstractDailyStatsRepository] = None,
+        listeners: Optional[List[Callable[[str], None]]] = None
     ):
         self.vehicle_repo = vehicle_repo
         self.parking_spot_repo = parking_spot_repo
         self.parking_session_repo = parking_session_repo
+        # Commits once per gate event and rolls back a failed one; the repositories only flush
+        self.unit_of_work = unit_of_work
+        # Optional process-wide free-spot index; without it spots are found with a query
+        self.spot_index = spot_index
+        # Daily rollups updated in the same transaction as each gate event
+        self.daily_stats_repo = daily_stats_repo
+        # Called with "entry" or "exit" once a gate event is committed (e.g. cache invalidation)
+        self.listeners = list(listeners or [])
+
+    @classmethod
+    def from_unit_of_work(
+        cls,
+        uow: AbstractUnitOfWork,
+        spot_index: Optional[FreeSpotIndex] = None,
+        listeners: Optional[List[Callable[[str], None]]] = None
+    ) -> "ParkingService":
+        return cls(
+            uow.vehicle_repo,
+            uow.parking_spot_repo,
+            uow.parking_session_repo,
+            spot_index=spot_index,
+            unit_of_work=uow,
+            daily_stats_repo=uow.daily_stats_repo,
+            listeners=listeners
+        )
+
+    async def _commit(self):
+        await self.unit_of_work.commit()
+
+    async def _rollback(self):
+        await self.unit_of_work.rollback()
+
+    def _notify(self, event: str):
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception:
+                # The gate event is already committed; a failing listener must not undo it
+                logger.exception(f"Parking event listener failed for {event}")
+
+    async def _claim_spot(self, spot_type: SpotType) -> Optional[ParkingSpot]:
+        if self.spot_index is not None:
+            # Try the index's candidates first; a failed claim means the index was stale
+            stale, reconciled = 0, False
+            candidate = self.spot_index.acquire(spot_type)
+            while candidate is not None:
+                spot = await self.parking_spot_repo.claim_spot(spot_type, spot_id=candidate.id)
+                if spot:
+                    return spot
+                stale += 1
+                if stale >= self.STALE_CLAIMS_BEFORE_RECONCILE and not reconciled:
+                    drift = await self.spot_index.reconcile(self.parking_spot_repo)
+                    reconciled = True
+                    logger.warning(f"Free-spot index had drifted from parking_spots, rebuilt it: {drift}")
+                candidate = self.spot_index.acquire(spot_type)
+        return await self.parking_spot_repo.claim_spot(spot_type)
 
     async def register_vehicle_entry(self, license_plate: str, color: str, brand: str, spot_type: SpotType) -> Dict:
+        # Same normalization as register_vehicle_entries_bulk, so exits find the plate
+        license_plate = license_plate.upper().strip()
+
         # Check if vehicle already in parking
         existing_session = await self.parking_session_repo.get_active_session_by_license_plate(license_plate)
         if existing_session:
             raise ValueError(f"Vehicle {license_plate} is already in the parking")
 
-        # Find or create vehicle
-        vehicle = await self.vehicle_repo.get_by_license_plate(license_plate)
-        
-        if not vehicle:
-            vehicle = Vehicle(
-                license_plate=license_plate,
-                color=color,
-                brand=brand
+        available_spot = None
+        try:
+            # Claim a parking spot atomically; no separate SELECT and UPDATE
+            available_spot = await self._claim_spot(spot_type)
+            if not available_spot:
+                raise ValueError(f"No available {spot_type} spots")
+
+            # Find or create vehicle
+            vehicle = await self.vehicle_repo.get_by_license_plate(license_plate)
+            
+            if not vehicle:
+                vehicle = Vehicle(
+                    license_plate=license_plate,
+                    color=color,
+                    brand=brand
+                )
+                vehicle = await self.vehicle_repo.add(vehicle)
+
+            # Create parking session
+            session = ParkingSession(
+                vehicle_id=vehicle.id,
+                parking_spot_id=available_spot.id,
+                entry_time=datetime.now(timezone.utc),
+                hourly_rate=5.0 # Assuming a default hourly rate for now, this should come from somewhere else
             )
-            vehicle = await self.vehicle_repo.add(vehicle)
+            session = await self.parking_session_repo.add(session)
+            if self.daily_stats_repo is not None:
+                await self.daily_stats_repo.record_entries([(available_spot, session.entry_time)])
 
-        # Find available parking spot
-        available_spot = await self.parking_spot_repo.get_available_spot(spot_type)
-        
-        if not available_spot:
-            raise ValueError(f"No available {spot_type} spots")
-
-        # Create parking session
-        session = ParkingSession(
-            vehicle_id=vehicle.id,
-            parking_spot_id=available_spot.id,
-            entry_time=datetime.now(timezone.utc),
-            hourly_rate=5.0 # Assuming a default hourly rate for now, this should come from somewhere else
-        )
-        session = await self.parking_session_repo.add(session)
-        
-        # Mark spot as occupied
-        available_spot.is_occupied = True
-        await self.parking_spot_repo.update(available_spot)
+            # Vehicle, session and spot are written in a single transaction
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            # Give the spot back to the index so it is not leaked
+            if available_spot is not None and self.spot_index is not None:
+                available_spot.is_occupied = False
+                self.spot_index.release(available_spot)
+            raise
         
+        self._notify("entry")
         logger.info(f"Vehicle {license_plate} entered at spot {available_spot.spot_number}")
         return {
             "id": session.id,
@@ -68,89 +188,251 @@ class ParkingService:
         }
 
     async def register_vehicle_exit(self, license_plate: str) -> Dict:
-        # Find active session
-        session = await self.parking_session_repo.get_active_session_by_license_plate(license_plate)
-        
-        if not session:
-            raise ValueError(f"No active session for vehicle {license_plate}")
+        exit_time = datetime.now(timezone.utc)
+        # Same normalization as register_vehicle_exits_bulk
+        license_plate = license_plate.upper().strip()
+        try:
+            # Close the active session; the fee is computed by the same UPDATE
+            session = await self.parking_session_repo.close_active_session(license_plate, exit_time)
+            
+            if not session:
+                raise ValueError(f"No active session for vehicle {license_plate}")
+
+            # Free up parking spot
+            spot = await self.parking_spot_repo.release_spot(session.parking_spot_id)
+            if spot and self.daily_stats_repo is not None:
+                await self.daily_stats_repo.record_exits([(session, spot)])
+
+            # The plate as registered; served from the identity cache for returning vehicles
+            vehicle = await self.vehicle_repo.get_by_id(session.vehicle_id)
+
+            # Session and spot are written in a single transaction
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+
+        # Only hand the spot out again once the exit is durable
+        if spot and self.spot_index is not None:
+            self.spot_index.release(spot)
+        self._notify("exit")
 
-        # Calculate payment
-        session.exit_time = datetime.now(timezone.utc)
         # Ensure both datetimes are timezone-aware before subtraction
         entry_time_aware = session.entry_time.replace(tzinfo=timezone.utc) if session.entry_time.tzinfo is None else session.entry_time
-        exit_time_aware = session.exit_time.replace(tzinfo=timezone.utc) if session.exit_time.tzinfo is None else session.exit_time
-        duration_hours = (exit_time_aware - entry_time_aware).total_seconds() / 3600
+        duration_hours = (exit_time - entry_time_aware).total_seconds() / 3600
         
         # Minimum charge for 1 hour
         duration_hours = max(1.0, duration_hours)
-        session.amount_paid = round(duration_hours * session.hourly_rate, 2)
-        session.payment_status = PaymentStatus.PAID
-
-        # Free up parking spot
-        spot = await self.parking_spot_repo.get_by_id(session.parking_spot_id)
-        if spot: # Ensure spot exists before updating
-            spot.is_occupied = False
-            await self.parking_spot_repo.update(spot)
-        
-        session = await self.parking_session_repo.update(session)
         
         logger.info(f"Vehicle {license_plate} exited. Amount: ${session.amount_paid}")
         
-        # Fetch the vehicle to get its license plate
-        vehicle = await self.vehicle_repo.get_by_id(session.vehicle_id)
-        
         return {
             "license_plate": vehicle.license_plate if vehicle else license_plate,
             "duration_hours": duration_hours,
             "amount_due": session.amount_paid
         }
 
-    async def get_parking_status(self) -> Dict:
-        all_spots = await self.parking_spot_repo.get_all()
-        total_spots = len(all_spots)
-        
-        occupied_spots_list = [spot for spot in all_spots if spot.is_occupied]
-        occupied_spots = len(occupied_spots_list)
-        
-        # Floor breakdown
-        floor_stats = {}
-        for spot in all_spots:
-            if spot.floor not in floor_stats:
-                floor_stats[spot.floor] = {"total": 0, "occupied": 0}
-            floor_stats[spot.floor]["total"] += 1
-            if spot.is_occupied:
-                floor_stats[spot.floor]["occupied"] += 1
-        
-        floors = []
-        for floor_num in sorted(floor_stats.keys()):
-            stats = floor_stats[floor_num]
-            floors.append({
-                "floor": floor_num,
-                "total": stats["total"],
-                "occupied": stats["occupied"],
-                "available": stats["total"] - stats["occupied"]
+    @staticmethod
+    def _parse_entry_event(event: Dict) -> Tuple[str, SpotType]:
+        """Normalized plate and spot type of a buffered entry event; ValueError if malformed."""
+        if not isinstance(event, dict):
+            raise ValueError(f"Entry event must be a dict, got {type(event).__name__}")
+        missing = [
+            field for field in ("license_plate", "color", "brand")
+            if not isinstance(event.get(field), str) or not event[field].strip()
+        ]
+        if missing:
+            raise ValueError(f"Entry event is missing {', '.join(missing)}")
+        try:
+            spot_type = SpotType(event.get("spot_type") or SpotType.REGULAR)
+        except ValueError:
+            raise ValueError(f"Unknown spot type {event['spot_type']!r}") from None
+        return event["license_plate"].upper().strip(), spot_type
+
+    async def register_vehicle_entries_bulk(self, events: List[Dict]) -> List[Dict]:
+        """Registers a batch of buffered entry events in one transaction.
+
+        Each event is a dict with ``license_plate``, ``color``, ``brand`` and optionally
+        ``spot_type``. Malformed events are reported without touching the database, so
+        they never roll back the rest of the batch. Vehicles are resolved with one ``IN``
+        query, spots are claimed with one statement per spot type and sessions are
+        inserted with one multi-row INSERT.
+
+        Returns:
+            One result per event, in order: the same payload as ``register_vehicle_entry``
+            plus ``license_plate`` and ``status="ok"``, or ``status="error"`` and ``error``.
+        """
+        results: List[Optional[Dict]] = [None] * len(events)
+        plates: List[Optional[str]] = [None] * len(events)
+        spot_types: Dict[int, SpotType] = {}
+        for i, event in enumerate(events):
+            try:
+                plates[i], spot_types[i] = self._parse_entry_event(event)
+            except ValueError as error:
+                plate = event.get("license_plate") if isinstance(event, dict) else None
+                results[i] = {"license_plate": plate, "status": "error", "error": str(error)}
+        entry_time = datetime.now(timezone.utc)
+        claimed: List[ParkingSpot] = []
+
+        try:
+            active_plates = await self.parking_session_repo.get_active_license_plates(
+                [plates[i] for i in spot_types]
+            )
+
+            # Reject plates already parked or repeated within the batch
+            accepted_by_type: Dict[SpotType, List[int]] = defaultdict(list)
+            seen = set()
+            for i, spot_type in spot_types.items():
+                plate = plates[i]
+                if plate in active_plates or plate in seen:
+                    results[i] = {"license_plate": plate, "status": "error", "error": f"Vehicle {plate} is already in the parking"}
+                    continue
+                seen.add(plate)
+                accepted_by_type[spot_type].append(i)
+
+            # Allocate spots in one pass per spot type
+            spot_for: Dict[int, ParkingSpot] = {}
+            for spot_type, indices in accepted_by_type.items():
+                spots = await self.parking_spot_repo.claim_spots(spot_type, len(indices))
+                claimed.extend(spots)
+                spot_for.update(zip(indices, spots))
+                for i in indices[len(spots):]:
+                    results[i] = {"license_plate": plates[i], "status": "error", "error": f"No available {spot_type} spots"}
+
+            # Find or create vehicles
+            entering = sorted(spot_for)
+            vehicles = await self.vehicle_repo.get_by_license_plates([plates[i] for i in entering])
+            new_vehicles = [
+                Vehicle(
+                    license_plate=plates[i], color=events[i]["color"], brand=events[i]["brand"]
+                )
+                for i in entering if plates[i] not in vehicles
+            ]
+            for vehicle in await self.vehicle_repo.add_many(new_vehicles):
+                vehicles[vehicle.license_plate] = vehicle
+
+            sessions = await self.parking_session_repo.add_many([
+                ParkingSession(
+                    vehicle_id=vehicles[plates[i]].id,
+                    parking_spot_id=spot_for[i].id,
+                    entry_time=entry_time,
+                    hourly_rate=5.0 # Assuming a default hourly rate for now, this should come from somewhere else
+                ) for i in entering
+            ])
+            if self.daily_stats_repo is not None:
+                await self.daily_stats_repo.record_entries([(spot_for[i], entry_time) for i in entering])
+
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+
+        if self.spot_index is not None:
+            for spot in claimed:
+                self.spot_index.discard(spot.id)
+        if sessions:
+            self._notify("entry")
+
+        for i, session in zip(entering, sessions):
+            spot = spot_for[i]
+            results[i] = {
+                "license_plate": plates[i],
+                "status": "ok",
+                "id": session.id,
+                "vehicle_id": session.vehicle_id,
+                "parking_spot_id": session.parking_spot_id,
+                "entry_time": session.entry_time,
+                "hourly_rate": session.hourly_rate,
+                "parking_spot": {
+                    "spot_number": spot.spot_number,
+                    "floor": spot.floor,
+                }
+            }
+        logger.info(f"Bulk entry: {len(sessions)}/{len(events)} vehicles entered")
+        return results
+
+    async def register_vehicle_exits_bulk(self, license_plates: List[str]) -> List[Dict]:
+        """Registers a batch of buffered exit events in one transaction.
+
+        Returns:
+            One result per plate, in order: the same payload as ``register_vehicle_exit``
+            plus ``status="ok"``, or ``status="error"`` and ``error``.
+        """
+        exit_time = datetime.now(timezone.utc)
+        license_plates = [plate.upper().strip() for plate in license_plates]
+        try:
+            vehicles = await self.vehicle_repo.get_by_license_plates(license_plates)
+            sessions = await self.parking_session_repo.close_active_sessions(
+                [vehicle.id for vehicle in vehicles.values()], exit_time
+            )
+            spots = await self.parking_spot_repo.release_spots([session.parking_spot_id for session in sessions])
+            if self.daily_stats_repo is not None:
+                spot_by_id = {spot.id: spot for spot in spots}
+                await self.daily_stats_repo.record_exits([
+                    (session, spot_by_id[session.parking_spot_id])
+                    for session in sessions if session.parking_spot_id in spot_by_id
+                ])
+            await self._commit()
+        except Exception:
+            await self._rollback()
+            raise
+
+        if self.spot_index is not None:
+            for spot in spots:
+                self.spot_index.release(spot)
+        if sessions:
+            self._notify("exit")
+
+        plate_by_vehicle_id = {vehicle.id: plate for plate, vehicle in vehicles.items()}
+        closed = {plate_by_vehicle_id[session.vehicle_id]: session for session in sessions}
+        results = []
+        for plate in license_plates:
+            session = closed.pop(plate, None)
+            if session is None:
+                results.append({"license_plate": plate, "status": "error", "error": f"No active session for vehicle {plate}"})
+                continue
+            entry_time_aware = session.entry_time.replace(tzinfo=timezone.utc) if session.entry_time.tzinfo is None else session.entry_time
+            results.append({
+                "license_plate": plate,
+                "status": "ok",
+                "duration_hours": max(1.0, (exit_time - entry_time_aware).total_seconds() / 3600),
+                "amount_due": session.amount_paid
             })
-        
-        available_spots = total_spots - occupied_spots
-        occupancy_rate = (occupied_spots / total_spots * 100) if total_spots > 0 else 0
-        
-        return {
-            "total_spots": total_spots,
-            "occupied_spots": occupied_spots,
-            "available_spots": available_spots,
-            "occupancy_rate": round(occupancy_rate, 2),
-            "floors": floors
-        }
+        logger.info(f"Bulk exit: {len(sessions)}/{len(license_plates)} vehicles exited")
+        return results
+
+    async def get_parking_status(self) -> Dict:
+        # One row per (floor, spot type), whatever the number of spots
+        return summarize_occupancy(await self.parking_spot_repo.get_occupancy_counters())
 
-    async def get_active_sessions(self) -> List[Dict]:
-        sessions = await self.parking_session_repo.get_active_sessions()
+    async def get_active_sessions(self, columnar: bool = False) -> Union[List[Dict], Dict[str, tuple]]:
+        sessions = await self.parking_session_repo.get_active_sessions(columnar=columnar)
         
         return sessions
 
-    async def get_all_sessions_for_dashboard(self) -> List[Dict]:
-        """Retrieves all parking sessions (active and completed) for the dashboard.
+    async def get_potential_revenue(self, at: Optional[datetime] = None) -> float:
+        """Revenue if every parked vehicle left at ``at`` (now by default)."""
+        return await self.parking_session_repo.get_potential_revenue(at or datetime.now(timezone.utc))
+
+    async def get_sessions_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        license_plate: Optional[str] = None,
+        floor: Optional[int] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columnar: bool = False
+    ) -> Dict:
+        """Retrieves one page of parking history (active and completed) for the dashboard.
+
+        ``columnar=True`` returns the items as one list per column.
         """
-        return await self.parking_session_repo.get_all_sessions_for_dashboard()
+        return await self.parking_session_repo.get_sessions_page(
+            limit=limit, cursor=cursor, license_plate=license_plate,
+            floor=floor, status=status, start=start, end=end, columnar=columnar
+        )
 
     async def get_vehicle_by_plate(self, license_plate: str) -> Optional[Vehicle]:
         return await self.vehicle_repo.get_by_license_plate(license_plate.upper())
\ No newline at end of file
@@ -0,0 +1,115 @@
+import heapq
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.application.repositories import AbstractParkingSpotRepository
+from src.domain.common import SpotType
+from src.domain.entities import ParkingSpot
+
+
+# (floor, spot_number, spot_id) -- the same order as the ``ORDER BY floor, spot_number`` scan
+SpotKey = Tuple[int, str, int]
+
+
+class FreeSpotIndex:
+    """In-memory index of free parking spots, one min-heap per spot type.
+
+    The ``parking_spots`` table stays the source of truth: the index is seeded from it,
+    kept in step by ``ParkingService`` on every entry and exit, and can be rebuilt with
+    ``reconcile`` whenever drift is suspected (e.g. after a crash between a commit and the
+    matching index update).
+
+    Heaps use lazy deletion: ``_free`` holds the ids that are really available, and stale
+    heap entries are skipped when popped, so ``acquire`` and ``release`` are O(log n).
+    """
+
+    def __init__(self):
+        self._heaps: Dict[str, List[SpotKey]] = {}
+        self._free: Dict[str, Set[int]] = {}
+        self._keys: Dict[int, Tuple[str, SpotKey]] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    @staticmethod
+    def _type_key(spot_type) -> str:
+        return spot_type.value if isinstance(spot_type, SpotType) else str(spot_type)
+
+    def _rebuild(self, spots: List[ParkingSpot]):
+        heaps: Dict[str, List[SpotKey]] = {}
+        free: Dict[str, Set[int]] = {}
+        keys: Dict[int, Tuple[str, SpotKey]] = {}
+        for spot in spots:
+            type_key = self._type_key(spot.spot_type)
+            key = (spot.floor, spot.spot_number, spot.id)
+            keys[spot.id] = (type_key, key)
+            heaps.setdefault(type_key, [])
+            free.setdefault(type_key, set())
+            if not spot.is_occupied:
+                heaps[type_key].append(key)
+                free[type_key].add(spot.id)
+        for heap in heaps.values():
+            heapq.heapify(heap)
+        self._heaps, self._free, self._keys = heaps, free, keys
+        self.loaded = True
+
+    async def load(self, parking_spot_repo: AbstractParkingSpotRepository):
+        """Seed the index from the ``parking_spots`` table."""
+        spots = await parking_spot_repo.get_all()
+        with self._lock:
+            self._rebuild(spots)
+
+    async def reconcile(self, parking_spot_repo: AbstractParkingSpotRepository) -> Dict[str, int]:
+        """Rebuild the index from the table and report how far it had drifted.
+
+        Returns:
+            A dict with the number of spots that were missing from the index
+            (``added``) and spots the index wrongly considered free (``removed``).
+        """
+        spots = await parking_spot_repo.get_all()
+        with self._lock:
+            before = {spot_id for ids in self._free.values() for spot_id in ids}
+            self._rebuild(spots)
+            after = {spot_id for ids in self._free.values() for spot_id in ids}
+        return {"added": len(after - before), "removed": len(before - after)}
+
+    def acquire(self, spot_type: SpotType) -> Optional[ParkingSpot]:
+        """Pop the lowest (floor, spot_number) free spot of the given type."""
+        type_key = self._type_key(spot_type)
+        with self._lock:
+            heap = self._heaps.get(type_key, [])
+            free = self._free.get(type_key, set())
+            while heap:
+                floor, spot_number, spot_id = heapq.heappop(heap)
+                if spot_id in free:
+                    free.discard(spot_id)
+                    return ParkingSpot(
+                        id=spot_id,
+                        spot_number=spot_number,
+                        floor=floor,
+                        spot_type=type_key,
+                        is_occupied=False
+                    )
+        return None
+
+    def release(self, spot: ParkingSpot):
+        """Mark a spot as free again (on exit, or when an entry is rolled back)."""
+        type_key = self._type_key(spot.spot_type)
+        key = (spot.floor, spot.spot_number, spot.id)
+        with self._lock:
+            free = self._free.setdefault(type_key, set())
+            if spot.id in free:
+                return
+            free.add(spot.id)
+            self._keys[spot.id] = (type_key, key)
+            heapq.heappush(self._heaps.setdefault(type_key, []), key)
+
+    def discard(self, spot_id: int):
+        """Forget a spot that turned out to be occupied in the database."""
+        with self._lock:
+            entry = self._keys.get(spot_id)
+            if entry:
+                self._free.get(entry[0], set()).discard(spot_id)
+
+    def free_count(self, spot_type: SpotType) -> int:
+        with self._lock:
+            return len(self._free.get(self._type_key(spot_type), ()))
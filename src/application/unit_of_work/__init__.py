@@ -0,0 +1,5 @@
+from .abstract_unit_of_work import AbstractUnitOfWork
+
+__all__ = [
+    "AbstractUnitOfWork",
+]
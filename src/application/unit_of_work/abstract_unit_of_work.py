@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+
+from src.application.repositories import (
+    AbstractVehicleRepository,
+    AbstractParkingSpotRepository,
+    AbstractParkingSessionRepository,
+    AbstractDailyStatsRepository,
+)
+
+
+class AbstractUnitOfWork(ABC):
+    """One atomic transaction shared by the repositories.
+
+    Repositories only flush; nothing is durable until ``commit`` is called.
+    Leaving the ``async with`` block with an exception rolls back.
+    """
+
+    vehicle_repo: AbstractVehicleRepository
+    parking_spot_repo: AbstractParkingSpotRepository
+    parking_session_repo: AbstractParkingSessionRepository
+    daily_stats_repo: AbstractDailyStatsRepository
+
+    async def __aenter__(self) -> "AbstractUnitOfWork":
+        """Starts the unit of work."""
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Rolls back if the block raised; a successful block must have committed."""
+        if exc_type is not None:
+            await self.rollback()
+
+    @abstractmethod
+    async def commit(self):
+        pass
+
+    @abstractmethod
+    async def rollback(self):
+        pass
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,9 +13,21 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = Field(default="sqlite:///./parking.db", description="Database connection URL")
     ASYNC_DATABASE_URL: str = Field(default="sqlite+aiosqlite:///./parking.db", description="Async database URL")
-    
-    
-    
+    READ_DATABASE_URL: Optional[str] = Field(default=None, description="Async URL for analytics reads (e.g. a replica); defaults to ASYNC_DATABASE_URL")
+
+    # Database engine tuning; unset values come from the profile
+    DB_PROFILE: str = Field(default="high_throughput", description="SQLite profile: 'default' or 'high_throughput'")
+    DB_JOURNAL_MODE: Optional[str] = Field(default=None, description="SQLite journal_mode (WAL, DELETE, ...)")
+    DB_SYNCHRONOUS: Optional[str] = Field(default=None, description="SQLite synchronous (FULL, NORMAL, OFF)")
+    DB_BUSY_TIMEOUT_MS: Optional[int] = Field(default=None, description="Milliseconds to wait on a locked database")
+    DB_CACHE_SIZE_KB: Optional[int] = Field(default=None, description="SQLite page cache per connection, in KiB")
+    DB_MMAP_SIZE_MB: Optional[int] = Field(default=None, description="SQLite memory-mapped I/O size, in MiB")
+    DB_TEMP_STORE: Optional[str] = Field(default=None, description="SQLite temp_store (DEFAULT, FILE, MEMORY)")
+    DB_POOL_SIZE: int = Field(default=5, description="Connections kept in the pool; 0 opens one per session")
+    DB_MAX_OVERFLOW: int = Field(default=10, description="Connections opened beyond the pool size under load")
+    DB_POOL_TIMEOUT: float = Field(default=30.0, description="Seconds to wait for a pooled connection")
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=500, description="Prepared statements cached per connection")
+
     # Streamlit
     STREAMLIT_PORT: int = Field(default=8501, description="Streamlit port")
     
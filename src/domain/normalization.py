@@ -0,0 +1,51 @@
+"""Canonical spelling of the free-text vehicle attributes.
+
+Vehicles keep the text they were registered with; the canonical name is what they
+reference in the ``colors``/``brands`` tables, and what queries are normalized to,
+so "grey", "Gray " and "GREY" are the same color and can be matched by equality.
+"""
+import re
+
+# Alternative spellings of one color, keyed by lower-case word. Only spellings:
+# navy is not blue, and maroon is not red.
+COLOR_SYNONYMS = {
+    "grey": "gray",
+}
+
+# Alternative brand names, keyed by lower-case full name
+BRAND_SYNONYMS = {
+    "vw": "volkswagen",
+    "volkswagon": "volkswagen",
+    "chevy": "chevrolet",
+    "merc": "mercedes",
+    "mercedes-benz": "mercedes",
+    "mercedes benz": "mercedes",
+    "benz": "mercedes",
+    "alfa": "alfa romeo",
+    "land-rover": "land rover",
+}
+
+# Brands not written in title case
+BRAND_DISPLAY = {
+    "bmw": "BMW",
+    "byd": "BYD",
+    "gmc": "GMC",
+    "mg": "MG",
+    "ds": "DS",
+}
+
+
+def _words(value: str) -> str:
+    return re.sub(r"\s+", " ", value.strip().lower())
+
+
+def canonical_color(color: str) -> str:
+    """``" light GREY"`` -> ``"Light Gray"``."""
+    return " ".join(COLOR_SYNONYMS.get(word, word) for word in _words(color).split(" ")).title()
+
+
+def canonical_brand(brand: str) -> str:
+    """``"vw"`` -> ``"Volkswagen"``, ``"bmw"`` -> ``"BMW"``."""
+    name = _words(brand)
+    name = BRAND_SYNONYMS.get(name, name)
+    return BRAND_DISPLAY.get(name, name.title())
@@ -0,0 +1,6 @@
+from .parquet_exporter import ParquetSessionExporter, read_sessions
+
+__all__ = [
+    "ParquetSessionExporter",
+    "read_sessions",
+]
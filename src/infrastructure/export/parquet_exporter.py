@@ -0,0 +1,188 @@
+"""Export of the session history to Parquet files partitioned by month.
+
+Requires the optional ``export`` extra (``pip install .[export]``, i.e. pyarrow).
+
+Layout of the output directory::
+
+    month=2025-01/sessions.parquet
+    month=2025-02/sessions.parquet
+    _manifest.json
+
+The ``month=`` directories are Hive partitions, so readers (``read_sessions``,
+pandas, DuckDB, Spark) prune whole months from a filter without opening their files.
+
+Usage::
+
+    python -m src.infrastructure.export.parquet_exporter exports/sessions
+"""
+import asyncio
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from src.application.repositories import AbstractParkingSessionRepository
+
+MANIFEST_NAME = "_manifest.json"
+PARTITION_FILE = "sessions.parquet"
+
+# Low-cardinality text columns, stored dictionary-encoded. license_plate is not one:
+# it has about one distinct value per row, so a dictionary would only add overhead.
+DICTIONARY_COLUMNS = ["payment_status", "color", "brand", "spot_number"]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export requires pyarrow; install the 'export' extra: pip install '.[export]'"
+        ) from e
+    return pyarrow
+
+
+def session_schema():
+    pa = _pyarrow()
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("id", pa.int64()),
+        ("entry_time", pa.timestamp("us", tz="UTC")),
+        ("exit_time", pa.timestamp("us", tz="UTC")),
+        ("amount_paid", pa.float64()),
+        ("payment_status", text),
+        ("hourly_rate", pa.float64()),
+        ("license_plate", pa.string()),
+        ("color", text),
+        ("brand", text),
+        ("spot_number", text),
+        ("floor", pa.int32()),
+    ])
+
+
+def _month_bounds(month: str):
+    start = datetime.strptime(month, "%Y-%m").replace(tzinfo=timezone.utc)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+class ParquetSessionExporter:
+    """Incremental, streaming export of ``parking_sessions`` joined with vehicles and spots.
+
+    A month is rewritten only when its fingerprint (see
+    ``get_monthly_fingerprints``) differs from the one recorded in the manifest at
+    the previous run. Rows are streamed from the database one chunk at a time and
+    written as Parquet row groups, so memory is bounded by ``chunk_size``.
+    """
+
+    def __init__(self, parking_session_repo: AbstractParkingSessionRepository, output_dir, chunk_size: int = 50_000):
+        self.parking_session_repo = parking_session_repo
+        self.output_dir = Path(output_dir)
+        self.chunk_size = chunk_size
+
+    def _read_manifest(self) -> Dict[str, list]:
+        path = self.output_dir / MANIFEST_NAME
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text())
+
+    def _write_manifest(self, manifest: Dict[str, list]):
+        tmp = self.output_dir / f".{MANIFEST_NAME}.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(tmp, self.output_dir / MANIFEST_NAME)
+
+    async def _export_month(self, month: str) -> int:
+        pa = _pyarrow()
+        schema = session_schema()
+        start, end = _month_bounds(month)
+        partition = self.output_dir / f"month={month}"
+        partition.mkdir(parents=True, exist_ok=True)
+        # Dot-prefixed, so dataset readers ignore a leftover from an interrupted run
+        tmp = partition / f".{PARTITION_FILE}.tmp"
+
+        rows_written = 0
+        with pa.parquet.ParquetWriter(tmp, schema, use_dictionary=DICTIONARY_COLUMNS, compression="zstd") as writer:
+            async for rows in self.parking_session_repo.stream_session_rows(
+                chunk_size=self.chunk_size, start=start, end=end
+            ):
+                # Column-wise transpose of the chunk; no per-row dict or entity
+                columns = list(zip(*rows))
+                writer.write_batch(pa.record_batch(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema,
+                ))
+                rows_written += len(rows)
+        # Readers never see a half-written partition
+        os.replace(tmp, partition / PARTITION_FILE)
+        return rows_written
+
+    async def export(self) -> Dict[str, List[str]]:
+        """Bring the output directory up to date with the database.
+
+        Returns:
+            The months that were ``written``, ``skipped`` as unchanged, and
+            ``removed`` because they no longer have sessions.
+        """
+        _pyarrow()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._read_manifest()
+        fingerprints = {month: list(fp) for month, fp in (await self.parking_session_repo.get_monthly_fingerprints()).items()}
+
+        summary = {"written": [], "skipped": [], "removed": []}
+        for month in sorted(fingerprints):
+            if manifest.get(month) == fingerprints[month] and (self.output_dir / f"month={month}" / PARTITION_FILE).exists():
+                summary["skipped"].append(month)
+                continue
+            rows = await self._export_month(month)
+            manifest[month] = fingerprints[month]
+            # Recorded after each month so an interrupted run resumes where it stopped
+            self._write_manifest(manifest)
+            summary["written"].append(month)
+            logger.info(f"Exported {rows} sessions for {month}")
+
+        for month in sorted(set(manifest) - set(fingerprints)):
+            shutil.rmtree(self.output_dir / f"month={month}", ignore_errors=True)
+            del manifest[month]
+            summary["removed"].append(month)
+        self._write_manifest(manifest)
+        return summary
+
+
+def read_sessions(path, start_month: Optional[str] = None, end_month: Optional[str] = None, columns: Optional[List[str]] = None):
+    """Load exported sessions as a ``pyarrow.Table``.
+
+    ``start_month``/``end_month`` (inclusive, ``"YYYY-MM"``) are pushed down to the
+    partition directories, so only the matching months are read.
+    """
+    _pyarrow()
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    month = ds.field("month")
+    predicate = None
+    if start_month is not None:
+        predicate = month >= start_month
+    if end_month is not None:
+        predicate = (month <= end_month) if predicate is None else predicate & (month <= end_month)
+    return dataset.to_table(columns=columns, filter=predicate)
+
+
+async def _main(output_dir: str):
+    from src.infrastructure.persistence.database import AsyncSessionLocal
+    from src.infrastructure.persistence.sqlalchemy_repositories import SQLAlchemyParkingSessionRepository
+
+    async with AsyncSessionLocal() as session:
+        summary = await ParquetSessionExporter(SQLAlchemyParkingSessionRepository(session), output_dir).export()
+    print(
+        f"Written {len(summary['written'])} months, skipped {len(summary['skipped'])} unchanged, "
+        f"removed {len(summary['removed'])}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "exports/sessions"))
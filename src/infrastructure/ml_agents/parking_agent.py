@@ -1,13 +1,14 @@
 import os
-import asyncio
 
 from crewai import Agent, Task, Crew
 from langchain.tools import Tool
 from langchain_openai import ChatOpenAI
 
-from src.infrastructure.persistence.database import AsyncSessionLocal
+from src.infrastructure.persistence.database import ReadSessionLocal
 from src.application.services.analytics_service import AnalyticsService
 from src.application.services.parking_service import ParkingService
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
+from src.shared.async_runner import run_sync
 
 
 class ParkingAssistant:
@@ -60,23 +61,23 @@ class ParkingAssistant:
         def get_current_count(_) -> str:
             """Get the current number of vehicles in the parking."""
             async def _get_count():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     count = await analytics.get_current_vehicle_count()
                     return count
             
-            count = asyncio.run(_get_count())
+            count = run_sync(_get_count())
             return f"There are currently {count} vehicles parked."
         
         def count_by_color(color: str) -> str:
             """Count vehicles by color."""
             async def _count_color():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     count = await analytics.count_vehicles_by_color(color, active_only=True)
                     return count
             
-            count = asyncio.run(_count_color())
+            count = run_sync(_count_color())
             return f"There are {count} {color} cars currently in the parking."
         
         def get_recent_revenue(hours: str) -> str:
@@ -87,23 +88,23 @@ class ParkingAssistant:
                 hours_int = 1
                 
             async def _get_revenue():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     revenue = await analytics.get_revenue_last_hours(hours_int)
                     return revenue
             
-            revenue = asyncio.run(_get_revenue())
+            revenue = run_sync(_get_revenue())
             return f"Revenue generated in the last {hours_int} hour(s): ${revenue:.2f}"
         
         def get_parking_status(_) -> str:
             """Get current parking status."""
             async def _get_status():
-                async with AsyncSessionLocal() as db:
-                    service = ParkingService(db)
+                async with ReadSessionLocal() as db:
+                    service = ParkingService.from_unit_of_work(SQLAlchemyUnitOfWork.for_session(db))
                     status = await service.get_parking_status()
                     return status
             
-            status = asyncio.run(_get_status())
+            status = run_sync(_get_status())
             return f"""Parking Status:
 - Total spots: {status.total_spots}
 - Occupied: {status.occupied_spots}
@@ -113,45 +114,45 @@ class ParkingAssistant:
         def get_daily_average(_) -> str:
             """Get average number of vehicles per day."""
             async def _get_average():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     avg = await analytics.get_daily_average_vehicles(30)
                     return avg
             
-            average = asyncio.run(_get_average())
+            average = run_sync(_get_average())
             return f"Average daily vehicles (last 30 days): {average:.1f}"
         
         def get_average_spending(_) -> str:
             """Get average spending per user per day."""
             async def _get_spending():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     avg = await analytics.get_average_daily_spending(30)
                     return avg
             
-            spending = asyncio.run(_get_spending())
+            spending = run_sync(_get_spending())
             return f"Average daily spending per user: ${spending:.2f}"
         
         def get_duration_by_color(color: str) -> str:
             """Get average parking duration for vehicles of a specific color."""
             async def _get_duration():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     duration = await analytics.get_average_duration_by_color(color)
                     return duration
             
-            duration = asyncio.run(_get_duration())
+            duration = run_sync(_get_duration())
             return f"Average parking duration for {color} cars: {duration:.2f} hours"
         
         def get_today_analytics(_) -> str:
             """Get today's parking analytics."""
             async def _get_analytics():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     data = await analytics.get_parking_analytics()
                     return data
             
-            data = asyncio.run(_get_analytics())
+            data = run_sync(_get_analytics())
             return f"""Today's Analytics:
 - Revenue: ${data['today_revenue']:.2f}
 - Vehicles: {data['today_vehicles']}
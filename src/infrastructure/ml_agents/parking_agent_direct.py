@@ -1,80 +1,69 @@
 import re
+from typing import Optional
 
 from src.application.services.analytics_service import AnalyticsService
+from src.application.services.cached_analytics_service import CachedAnalyticsService
 from src.application.services.parking_service import ParkingService
 from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import (
     SQLAlchemyVehicleRepository,
     SQLAlchemyParkingSessionRepository,
     SQLAlchemyParkingSpotRepository,
 )
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
+from src.shared.cache import TTLCache
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 class DirectParkingAssistant:
     """Direct parking assistant that processes queries without LLM hallucination."""
     
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, analytics_cache: Optional[TTLCache] = None):
         self.session = session
-    
-    async def get_current_count(self) -> int:
-        """Get the current number of vehicles."""
+        # Shared with the dashboard so repeated questions do not recompute aggregates
+        self.analytics_cache = analytics_cache
+
+    def _analytics(self):
         vehicle_repo = SQLAlchemyVehicleRepository(self.session)
         session_repo = SQLAlchemyParkingSessionRepository(self.session)
         spot_repo = SQLAlchemyParkingSpotRepository(self.session)
         analytics = AnalyticsService(vehicle_repo, session_repo, spot_repo)
+        if self.analytics_cache is not None:
+            return CachedAnalyticsService(analytics, self.analytics_cache)
+        return analytics
+    
+    async def get_current_count(self) -> int:
+        """Get the current number of vehicles."""
+        analytics = self._analytics()
         return await analytics.get_current_vehicle_count()
     
     async def count_by_color(self, color: str) -> int:
         """Count vehicles by color."""
-        vehicle_repo = SQLAlchemyVehicleRepository(self.session)
-        session_repo = SQLAlchemyParkingSessionRepository(self.session)
-        spot_repo = SQLAlchemyParkingSpotRepository(self.session)
-        analytics = AnalyticsService(vehicle_repo, session_repo, spot_repo)
+        analytics = self._analytics()
         return await analytics.count_vehicles_by_color(color.lower(), active_only=True)
     
     async def get_revenue(self, hours: int) -> float:
         """Get revenue for the last N hours."""
-        vehicle_repo = SQLAlchemyVehicleRepository(self.session)
-        session_repo = SQLAlchemyParkingSessionRepository(self.session)
-        spot_repo = SQLAlchemyParkingSpotRepository(self.session)
-        analytics = AnalyticsService(vehicle_repo, session_repo, spot_repo)
+        analytics = self._analytics()
         return await analytics.get_revenue_last_hours(hours)
     
     async def get_parking_status(self) -> dict:
         """Get parking status."""
-        vehicle_repo = SQLAlchemyVehicleRepository(self.session)
-        session_repo = SQLAlchemyParkingSessionRepository(self.session)
-        spot_repo = SQLAlchemyParkingSpotRepository(self.session)
-        parking = ParkingService(vehicle_repo, spot_repo, session_repo)
+        parking = ParkingService.from_unit_of_work(SQLAlchemyUnitOfWork.for_session(self.session))
         return await parking.get_parking_status()
     
     async def get_all_colors(self) -> dict:
         """Get count of all colors."""
-        colors = ['red', 'blue', 'black', 'white', 'green', 'yellow', 'silver', 'gray', 'grey']
-        result = {}
-        
-        vehicle_repo = SQLAlchemyVehicleRepository(self.session)
-        session_repo = SQLAlchemyParkingSessionRepository(self.session)
-        spot_repo = SQLAlchemyParkingSpotRepository(self.session)
-        analytics = AnalyticsService(vehicle_repo, session_repo, spot_repo)
-        for color in colors:
-            count = await analytics.count_vehicles_by_color(color, active_only=True)
-            if count > 0:
-                result[color] = count
-        
-        return result
+        analytics = self._analytics()
+        return await analytics.get_color_distribution(active_only=True)
     
     async def get_brand_distribution(self) -> dict:
         """Get distribution of vehicles by brand."""
-        vehicle_repo = SQLAlchemyVehicleRepository(self.session)
-        session_repo = SQLAlchemyParkingSessionRepository(self.session)
-        spot_repo = SQLAlchemyParkingSpotRepository(self.session)
-        analytics = AnalyticsService(vehicle_repo, session_repo, spot_repo)
+        analytics = self._analytics()
         return await analytics.get_brand_distribution(active_only=True)
     
     async def get_floor_distribution(self) -> dict:
         """Get distribution of vehicles by floor."""
-        analytics = AnalyticsService(self.session)
+        analytics = self._analytics()
         return await analytics.get_floor_distribution(active_only=True)
     
     async def process_query(self, query: str) -> str:
@@ -95,7 +84,7 @@ class DirectParkingAssistant:
                     response = f"Current color distribution in the parking (total {total} vehicles):\n"
                     for color, count in colors.items():
                         percentage = (count / total * 100) if total > 0 else 0
-                        response += f"- {color.capitalize()}: {count} vehicles ({percentage:.1f}%)\n"
+                        response += f"- {color}: {count} vehicles ({percentage:.1f}%)\n"
                     
                     response += "\nNote: I track vehicles by color, not by brand. The actual brand distribution would require different data tracking."
                     return response
@@ -173,7 +162,7 @@ class DirectParkingAssistant:
                 response = f"Current color distribution (total {total} vehicles):\n"
                 for color, count in colors.items():
                     percentage = (count / total * 100) if total > 0 else 0
-                    response += f"- {color.capitalize()}: {count} vehicles ({percentage:.1f}%)\n"
+                    response += f"- {color}: {count} vehicles ({percentage:.1f}%)\n"
                 
                 return response
             
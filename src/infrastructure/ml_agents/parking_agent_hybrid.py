@@ -1,5 +1,6 @@
 import os
 import asyncio
+from typing import Optional
 
 from crewai import Agent, Task, Crew
 from langchain.tools import Tool
@@ -8,6 +9,8 @@ from langchain_openai import ChatOpenAI
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.infrastructure.ml_agents.parking_agent_direct import DirectParkingAssistant
+from src.shared.async_runner import run_sync
+from src.shared.cache import TTLCache
 
 
 class HybridParkingAssistant:
@@ -15,9 +18,9 @@ class HybridParkingAssistant:
     
     
     
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, analytics_cache: Optional[TTLCache] = None):
         # Initialize direct assistant for fallback
-        self.direct_assistant = DirectParkingAssistant(session)
+        self.direct_assistant = DirectParkingAssistant(session, analytics_cache=analytics_cache)
         
         # Configure the LLM
         model_name = os.getenv("OPENAI_MODEL_NAME", "gpt-3.5-turbo")
@@ -72,8 +75,8 @@ class HybridParkingAssistant:
             """Process any parking-related query and return accurate data."""
             print(f"[TOOL CALLED] process_parking_query with: {query}")
             
-            # Run the direct assistant synchronously
-            result = asyncio.run(self.direct_assistant.process_query(query))
+            # Tools run in kickoff's worker thread; the query itself runs on the shared loop
+            result = run_sync(self.direct_assistant.process_query(query))
             print(f"[TOOL RESULT] {result}")
             return result
         
@@ -113,7 +116,8 @@ class HybridParkingAssistant:
             )
             
             # Execute and return result
-            result = crew.kickoff()
+            # In a worker thread, so the loop stays free to run the tools' queries
+            result = await asyncio.to_thread(crew.kickoff)
             
             # If the result looks like hallucination (contains made-up numbers), fall back
             result_str = str(result)
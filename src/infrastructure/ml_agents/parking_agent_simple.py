@@ -2,6 +2,7 @@
 from src.infrastructure.persistence.database import AsyncSessionLocal
 from src.application.services.analytics_service import AnalyticsService
 from src.application.services.parking_service import ParkingService
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
 
 
 class SimpleParkingAssistant:
@@ -48,7 +49,7 @@ class SimpleParkingAssistant:
             # Check for parking status
             if any(phrase in query_lower for phrase in ['parking status', 'available spots', 'occupancy']):
                 async with AsyncSessionLocal() as db:
-                    parking = ParkingService(db)
+                    parking = ParkingService.from_unit_of_work(SQLAlchemyUnitOfWork.for_session(db))
                     status = await parking.get_parking_status()
                     return f"""Current Parking Status:
 - Total spots: {status['total_spots']}
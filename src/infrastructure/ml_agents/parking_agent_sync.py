@@ -1,30 +1,19 @@
 import os
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 
 from crewai import Agent, Task, Crew
 from langchain.tools import Tool
 from langchain_openai import ChatOpenAI
 
-from src.infrastructure.persistence.database import AsyncSessionLocal
+from src.infrastructure.persistence.database import ReadSessionLocal
 from src.application.services.analytics_service import AnalyticsService
 from src.application.services.parking_service import ParkingService
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
+from src.shared.async_runner import run_sync
 
 
 def run_async_in_sync(coro):
-    """Run async coroutine in a sync context safely."""
-    # Create a new event loop in a thread
-    def run_in_thread():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
-    
-    with ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(run_in_thread)
-        return future.result()
+    """Run async coroutine in a sync context safely, on the process-wide event loop."""
+    return run_sync(coro)
 
 
 class ParkingAssistant:
@@ -79,7 +68,7 @@ class ParkingAssistant:
             """Get the current number of vehicles in the parking."""
             print("[TOOL CALLED] get_current_count")
             async def _get_count():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     count = await analytics.get_current_vehicle_count()
                     return count
@@ -97,7 +86,7 @@ class ParkingAssistant:
                 return f"'{color}' is a car brand, not a color. Please ask about colors like red, blue, black, etc."
             
             async def _count_color():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     count = await analytics.count_vehicles_by_color(color.lower(), active_only=True)
                     return count
@@ -115,7 +104,7 @@ class ParkingAssistant:
                 hours_int = 1
                 
             async def _get_revenue():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     revenue = await analytics.get_revenue_last_hours(hours_int)
                     return revenue
@@ -126,8 +115,8 @@ class ParkingAssistant:
         def get_parking_status(_) -> str:
             """Get current parking status."""
             async def _get_status():
-                async with AsyncSessionLocal() as db:
-                    parking = ParkingService(db)
+                async with ReadSessionLocal() as db:
+                    parking = ParkingService.from_unit_of_work(SQLAlchemyUnitOfWork.for_session(db))
                     status = await parking.get_parking_status()
                     return status
             
@@ -141,7 +130,7 @@ class ParkingAssistant:
         def get_daily_average(_) -> str:
             """Get average number of vehicles per day."""
             async def _get_average():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     avg = await analytics.get_daily_average_vehicles(30)
                     return avg
@@ -152,7 +141,7 @@ class ParkingAssistant:
         def get_average_spending(_) -> str:
             """Get average spending per user per day."""
             async def _get_spending():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     avg = await analytics.get_average_daily_spending(30)
                     return avg
@@ -163,7 +152,7 @@ class ParkingAssistant:
         def get_duration_by_color(color: str) -> str:
             """Get average parking duration for vehicles of a specific color."""
             async def _get_duration():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     duration = await analytics.get_average_duration_by_color(color)
                     return duration
@@ -174,7 +163,7 @@ class ParkingAssistant:
         def get_today_analytics(_) -> str:
             """Get today's parking analytics."""
             async def _get_analytics():
-                async with AsyncSessionLocal() as db:
+                async with ReadSessionLocal() as db:
                     analytics = AnalyticsService(db)
                     data = await analytics.get_parking_analytics()
                     return data
@@ -1,41 +1,44 @@
 """Database cleanup script to remove duplicates."""
-from sqlalchemy import create_engine, select, func, update
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine, select, func, update, delete
+from sqlalchemy.orm import Session, aliased
 from src.infrastructure.persistence.models.models import Vehicle, ParkingSession
 
 DATABASE_URL = "sqlite:///./parking.db"
 engine = create_engine(DATABASE_URL)
 
 def cleanup_duplicates():
+    # Set-based: two statements whatever the table size, nothing is loaded into memory
     with Session(engine) as session:
-        # Find duplicate vehicles
-        duplicates = session.execute(
-            select(Vehicle.license_plate)
-            .group_by(Vehicle.license_plate)
-            .having(func.count(Vehicle.id) > 1)
-        ).scalars().all()
-        
-        for license_plate in duplicates:
-            # Keep only the first vehicle
-            vehicles = session.execute(
-                select(Vehicle)
-                .where(Vehicle.license_plate == license_plate)
-                .order_by(Vehicle.id)
-            ).scalars().all()
-            
-            # Delete all but the first
-            for vehicle in vehicles[1:]:
-                # Update sessions to point to the first vehicle
-                session.execute(
-                    update(ParkingSession)
-                    .where(ParkingSession.vehicle_id == vehicle.id)
-                    .values(vehicle_id=vehicles[0].id)
-                )
-                # Delete the duplicate vehicle
-                session.delete(vehicle)
-        
+        duplicates = session.scalar(
+            select(func.count()).select_from(
+                select(Vehicle.license_plate)
+                .group_by(Vehicle.license_plate)
+                .having(func.count(Vehicle.id) > 1)
+                .subquery()
+            )
+        )
+
+        # The first vehicle of each plate is kept
+        kept_ids = select(func.min(Vehicle.id)).group_by(Vehicle.license_plate)
+
+        # Point sessions of duplicates to the kept vehicle
+        owner = aliased(Vehicle)
+        kept = aliased(Vehicle)
+        session.execute(
+            update(ParkingSession)
+            .where(ParkingSession.vehicle_id.not_in(kept_ids))
+            .values(
+                vehicle_id=select(func.min(kept.id))
+                .join(owner, owner.license_plate == kept.license_plate)
+                .where(owner.id == ParkingSession.vehicle_id)
+                .scalar_subquery()
+            )
+        )
+        # Delete the duplicate vehicles
+        session.execute(delete(Vehicle).where(Vehicle.id.not_in(kept_ids)))
+
         session.commit()
-        print(f"Cleaned up {len(duplicates)} duplicate vehicles")
+        print(f"Cleaned up {duplicates} duplicate vehicles")
 
 if __name__ == "__main__":
-    cleanup_duplicates()
\ No newline at end of file
+    cleanup_duplicates()
@@ -1,28 +1,158 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy import create_engine
 import os
+from typing import Dict
 
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from src.config.settings_env import Settings, settings
 from src.infrastructure.persistence.models.models import Base
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./parking.db")
-ASYNC_DATABASE_URL = os.getenv(
-    "ASYNC_DATABASE_URL", "sqlite+aiosqlite:///./parking.db")
+# Connection-time PRAGMAs per profile. "default" keeps SQLite's own behaviour, including
+# the 5 s busy timeout sqlite3/aiosqlite connect with, so a writer waits for the lock
+# instead of failing with "database is locked". "high_throughput" switches to WAL, so
+# dashboard reads no longer block on (or block) gate writes, and relaxes fsyncs to the
+# WAL checkpoints (synchronous=NORMAL, still durable against application crashes); a
+# larger page cache, memory-mapped reads and in-memory temp tables speed up the
+# analytics scans.
+SQLITE_PROFILES: Dict[str, Dict[str, object]] = {
+    "default": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    "high_throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -64 * 1024,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def sqlite_pragmas(config: Settings) -> Dict[str, object]:
+    """PRAGMAs for the configured profile, with the individual ``DB_*`` overrides applied."""
+    if config.DB_PROFILE not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {config.DB_PROFILE!r}; expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[config.DB_PROFILE])
+    overrides = {
+        "journal_mode": config.DB_JOURNAL_MODE,
+        "synchronous": config.DB_SYNCHRONOUS,
+        "busy_timeout": config.DB_BUSY_TIMEOUT_MS,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": None if config.DB_CACHE_SIZE_KB is None else -config.DB_CACHE_SIZE_KB,
+        "mmap_size": None if config.DB_MMAP_SIZE_MB is None else config.DB_MMAP_SIZE_MB * 1024 * 1024,
+        "temp_store": config.DB_TEMP_STORE,
+    }
+    pragmas.update({name: value for name, value in overrides.items() if value is not None})
+    return pragmas
+
+
+def _absolute_sqlite_url(url: str) -> str:
+    # Relative SQLite paths would otherwise depend on the working directory of each process
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return url
+    return parsed.set(database=os.path.abspath(parsed.database)).render_as_string(hide_password=False)
+
+
+def _install_sqlite_pragmas(engine: Engine, pragmas: Dict[str, object]):
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_sync_engine(config: Settings = settings) -> Engine:
+    """Synchronous engine for schema creation and maintenance scripts."""
+    url = _absolute_sqlite_url(config.DATABASE_URL)
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(url)
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False})
+    _install_sqlite_pragmas(sync_engine, sqlite_pragmas(config))
+    return sync_engine
+
+
+def _create_async_engine(url: str, config: Settings, read_only: bool = False) -> AsyncEngine:
+    url = _absolute_sqlite_url(url)
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    options = {"echo": False}
+    if is_sqlite and make_url(url).database in (None, "", ":memory:"):
+        pass  # the dialect's single shared connection
+    elif config.DB_POOL_SIZE > 0:
+        # A pool blocks on an asyncio queue bound to one event loop, so every caller must
+        # share a long-lived loop (src.shared.async_runner) rather than asyncio.run() per
+        # query; set DB_POOL_SIZE=0 for processes that start several loops
+        options.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_pre_ping=not is_sqlite,
+        )
+    else:
+        options["poolclass"] = NullPool
+    if is_sqlite:
+        options["connect_args"] = {"cached_statements": config.DB_STATEMENT_CACHE_SIZE}
+    elif make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {"prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE}
+        if read_only:
+            options["connect_args"]["server_settings"] = {"default_transaction_read_only": "on"}
+
+    new_engine = create_async_engine(url, **options)
+    if is_sqlite:
+        pragmas = sqlite_pragmas(config)
+        if read_only:
+            # journal_mode is a property of the file, set by the writers
+            pragmas.pop("journal_mode", None)
+            pragmas["query_only"] = "ON"
+        _install_sqlite_pragmas(new_engine.sync_engine, pragmas)
+    return new_engine
+
+
+def create_app_engine(config: Settings = settings) -> AsyncEngine:
+    """Async engine for the application, tuned by the ``DB_*`` settings.
+
+    The PRAGMAs are issued on every new pooled connection, since most of them
+    (all but journal_mode) only last for the connection that set them.
+    """
+    return _create_async_engine(config.ASYNC_DATABASE_URL, config)
 
-# Ensure we're using absolute paths for SQLite
-if "sqlite" in DATABASE_URL:
-    db_path = os.path.abspath("parking.db")
-    DATABASE_URL = f"sqlite:///{db_path}"
-    ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{db_path}"
+
+def create_read_engine(config: Settings = settings) -> AsyncEngine:
+    """Async engine for analytics and dashboard reads.
+
+    Connects to ``READ_DATABASE_URL`` (e.g. a replica) when set, otherwise to the
+    primary database. SQLite connections are opened with ``PRAGMA query_only``, and
+    PostgreSQL ones default to read-only transactions, so a read path can never
+    take the write lock. With WAL, these readers do not block the gate writers.
+    """
+    return _create_async_engine(config.READ_DATABASE_URL or config.ASYNC_DATABASE_URL, config, read_only=True)
+
+
+DATABASE_URL = _absolute_sqlite_url(settings.DATABASE_URL)
+ASYNC_DATABASE_URL = _absolute_sqlite_url(settings.ASYNC_DATABASE_URL)
 
 # Sync engine for initialization
-engine = create_engine(DATABASE_URL, connect_args={
-                       "check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+engine = create_sync_engine(settings)
 
 # Async engine for application
-async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+async_engine = create_app_engine(settings)
 AsyncSessionLocal = async_sessionmaker(
     async_engine, class_=AsyncSession, expire_on_commit=False)
 
+# Read-only engine for analytics and dashboard queries
+read_engine = create_read_engine(settings)
+ReadSessionLocal = async_sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False)
+
 
 async def get_async_db():
     async with AsyncSessionLocal() as session:
@@ -32,6 +162,14 @@ async def get_async_db():
             await session.close()
 
 
+async def get_read_db():
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 def init_db():
     print(f"Initializing database at: {DATABASE_URL}")
     Base.metadata.create_all(bind=engine, checkfirst=True)
@@ -59,3 +197,44 @@ def init_db():
                     session.add(spot)
             session.commit()
             print(f"Created {3 * 20} parking spots")
+        else:
+            _backfill_occupancy_counters(session)
+            _backfill_daily_stats(session)
+
+
+def _backfill_occupancy_counters(session):
+    # Databases created before occupancy_counters existed get the table empty
+    from sqlalchemy import func, select
+    from src.infrastructure.persistence.models.models import OccupancyCounter
+    from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import (
+        occupancy_counters_rebuild_statements,
+    )
+
+    if session.scalar(select(func.count()).select_from(OccupancyCounter)) == 0:
+        for statement in occupancy_counters_rebuild_statements():
+            session.execute(statement)
+        session.commit()
+        print("Occupancy counters rebuilt")
+
+
+def _backfill_daily_stats(session):
+    # Databases created before daily_stats existed get the table empty, and writes that
+    # bypassed ParkingService's unit of work leave it behind: rebuild it when its entry
+    # and exit totals disagree with the sessions
+    from sqlalchemy import func, select
+    from src.infrastructure.persistence.models.models import DailyStats, ParkingSession
+    from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import (
+        daily_stats_rebuild_statements,
+    )
+
+    sessions = session.execute(
+        select(func.count(ParkingSession.id), func.count(ParkingSession.exit_time))
+    ).one()
+    rollup = session.execute(
+        select(func.coalesce(func.sum(DailyStats.entries), 0), func.coalesce(func.sum(DailyStats.exits), 0))
+    ).one()
+    if tuple(sessions) != tuple(rollup):
+        for statement in daily_stats_rebuild_statements():
+            session.execute(statement)
+        session.commit()
+        print("Daily stats rebuilt")
@@ -1,12 +1,32 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
+from typing import Dict, Iterable
+
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, ForeignKey, Index, event, inspect, select, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from src.domain.normalization import canonical_brand, canonical_color
 from src.shared.custom_types import UTCDateTime # Updated import path
 
 Base = declarative_base()
 
 
+class Color(Base):
+    """Canonical vehicle colors (see ``src.domain.normalization``)."""
+    __tablename__ = "colors"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
+class Brand(Base):
+    """Canonical vehicle brands (see ``src.domain.normalization``)."""
+    __tablename__ = "brands"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+
+
 class Vehicle(Base):
     __tablename__ = "vehicles"
 
@@ -14,11 +34,59 @@ class Vehicle(Base):
     license_plate = Column(String, unique=True, index=True)
     color = Column(String, nullable=False)
     brand = Column(String, nullable=False)
+    # Filled from color/brand on insert: color and brand queries are indexed equality lookups
+    color_id = Column(Integer, ForeignKey("colors.id", name="fk_vehicles_color_id_colors"), index=True)
+    brand_id = Column(Integer, ForeignKey("brands.id", name="fk_vehicles_brand_id_brands"), index=True)
     created_at = Column(UTCDateTime, default=lambda: datetime.now(timezone.utc))
 
     parking_sessions = relationship("ParkingSession", back_populates="vehicle")
 
 
+def _insert(connection, model):
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"{model.__tablename__} upserts are not supported on {dialect}")
+
+
+def resolve_dimension_ids(connection, model, names: Iterable[str]) -> Dict[str, int]:
+    """Ids of the given canonical ``colors``/``brands`` names, inserting the missing ones.
+
+    Missing names are inserted with ``ON CONFLICT DO NOTHING`` and read back, so two
+    gate entries adding the same new name both get its id instead of one failing on
+    the unique ``name``.
+    """
+    names = set(names)
+    if not names:
+        return {}
+    lookup = select(model.name, model.id).where(model.name.in_(names))
+    ids = dict(connection.execute(lookup).all())
+    missing = names - ids.keys()
+    if missing:
+        connection.execute(
+            _insert(connection, model)
+            .values([{"name": name} for name in sorted(missing)])
+            .on_conflict_do_nothing(index_elements=[model.name])
+        )
+        ids = dict(connection.execute(lookup).all())
+    return ids
+
+
+@event.listens_for(Vehicle, "before_insert")
+@event.listens_for(Vehicle, "before_update")
+def _resolve_vehicle_dimensions(mapper, connection, target):
+    # ORM writes; the bulk INSERT in SQLAlchemyVehicleRepository.add_many resolves them itself
+    state = inspect(target)
+    if target.color_id is None or state.attrs.color.history.has_changes():
+        color = canonical_color(target.color)
+        target.color_id = resolve_dimension_ids(connection, Color, [color])[color]
+    if target.brand_id is None or state.attrs.brand.history.has_changes():
+        brand = canonical_brand(target.brand)
+        target.brand_id = resolve_dimension_ids(connection, Brand, [brand])[brand]
+
+
 class ParkingSpot(Base):
     __tablename__ = "parking_spots"
 
@@ -30,6 +98,11 @@ class ParkingSpot(Base):
 
     parking_sessions = relationship("ParkingSession", back_populates="parking_spot")
 
+    __table_args__ = (
+        # Spot claim: free spots of a type in (floor, spot_number) order
+        Index("ix_parking_spots_type_free", "spot_type", "is_occupied", "floor", "spot_number"),
+    )
+
 
 class ParkingSession(Base):
     __tablename__ = "parking_sessions"
@@ -46,6 +119,27 @@ class ParkingSession(Base):
     vehicle = relationship("Vehicle", back_populates="parking_sessions")
     parking_spot = relationship("ParkingSpot", back_populates="parking_sessions")
 
+    __table_args__ = (
+        # Joins from vehicles and per-vehicle history
+        Index("ix_parking_sessions_vehicle_id", "vehicle_id"),
+        # Joins from spots: sessions of a spot, and floor-filtered history
+        Index("ix_parking_sessions_parking_spot_id", "parking_spot_id"),
+        # "entry_time >= cutoff" windows and entry_time ordering
+        Index("ix_parking_sessions_entry_time", "entry_time"),
+        # Revenue: "payment_status = 'paid' AND exit_time >= cutoff", covering amount_paid
+        Index("ix_parking_sessions_status_exit_time", "payment_status", "exit_time", "amount_paid"),
+        # Active sessions only ("exit_time IS NULL"): stays small however long the history is.
+        # exit_time is carried so the planner can treat the index as covering.
+        Index(
+            "ix_parking_sessions_active",
+            "vehicle_id",
+            "entry_time",
+            "exit_time",
+            sqlite_where=text("exit_time IS NULL"),
+            postgresql_where=text("exit_time IS NULL"),
+        ),
+    )
+
     @property
     def duration_hours(self):
         if self.exit_time:
@@ -69,4 +163,132 @@ class ParkingSession(Base):
             "amount_paid": self.amount_paid,
             "payment_status": self.payment_status,
             "hourly_rate": self.hourly_rate,
-        }
\ No newline at end of file
+        }
+
+class DailyStats(Base):
+    """Per-day rollup of parking activity, one row per (date, floor, spot_type).
+
+    Maintained in the same transaction as every entry and exit, so reports read
+    O(days) rows instead of grouping the whole ``parking_sessions`` table.
+    Entries are counted on their entry date; exits, revenue and durations on
+    their exit date (UTC).
+    """
+    __tablename__ = "daily_stats"
+
+    date = Column(Date, primary_key=True)
+    floor = Column(Integer, primary_key=True)
+    spot_type = Column(String, primary_key=True)
+    entries = Column(Integer, nullable=False, default=0)
+    exits = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    # Vehicles paying for the first time that day; summed over a date it is the
+    # number of distinct paying vehicles of that day
+    distinct_vehicles = Column(Integer, nullable=False, default=0)
+    total_duration_hours = Column(Float, nullable=False, default=0.0)
+
+
+class DailyVehicle(Base):
+    """Vehicles that already paid on a given day, so ``distinct_vehicles`` is counted once."""
+    __tablename__ = "daily_vehicles"
+
+    date = Column(Date, primary_key=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), primary_key=True)
+
+
+class OccupancyCounter(Base):
+    """Spots and occupied spots per (floor, spot_type).
+
+    Kept in step with ``parking_spots`` by database triggers (``OCCUPANCY_TRIGGERS``),
+    so every claim and release updates it in the same statement, whichever code path
+    wrote the spot. Status reads cost O(floors x types) rows instead of O(spots).
+    """
+    __tablename__ = "occupancy_counters"
+
+    floor = Column(Integer, primary_key=True)
+    spot_type = Column(String, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    occupied = Column(Integer, nullable=False, default=0)
+
+
+# One statement list per dialect; each statement is idempotent
+OCCUPANCY_TRIGGERS = {
+    "sqlite": [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_parking_spots_counters_insert AFTER INSERT ON parking_spots
+        BEGIN
+            INSERT INTO occupancy_counters (floor, spot_type, total, occupied)
+            VALUES (NEW.floor, NEW.spot_type, 1, COALESCE(NEW.is_occupied, 0))
+            ON CONFLICT (floor, spot_type) DO UPDATE
+            SET total = total + 1, occupied = occupied + excluded.occupied;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_parking_spots_counters_delete AFTER DELETE ON parking_spots
+        BEGIN
+            UPDATE occupancy_counters
+            SET total = total - 1, occupied = occupied - COALESCE(OLD.is_occupied, 0)
+            WHERE floor = OLD.floor AND spot_type = OLD.spot_type;
+        END
+        """,
+        # Claims and releases: the spot stays in its group
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_parking_spots_counters_occupancy AFTER UPDATE OF is_occupied ON parking_spots
+        WHEN OLD.floor IS NEW.floor AND OLD.spot_type IS NEW.spot_type
+            AND COALESCE(OLD.is_occupied, 0) != COALESCE(NEW.is_occupied, 0)
+        BEGIN
+            UPDATE occupancy_counters
+            SET occupied = occupied + COALESCE(NEW.is_occupied, 0) - COALESCE(OLD.is_occupied, 0)
+            WHERE floor = NEW.floor AND spot_type = NEW.spot_type;
+        END
+        """,
+        # A spot moved to another floor or type
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_parking_spots_counters_move AFTER UPDATE OF floor, spot_type ON parking_spots
+        WHEN OLD.floor IS NOT NEW.floor OR OLD.spot_type IS NOT NEW.spot_type
+        BEGIN
+            UPDATE occupancy_counters
+            SET total = total - 1, occupied = occupied - COALESCE(OLD.is_occupied, 0)
+            WHERE floor = OLD.floor AND spot_type = OLD.spot_type;
+            INSERT INTO occupancy_counters (floor, spot_type, total, occupied)
+            VALUES (NEW.floor, NEW.spot_type, 1, COALESCE(NEW.is_occupied, 0))
+            ON CONFLICT (floor, spot_type) DO UPDATE
+            SET total = total + 1, occupied = occupied + excluded.occupied;
+        END
+        """,
+    ],
+    "postgresql": [
+        """
+        CREATE OR REPLACE FUNCTION parking_spots_counters() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE occupancy_counters
+                SET total = total - 1, occupied = occupied - COALESCE(OLD.is_occupied, false)::int
+                WHERE floor = OLD.floor AND spot_type = OLD.spot_type;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'INSERT') THEN
+                INSERT INTO occupancy_counters (floor, spot_type, total, occupied)
+                VALUES (NEW.floor, NEW.spot_type, 1, COALESCE(NEW.is_occupied, false)::int)
+                ON CONFLICT (floor, spot_type) DO UPDATE
+                SET total = occupancy_counters.total + 1,
+                    occupied = occupancy_counters.occupied + excluded.occupied;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS trg_parking_spots_counters ON parking_spots",
+        """
+        CREATE TRIGGER trg_parking_spots_counters
+        AFTER INSERT OR DELETE OR UPDATE OF is_occupied, floor, spot_type ON parking_spots
+        FOR EACH ROW EXECUTE FUNCTION parking_spots_counters()
+        """,
+    ],
+}
+
+
+def _create_occupancy_triggers(target, connection, **kw):
+    for statement in OCCUPANCY_TRIGGERS.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+event.listen(Base.metadata, "after_create", _create_occupancy_triggers)
@@ -0,0 +1,17 @@
+"""Backfill or rebuild the daily_stats rollups from the parking sessions."""
+import asyncio
+
+from src.infrastructure.persistence.database import AsyncSessionLocal
+from src.infrastructure.persistence.sqlalchemy_repositories import SQLAlchemyDailyStatsRepository
+
+
+async def rebuild_daily_stats(session_factory=AsyncSessionLocal) -> int:
+    async with session_factory() as session:
+        rows = await SQLAlchemyDailyStatsRepository(session).rebuild()
+        await session.commit()
+    print(f"Rebuilt {rows} daily_stats rows")
+    return rows
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_daily_stats())
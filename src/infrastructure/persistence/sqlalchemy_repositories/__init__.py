@@ -2,10 +2,12 @@ from .sqlalchemy_repositories import (
     SQLAlchemyVehicleRepository,
     SQLAlchemyParkingSpotRepository,
     SQLAlchemyParkingSessionRepository,
+    SQLAlchemyDailyStatsRepository,
 )
 
 __all__ = [
     "SQLAlchemyVehicleRepository",
     "SQLAlchemyParkingSpotRepository",
     "SQLAlchemyParkingSessionRepository",
+    "SQLAlchemyDailyStatsRepository",
 ]
@@ -1,35 +1,116 @@
-from typing import List, Optional, Dict
-from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from typing import AsyncIterator, List, Optional, Dict, Sequence, Set, Tuple, Union
+from datetime import date, datetime, timedelta, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, extract, update
+from sqlalchemy import select, insert, delete, func, and_, or_, update, case, cast, extract, literal, union_all, Numeric
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import selectinload
 
 from src.domain.entities import Vehicle, ParkingSpot, ParkingSession
 from src.domain.common import PaymentStatus
+from src.domain.normalization import canonical_brand, canonical_color
 from src.infrastructure.persistence.models.models import Vehicle as ORMVehicle, ParkingSpot as ORMParkingSpot, ParkingSession as ORMParkingSession
-from src.application.repositories import AbstractVehicleRepository, AbstractParkingSpotRepository, AbstractParkingSessionRepository
+from src.infrastructure.persistence.models.models import DailyStats as ORMDailyStats, DailyVehicle as ORMDailyVehicle
+from src.infrastructure.persistence.models.models import Brand as ORMBrand, Color as ORMColor, resolve_dimension_ids
+from src.infrastructure.persistence.models.models import OccupancyCounter as ORMOccupancyCounter
+from src.application.repositories import AbstractVehicleRepository, AbstractParkingSpotRepository, AbstractParkingSessionRepository, AbstractDailyStatsRepository
+from src.shared.cache import MISSING, TTLCache
+from src.shared.custom_types import UTCDateTime
+from src.shared.sql_functions import combine_scalars, hours_between
+
+
+# Repositories never commit: they flush so that generated ids are available, and the
+# surrounding unit of work (or the caller owning the session) commits once.
 
 
 class SQLAlchemyVehicleRepository(AbstractVehicleRepository):
-    def __init__(self, session: AsyncSession):
+    """Vehicle repository, optionally backed by a process-wide identity cache.
+
+    Vehicles are never updated once created, so the ``identity_cache`` (shared by
+    every session of the process) can serve ``get_by_license_plate`` and
+    ``get_by_id`` for returning commuters without a query. Only rows read from
+    the database are cached, never ones this repository inserted, so a rolled back
+    transaction cannot leave a vehicle id in the cache that does not exist.
+    """
+
+    def __init__(self, session: AsyncSession, identity_cache: Optional[TTLCache] = None):
         self.session = session
+        self.identity_cache = identity_cache
+        # Plates inserted in this (possibly uncommitted) transaction
+        self._inserted_plates: Set[str] = set()
+
+    @staticmethod
+    def _to_entity(orm_vehicle: ORMVehicle) -> Vehicle:
+        return Vehicle(
+            id=orm_vehicle.id,
+            license_plate=orm_vehicle.license_plate,
+            color=orm_vehicle.color,
+            brand=orm_vehicle.brand,
+            created_at=orm_vehicle.created_at
+        )
+
+    def _cached(self, key) -> Optional[Vehicle]:
+        if self.identity_cache is None:
+            return None
+        vehicle = self.identity_cache.get(key)
+        return None if vehicle is MISSING else vehicle
+
+    def _remember(self, vehicle: Vehicle):
+        if self.identity_cache is not None and vehicle.license_plate not in self._inserted_plates:
+            self.identity_cache.set(("vehicle_plate", vehicle.license_plate), vehicle)
+            self.identity_cache.set(("vehicle_id", vehicle.id), vehicle)
+
+    def _forget(self, license_plates: Set[str]):
+        self._inserted_plates |= license_plates
+        if self.identity_cache is None:
+            return
+        # A cached entry for a plate being inserted is a vehicle deleted since (e.g. by
+        # the duplicate cleanup): drop it and its id, by key, on the gate hot path
+        for plate in license_plates:
+            stale = self.identity_cache.pop(("vehicle_plate", plate))
+            if stale is not MISSING:
+                self.identity_cache.pop(("vehicle_id", stale.id))
 
     async def get_by_license_plate(self, license_plate: str) -> Optional[Vehicle]:
+        cached = self._cached(("vehicle_plate", license_plate.upper()))
+        if cached is not None:
+            return cached
         result = await self.session.execute(
             select(ORMVehicle).where(ORMVehicle.license_plate == license_plate.upper())
         )
         orm_vehicle = result.scalars().first()
         if orm_vehicle:
-            return Vehicle(
-                id=orm_vehicle.id,
-                license_plate=orm_vehicle.license_plate,
-                color=orm_vehicle.color,
-                brand=orm_vehicle.brand,
-                created_at=orm_vehicle.created_at
-            )
+            vehicle = self._to_entity(orm_vehicle)
+            self._remember(vehicle)
+            return vehicle
         return None
 
+    async def get_by_license_plates(self, license_plates: List[str]) -> Dict[str, Vehicle]:
+        """Resolve many plates with a single ``IN`` query, keyed by plate.
+
+        Plates found in the identity cache are left out of the query.
+        """
+        if not license_plates:
+            return {}
+        vehicles = {}
+        missing = set()
+        for plate in {plate.upper() for plate in license_plates}:
+            cached = self._cached(("vehicle_plate", plate))
+            if cached is not None:
+                vehicles[plate] = cached
+            else:
+                missing.add(plate)
+        if missing:
+            result = await self.session.execute(
+                select(ORMVehicle).where(ORMVehicle.license_plate.in_(missing))
+            )
+            for orm_vehicle in result.scalars().all():
+                vehicle = self._to_entity(orm_vehicle)
+                self._remember(vehicle)
+                vehicles[vehicle.license_plate] = vehicle
+        return vehicles
+
     async def add(self, vehicle: Vehicle) -> Vehicle:
         orm_vehicle = ORMVehicle(
             license_plate=vehicle.license_plate,
@@ -38,19 +119,52 @@ class SQLAlchemyVehicleRepository(AbstractVehicleRepository):
         )
         self.session.add(orm_vehicle)
         await self.session.flush()
-        await self.session.refresh(orm_vehicle)
-        return Vehicle(
-            id=orm_vehicle.id,
-            license_plate=orm_vehicle.license_plate,
-            color=orm_vehicle.color,
-            brand=orm_vehicle.brand,
-            created_at=orm_vehicle.created_at
+        self._forget({orm_vehicle.license_plate})
+        return self._to_entity(orm_vehicle)
+
+    async def add_many(self, vehicles: List[Vehicle]) -> List[Vehicle]:
+        """Insert many vehicles in one multi-row INSERT, returning them with their ids."""
+        if not vehicles:
+            return []
+        created_at = datetime.now(timezone.utc)
+        # Core INSERTs skip the ORM event resolving the color/brand ids: resolve them per batch
+        color_ids = await self.session.run_sync(
+            lambda session: resolve_dimension_ids(session.connection(), ORMColor, {canonical_color(v.color) for v in vehicles})
+        )
+        brand_ids = await self.session.run_sync(
+            lambda session: resolve_dimension_ids(session.connection(), ORMBrand, {canonical_brand(v.brand) for v in vehicles})
+        )
+        # RETURNING rows are matched back by plate: asking SQLAlchemy to preserve parameter
+        # order would make it fall back to one INSERT per row on SQLite
+        result = await self.session.execute(
+            insert(ORMVehicle).returning(ORMVehicle.id, ORMVehicle.license_plate),
+            [
+                {
+                    "license_plate": v.license_plate,
+                    "color": v.color,
+                    "brand": v.brand,
+                    "color_id": color_ids[canonical_color(v.color)],
+                    "brand_id": brand_ids[canonical_brand(v.brand)],
+                    "created_at": created_at,
+                } for v in vehicles
+            ]
         )
+        ids = {row.license_plate: row.id for row in result}
+        self._forget(set(ids))
+        return [
+            Vehicle(id=ids[v.license_plate], license_plate=v.license_plate, color=v.color, brand=v.brand, created_at=created_at)
+            for v in vehicles
+        ]
+
+    @staticmethod
+    def color_condition(color: str):
+        """``vehicles.color_id = <id of the canonical color>``, an indexed equality."""
+        return ORMVehicle.color_id == select(ORMColor.id).where(ORMColor.name == canonical_color(color)).scalar_subquery()
 
     async def count_by_color(self, color: str, active_only: bool = True) -> int:
         query = select(func.count(func.distinct(ORMVehicle.id))).select_from(ORMVehicle).join(ORMParkingSession)
         
-        conditions = [ORMVehicle.color.ilike(f"%{color}%")]
+        conditions = [self.color_condition(color)]
         if active_only:
             conditions.append(ORMParkingSession.exit_time.is_(None))
         
@@ -58,33 +172,39 @@ class SQLAlchemyVehicleRepository(AbstractVehicleRepository):
         result = await self.session.execute(query)
         return result.scalar() or 0
 
-    async def get_brand_distribution(self, active_only: bool = True) -> Dict[str, int]:
-        query = select(
-            ORMVehicle.brand,
-            func.count(func.distinct(ORMVehicle.id)).label('count')
-        ).select_from(ORMVehicle).join(ORMParkingSession)
-        
+    async def _distribution(self, dimension, foreign_key, active_only: bool) -> Dict[str, int]:
+        vehicle_count = func.count(func.distinct(ORMVehicle.id))
+        query = (
+            select(dimension.name, vehicle_count.label("count"))
+            .select_from(ORMVehicle)
+            .join(dimension, foreign_key == dimension.id)
+            .join(ORMParkingSession)
+        )
         if active_only:
             query = query.where(ORMParkingSession.exit_time.is_(None))
-        
-        query = query.group_by(ORMVehicle.brand).order_by(func.count(func.distinct(ORMVehicle.id)).desc())
-        
+        query = query.group_by(dimension.name).order_by(vehicle_count.desc())
+
         result = await self.session.execute(query)
-        return {row.brand: row.count for row in result if row.brand}
+        return {row.name: row.count for row in result}
+
+    async def get_brand_distribution(self, active_only: bool = True) -> Dict[str, int]:
+        return await self._distribution(ORMBrand, ORMVehicle.brand_id, active_only)
+
+    async def get_color_distribution(self, active_only: bool = True) -> Dict[str, int]:
+        return await self._distribution(ORMColor, ORMVehicle.color_id, active_only)
 
     async def get_by_id(self, vehicle_id: int) -> Optional[Vehicle]:
+        cached = self._cached(("vehicle_id", vehicle_id))
+        if cached is not None:
+            return cached
         result = await self.session.execute(
             select(ORMVehicle).where(ORMVehicle.id == vehicle_id)
         )
         orm_vehicle = result.scalars().first()
         if orm_vehicle:
-            return Vehicle(
-                id=orm_vehicle.id,
-                license_plate=orm_vehicle.license_plate,
-                color=orm_vehicle.color,
-                brand=orm_vehicle.brand,
-                created_at=orm_vehicle.created_at
-            )
+            vehicle = self._to_entity(orm_vehicle)
+            self._remember(vehicle)
+            return vehicle
         return None
 
 
@@ -112,14 +232,125 @@ class SQLAlchemyParkingSpotRepository(AbstractParkingSpotRepository):
             )
         return None
 
+    async def claim_spot(self, spot_type: str, spot_id: Optional[int] = None, max_attempts: int = 3) -> Optional[ParkingSpot]:
+        """Atomically mark a free spot as occupied and return it.
+
+        Runs ``UPDATE parking_spots SET is_occupied = 1 WHERE id = (SELECT ... LIMIT 1)
+        AND is_occupied = 0 RETURNING ...``, so two gate workers can never claim the same
+        spot. When ``spot_id`` is given (e.g. proposed by the free-spot index) only that
+        spot is tried. Returns None when no matching spot is free.
+        """
+        free_spots = and_(
+            ORMParkingSpot.is_occupied == False,
+            ORMParkingSpot.spot_type == spot_type
+        )
+        if spot_id is not None:
+            candidate = spot_id
+            max_attempts = 1
+        else:
+            candidate = (
+                select(ORMParkingSpot.id)
+                .where(free_spots)
+                .order_by(ORMParkingSpot.floor, ORMParkingSpot.spot_number)
+                .limit(1)
+                .scalar_subquery()
+            )
+        claim = (
+            update(ORMParkingSpot)
+            .where(and_(ORMParkingSpot.id == candidate, free_spots))
+            .values(is_occupied=True)
+            .returning(ORMParkingSpot.id, ORMParkingSpot.spot_number, ORMParkingSpot.floor, ORMParkingSpot.spot_type)
+        )
+        for _ in range(max_attempts):
+            row = (await self.session.execute(claim)).first()
+            if row:
+                return ParkingSpot(
+                    id=row.id,
+                    spot_number=row.spot_number,
+                    floor=row.floor,
+                    spot_type=row.spot_type,
+                    is_occupied=True
+                )
+            if spot_id is not None:
+                break
+            # Lost the race for the selected spot: retry only if another one is still free
+            still_free = await self.session.execute(select(ORMParkingSpot.id).where(free_spots).limit(1))
+            if still_free.first() is None:
+                break
+        return None
+
+    async def claim_spots(self, spot_type: str, count: int) -> List[ParkingSpot]:
+        """Atomically claim up to ``count`` free spots of a type in one statement.
+
+        Spots are returned in (floor, spot_number) order; fewer than ``count`` are
+        returned when the garage cannot satisfy the request.
+        """
+        if count <= 0:
+            return []
+        free_spots = and_(
+            ORMParkingSpot.is_occupied == False,
+            ORMParkingSpot.spot_type == spot_type
+        )
+        candidates = (
+            select(ORMParkingSpot.id)
+            .where(free_spots)
+            .order_by(ORMParkingSpot.floor, ORMParkingSpot.spot_number)
+            .limit(count)
+        )
+        result = await self.session.execute(
+            update(ORMParkingSpot)
+            .where(and_(ORMParkingSpot.id.in_(candidates), free_spots))
+            .values(is_occupied=True)
+            .returning(ORMParkingSpot.id, ORMParkingSpot.spot_number, ORMParkingSpot.floor, ORMParkingSpot.spot_type)
+        )
+        spots = [
+            ParkingSpot(
+                id=row.id, spot_number=row.spot_number, floor=row.floor, spot_type=row.spot_type, is_occupied=True
+            ) for row in result
+        ]
+        return sorted(spots, key=lambda spot: (spot.floor, spot.spot_number))
+
+    async def release_spot(self, spot_id: int) -> Optional[ParkingSpot]:
+        """Mark a spot as free and return it, in a single ``UPDATE ... RETURNING``."""
+        result = await self.session.execute(
+            update(ORMParkingSpot)
+            .where(ORMParkingSpot.id == spot_id)
+            .values(is_occupied=False)
+            .returning(ORMParkingSpot.id, ORMParkingSpot.spot_number, ORMParkingSpot.floor, ORMParkingSpot.spot_type)
+        )
+        row = result.first()
+        if row:
+            return ParkingSpot(
+                id=row.id,
+                spot_number=row.spot_number,
+                floor=row.floor,
+                spot_type=row.spot_type,
+                is_occupied=False
+            )
+        return None
+
+    async def release_spots(self, spot_ids: List[int]) -> List[ParkingSpot]:
+        """Free many spots in one ``UPDATE ... RETURNING``."""
+        if not spot_ids:
+            return []
+        result = await self.session.execute(
+            update(ORMParkingSpot)
+            .where(ORMParkingSpot.id.in_(spot_ids))
+            .values(is_occupied=False)
+            .returning(ORMParkingSpot.id, ORMParkingSpot.spot_number, ORMParkingSpot.floor, ORMParkingSpot.spot_type)
+        )
+        return [
+            ParkingSpot(
+                id=row.id, spot_number=row.spot_number, floor=row.floor, spot_type=row.spot_type, is_occupied=False
+            ) for row in result
+        ]
+
     async def update(self, spot: ParkingSpot) -> ParkingSpot:
         orm_spot = await self.session.get(ORMParkingSpot, spot.id)
         if orm_spot:
             orm_spot.is_occupied = spot.is_occupied
             # Update other fields if necessary
             await self.session.flush()
-            await self.session.refresh(orm_spot)
-            await self.session.commit()
             return ParkingSpot(
                 id=orm_spot.id,
                 spot_number=orm_spot.spot_number,
@@ -152,25 +383,44 @@ class SQLAlchemyParkingSpotRepository(AbstractParkingSpotRepository):
             )
         return None
 
+    # Counts read the trigger-maintained occupancy_counters: O(floors x types) rows
+
+    async def get_occupancy_counters(self) -> List[Dict]:
+        result = await self.session.execute(
+            select(ORMOccupancyCounter)
+            # Groups whose spots were all removed keep a zeroed row
+            .where(ORMOccupancyCounter.total > 0)
+            .order_by(ORMOccupancyCounter.floor, ORMOccupancyCounter.spot_type)
+        )
+        return [
+            {"floor": row.floor, "spot_type": row.spot_type, "total": row.total, "occupied": row.occupied}
+            for row in result.scalars().all()
+        ]
+
     async def get_total_spots_count(self) -> int:
-        result = await self.session.execute(select(func.count(ORMParkingSpot.id)))
+        result = await self.session.execute(select(func.sum(ORMOccupancyCounter.total)))
         return result.scalar() or 0
 
     async def get_occupied_spots_count(self) -> int:
-        result = await self.session.execute(
-            select(func.count(ORMParkingSpot.id)).where(ORMParkingSpot.is_occupied == True)
-        )
+        result = await self.session.execute(select(func.sum(ORMOccupancyCounter.occupied)))
         return result.scalar() or 0
 
     async def get_floor_distribution(self, active_only: bool = True) -> Dict[int, int]:
+        if active_only:
+            # Every active session holds exactly one occupied spot
+            occupied = func.sum(ORMOccupancyCounter.occupied)
+            result = await self.session.execute(
+                select(ORMOccupancyCounter.floor, occupied.label("count"))
+                .group_by(ORMOccupancyCounter.floor)
+                .having(occupied > 0)
+                .order_by(ORMOccupancyCounter.floor)
+            )
+            return {row.floor: row.count for row in result}
+
         query = select(
             ORMParkingSpot.floor,
             func.count(ORMParkingSession.id).label('count')
         ).select_from(ORMParkingSession).join(ORMParkingSpot)
-        
-        if active_only:
-            query = query.where(ORMParkingSession.exit_time.is_(None))
-        
         query = query.group_by(ORMParkingSpot.floor).order_by(ORMParkingSpot.floor)
         
         result = await self.session.execute(query)
@@ -182,13 +432,11 @@ class SQLAlchemyParkingSpotRepository(AbstractParkingSpotRepository):
             .where(ORMParkingSpot.spot_type == spot_type)
             .values(is_occupied=is_occupied)
         )
-        await self.session.commit()
 
     async def update_all_occupied(self, is_occupied: bool):
         await self.session.execute(
             update(ORMParkingSpot).values(is_occupied=is_occupied)
         )
-        await self.session.commit()
 
 
 class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
@@ -206,8 +454,6 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
         )
         orm_session = result.scalars().first()
         if orm_session:
-            # Eagerly load related vehicle and parking_spot
-            await self.session.refresh(orm_session, ["vehicle", "parking_spot"])
             return ParkingSession(
                 id=orm_session.id,
                 vehicle_id=orm_session.vehicle_id,
@@ -220,6 +466,20 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
             )
         return None
 
+    async def get_active_license_plates(self, license_plates: List[str]) -> Set[str]:
+        """Return which of the given plates currently have an active session."""
+        if not license_plates:
+            return set()
+        result = await self.session.execute(
+            select(ORMVehicle.license_plate).join(ORMParkingSession).where(
+                and_(
+                    ORMVehicle.license_plate.in_(set(license_plates)),
+                    ORMParkingSession.exit_time.is_(None)
+                )
+            )
+        )
+        return set(result.scalars().all())
+
     async def add(self, session: ParkingSession) -> ParkingSession:
         orm_session = ORMParkingSession(
             vehicle_id=session.vehicle_id,
@@ -229,8 +489,6 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
         )
         self.session.add(orm_session)
         await self.session.flush()
-        await self.session.refresh(orm_session)
-        await self.session.commit()
         return ParkingSession(
             id=orm_session.id,
             vehicle_id=orm_session.vehicle_id,
@@ -242,6 +500,37 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
             hourly_rate=session.hourly_rate,
         )
 
+    async def add_many(self, sessions: List[ParkingSession]) -> List[ParkingSession]:
+        """Insert many sessions in one multi-row INSERT, returning them with their ids.
+
+        Sessions of one batch must use distinct spots, which is how rows are matched back.
+        """
+        if not sessions:
+            return []
+        result = await self.session.execute(
+            insert(ORMParkingSession).returning(ORMParkingSession.id, ORMParkingSession.parking_spot_id),
+            [
+                {
+                    "vehicle_id": s.vehicle_id,
+                    "parking_spot_id": s.parking_spot_id,
+                    "entry_time": s.entry_time,
+                    "hourly_rate": s.hourly_rate,
+                    "payment_status": PaymentStatus.PENDING,
+                } for s in sessions
+            ]
+        )
+        ids = {row.parking_spot_id: row.id for row in result}
+        return [
+            ParkingSession(
+                id=ids[s.parking_spot_id],
+                vehicle_id=s.vehicle_id,
+                parking_spot_id=s.parking_spot_id,
+                entry_time=s.entry_time,
+                hourly_rate=s.hourly_rate,
+                payment_status=PaymentStatus.PENDING,
+            ) for s in sessions
+        ]
+
     async def get_by_id(self, session_id: int) -> Optional[ParkingSession]:
         result = await self.session.execute(
             select(ORMParkingSession).where(ORMParkingSession.id == session_id)
@@ -267,8 +556,6 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
             orm_session.amount_paid = session.amount_paid
             orm_session.payment_status = session.payment_status
             await self.session.flush()
-            await self.session.refresh(orm_session)
-            await self.session.commit()
             return ParkingSession(
                 id=orm_session.id,
                 vehicle_id=orm_session.vehicle_id,
@@ -281,7 +568,125 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
             )
         raise ValueError(f"Parking session with ID {session.id} not found.")
 
-    async def get_active_sessions(self) -> List[Dict]:
+    @staticmethod
+    def _charge(exit_time: datetime):
+        """SQL expression for the unrounded charge of a session closed at ``exit_time``."""
+        hours = hours_between(ORMParkingSession.entry_time, literal(exit_time, UTCDateTime()))
+        # Minimum charge for 1 hour
+        billed_hours = case((hours < 1.0, 1.0), else_=hours)
+        return billed_hours * ORMParkingSession.hourly_rate
+
+    @classmethod
+    def _fee(cls, exit_time: datetime):
+        """SQL expression for the fee of a session closed at ``exit_time``."""
+        return func.round(cast(cls._charge(exit_time), Numeric(12, 4)), 2)
+
+    @staticmethod
+    def _returned_columns():
+        return (
+            ORMParkingSession.id,
+            ORMParkingSession.vehicle_id,
+            ORMParkingSession.parking_spot_id,
+            ORMParkingSession.entry_time,
+            ORMParkingSession.exit_time,
+            ORMParkingSession.amount_paid,
+            ORMParkingSession.payment_status,
+            ORMParkingSession.hourly_rate,
+        )
+
+    async def close_active_session(self, license_plate: str, exit_time: datetime) -> Optional[ParkingSession]:
+        """Close the vehicle's active session and charge it, in one ``UPDATE ... RETURNING``.
+
+        The fee (at least one hour, rounded to cents) is computed by the database, so no
+        SELECT of the session is needed beforehand. Returns None when the vehicle has no
+        active session.
+        """
+        active_session_id = (
+            select(ORMParkingSession.id)
+            .join(ORMVehicle)
+            .where(
+                and_(
+                    ORMVehicle.license_plate == license_plate,
+                    ORMParkingSession.exit_time.is_(None)
+                )
+            )
+            .order_by(ORMParkingSession.entry_time.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(ORMParkingSession)
+            .where(
+                and_(
+                    ORMParkingSession.id == active_session_id,
+                    ORMParkingSession.exit_time.is_(None)
+                )
+            )
+            .values(
+                exit_time=exit_time,
+                amount_paid=self._fee(exit_time),
+                payment_status=PaymentStatus.PAID
+            )
+            .returning(*self._returned_columns())
+        )
+        row = result.first()
+        if row:
+            return ParkingSession(
+                id=row.id,
+                vehicle_id=row.vehicle_id,
+                parking_spot_id=row.parking_spot_id,
+                entry_time=row.entry_time,
+                exit_time=row.exit_time,
+                amount_paid=row.amount_paid,
+                payment_status=row.payment_status,
+                hourly_rate=row.hourly_rate,
+            )
+        return None
+
+    async def close_active_sessions(self, vehicle_ids: List[int], exit_time: datetime) -> List[ParkingSession]:
+        """Close and charge the active sessions of many vehicles in one statement."""
+        if not vehicle_ids:
+            return []
+        result = await self.session.execute(
+            update(ORMParkingSession)
+            .where(
+                and_(
+                    ORMParkingSession.vehicle_id.in_(vehicle_ids),
+                    ORMParkingSession.exit_time.is_(None)
+                )
+            )
+            .values(
+                exit_time=exit_time,
+                amount_paid=self._fee(exit_time),
+                payment_status=PaymentStatus.PAID
+            )
+            .returning(*self._returned_columns())
+        )
+        return [
+            ParkingSession(
+                id=row.id,
+                vehicle_id=row.vehicle_id,
+                parking_spot_id=row.parking_spot_id,
+                entry_time=row.entry_time,
+                exit_time=row.exit_time,
+                amount_paid=row.amount_paid,
+                payment_status=row.payment_status,
+                hourly_rate=row.hourly_rate,
+            ) for row in result
+        ]
+
+    async def get_active_sessions(self, columnar: bool = False) -> Union[List[Dict], Dict[str, tuple]]:
+        """Sessions without an exit, newest first.
+
+        With ``columnar=True`` the sessions come from one joined statement as
+        ``{column: (values...)}`` over the history columns (see ``get_sessions_page``).
+        """
+        if columnar:
+            result = await self.session.execute(
+                self._history_select(self._HISTORY_COLUMNS, status="parked")
+                .order_by(ORMParkingSession.entry_time.desc(), ORMParkingSession.id.desc())
+            )
+            return self._history_columns(result.all())
         result = await self.session.execute(
             select(ORMParkingSession).where(ORMParkingSession.exit_time.is_(None))
             .options(selectinload(ORMParkingSession.vehicle), selectinload(ORMParkingSession.parking_spot))
@@ -311,6 +716,14 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
             } for s in sessions
         ]
 
+    async def get_potential_revenue(self, at: datetime) -> float:
+        """What the parked vehicles would pay if they all left at ``at``, summed in one statement."""
+        result = await self.session.execute(
+            select(func.coalesce(func.sum(self._charge(at)), 0.0))
+            .where(ORMParkingSession.exit_time.is_(None))
+        )
+        return float(result.scalar_one())
+
     async def get_all_sessions(self) -> List[ParkingSession]:
         result = await self.session.execute(select(ORMParkingSession))
         return [
@@ -321,39 +734,215 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
             ) for s in result.scalars().all()
         ]
 
-    async def get_all_sessions_for_dashboard(self) -> List[Dict]:
-        """Retrieves all parking sessions (active and completed) with related
-        vehicle and parking spot data, optimized for dashboard display.
+    # Columns of a history row: the session plus the vehicle and spot it refers to
+    _HISTORY_COLUMNS = (
+        ORMParkingSession.id,
+        ORMParkingSession.entry_time,
+        ORMParkingSession.exit_time,
+        ORMParkingSession.amount_paid,
+        ORMParkingSession.payment_status,
+        ORMParkingSession.hourly_rate,
+        ORMVehicle.license_plate,
+        ORMVehicle.color,
+        ORMVehicle.brand,
+        ORMParkingSpot.spot_number,
+        ORMParkingSpot.floor,
+    )
+
+    @staticmethod
+    def _session_filters(
+        license_plate: Optional[str] = None,
+        floor: Optional[int] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> list:
+        """WHERE clauses shared by the history queries.
+
+        ``license_plate`` matches as a prefix, ``status`` is ``"parked"`` or ``"exited"``
+        and ``start``/``end`` bound the entry time as ``[start, end)``.
         """
-        result = await self.session.execute(
-            select(ORMParkingSession)
-            .options(
-                selectinload(ORMParkingSession.vehicle),
-                selectinload(ORMParkingSession.parking_spot)
+        filters = []
+        if license_plate:
+            filters.append(ORMVehicle.license_plate.startswith(license_plate.upper().strip(), autoescape=True))
+        if floor is not None:
+            filters.append(ORMParkingSpot.floor == floor)
+        if status == "parked":
+            filters.append(ORMParkingSession.exit_time.is_(None))
+        elif status == "exited":
+            filters.append(ORMParkingSession.exit_time.is_not(None))
+        elif status is not None:
+            raise ValueError(f"Unknown session status {status!r}, expected 'parked' or 'exited'")
+        if start is not None:
+            filters.append(ORMParkingSession.entry_time >= start)
+        if end is not None:
+            filters.append(ORMParkingSession.entry_time < end)
+        return filters
+
+    def _history_select(self, columns, **filters):
+        return (
+            select(*columns)
+            .join(ORMVehicle, ORMParkingSession.vehicle_id == ORMVehicle.id)
+            .join(ORMParkingSpot, ORMParkingSession.parking_spot_id == ORMParkingSpot.id)
+            .where(*self._session_filters(**filters))
+        )
+
+    @staticmethod
+    def _history_row(row) -> Dict:
+        return {
+            "id": row.id,
+            "entry_time": row.entry_time,
+            "exit_time": row.exit_time,
+            "amount_paid": row.amount_paid,
+            "payment_status": row.payment_status,
+            "hourly_rate": row.hourly_rate,
+            "vehicle": {
+                "license_plate": row.license_plate,
+                "color": row.color,
+                "brand": row.brand,
+            },
+            "parking_spot": {
+                "spot_number": row.spot_number,
+                "floor": row.floor,
+            },
+        }
+
+    @classmethod
+    def _history_columns(cls, rows) -> Dict[str, tuple]:
+        """History rows transposed to one tuple per column, keyed by column name."""
+        names = [column.key for column in cls._HISTORY_COLUMNS]
+        values = list(zip(*rows)) or [()] * len(names)
+        return dict(zip(names, values))
+
+    async def get_sessions_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        license_plate: Optional[str] = None,
+        floor: Optional[int] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columnar: bool = False
+    ) -> Dict:
+        """One page of session history, newest first, with vehicle and spot data.
+
+        Keyset pagination on ``(entry_time, id)``: pass the returned ``next_cursor``
+        to get the following page. Each page is a bounded index range scan, so the
+        cost does not depend on how deep into the history the page is.
+
+        With ``columnar=True`` the items are ``{column: (values...)}`` (``id``,
+        ``entry_time``, ..., ``license_plate``, ``spot_number``, ``floor``), ready
+        to become a DataFrame without building a dict per row.
+
+        Returns:
+            ``{"items": [...], "next_cursor": (entry_time, id) or None}``
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        statement = self._history_select(
+            self._HISTORY_COLUMNS, license_plate=license_plate, floor=floor, status=status, start=start, end=end
+        )
+        if cursor is not None:
+            cursor_time, cursor_id = cursor
+            statement = statement.where(
+                or_(
+                    ORMParkingSession.entry_time < cursor_time,
+                    and_(ORMParkingSession.entry_time == cursor_time, ORMParkingSession.id < cursor_id)
+                )
             )
-            .order_by(ORMParkingSession.entry_time.desc())
+        result = await self.session.execute(
+            statement
+            .order_by(ORMParkingSession.entry_time.desc(), ORMParkingSession.id.desc())
+            # One extra row tells whether another page follows
+            .limit(limit + 1)
         )
-        sessions = result.scalars().unique().all()
+        rows = result.all()
+        if columnar:
+            items = self._history_columns(rows[:limit])
+        else:
+            items = [self._history_row(row) for row in rows[:limit]]
+        next_cursor = (rows[limit - 1].entry_time, rows[limit - 1].id) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
 
-        return [
-            {
-                "id": s.id,
-                "entry_time": s.entry_time,
-                "exit_time": s.exit_time,
-                "amount_paid": s.amount_paid,
-                "payment_status": s.payment_status,
-                "hourly_rate": s.hourly_rate,
-                "vehicle": {
-                    "license_plate": s.vehicle.license_plate,
-                    "color": s.vehicle.color,
-                    "brand": s.vehicle.brand,
-                } if s.vehicle else None,
-                "parking_spot": {
-                    "spot_number": s.parking_spot.spot_number,
-                    "floor": s.parking_spot.floor,
-                } if s.parking_spot else None,
-            } for s in sessions
-        ]
+    async def _stream_chunks(self, statement, chunk_size: int) -> AsyncIterator[list]:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        result = await self.session.stream(statement.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            yield partition
+
+    async def stream_sessions(
+        self,
+        chunk_size: int = 1000,
+        license_plate: Optional[str] = None,
+        floor: Optional[int] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> AsyncIterator[List[ParkingSession]]:
+        """Yield matching sessions in id order, ``chunk_size`` entities at a time.
+
+        Rows come from a server-side cursor and plain columns (not ORM objects), so
+        memory stays bounded by one chunk however large the history is::
+
+            async for chunk in repo.stream_sessions(chunk_size=5000, status="exited"):
+                ...
+        """
+        columns = (
+            ORMParkingSession.id, ORMParkingSession.vehicle_id, ORMParkingSession.parking_spot_id,
+            ORMParkingSession.entry_time, ORMParkingSession.exit_time, ORMParkingSession.amount_paid,
+            ORMParkingSession.payment_status, ORMParkingSession.hourly_rate,
+        )
+        statement = self._history_select(
+            columns, license_plate=license_plate, floor=floor, status=status, start=start, end=end
+        ).order_by(ORMParkingSession.id)
+        async for rows in self._stream_chunks(statement, chunk_size):
+            yield [
+                ParkingSession(
+                    id=row.id, vehicle_id=row.vehicle_id, parking_spot_id=row.parking_spot_id,
+                    entry_time=row.entry_time, exit_time=row.exit_time, amount_paid=row.amount_paid,
+                    payment_status=row.payment_status, hourly_rate=row.hourly_rate
+                ) for row in rows
+            ]
+
+    async def stream_session_rows(
+        self,
+        chunk_size: int = 1000,
+        license_plate: Optional[str] = None,
+        floor: Optional[int] = None,
+        status: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> AsyncIterator[list]:
+        """Like ``stream_sessions`` but yields raw row tuples for exports.
+
+        Each row has the session columns plus ``license_plate``, ``color``, ``brand``,
+        ``spot_number`` and ``floor``; no entity is built per row.
+        """
+        statement = self._history_select(
+            self._HISTORY_COLUMNS, license_plate=license_plate, floor=floor, status=status, start=start, end=end
+        ).order_by(ORMParkingSession.id)
+        async for rows in self._stream_chunks(statement, chunk_size):
+            yield rows
+
+    async def get_monthly_fingerprints(self) -> Dict[str, Tuple]:
+        """Cheap per-month (of entry time) summary of the sessions, keyed by ``"YYYY-MM"``.
+
+        It changes whenever a session of that month is added, closed or re-rated, so the
+        Parquet export uses it to skip unchanged partitions.
+        """
+        month = func.strftime('%Y-%m', ORMParkingSession.entry_time)
+        result = await self.session.execute(
+            select(
+                month.label("month"),
+                func.count(ORMParkingSession.id),
+                func.max(ORMParkingSession.id),
+                func.count(ORMParkingSession.exit_time),
+                func.round(func.coalesce(func.sum(ORMParkingSession.amount_paid), 0.0), 2),
+            ).group_by(month)
+        )
+        return {row.month: tuple(row[1:]) for row in result}
 
     async def get_revenue_last_hours(self, hours: int = 1) -> float:
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
@@ -419,45 +1008,139 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
         
         return total_revenue / total_vehicles if total_vehicles > 0 else 0.0
 
+    @staticmethod
+    def _percentile_label(percentile: float) -> str:
+        return f"p{percentile * 100:g}"
+
+    async def _duration_stats(self, conditions: list, percentiles: Sequence[float] = (), join_vehicles: bool = False) -> Dict:
+        """Count, average and nearest-rank percentiles of closed-session durations, in one query.
+
+        Percentiles rank the durations with window functions (available on SQLite,
+        PostgreSQL and MySQL alike): ``pN`` is the smallest duration whose rank is at
+        least ``N% * count``. Without percentiles no sort is needed.
+        """
+        for percentile in percentiles:
+            if not 0 < percentile <= 1:
+                raise ValueError(f"Percentiles must be in (0, 1], got {percentile}")
+        hours = hours_between(ORMParkingSession.entry_time, ORMParkingSession.exit_time)
+        columns = [hours.label("hours")]
+        if percentiles:
+            columns += [
+                func.row_number().over(order_by=hours).label("rank"),
+                func.count().over().label("total"),
+            ]
+        durations = select(*columns).select_from(ORMParkingSession)
+        if join_vehicles:
+            durations = durations.join(ORMVehicle)
+        durations = durations.where(ORMParkingSession.exit_time.is_not(None), *conditions).subquery()
+
+        aggregates = [func.count().label("count"), func.avg(durations.c.hours).label("average")]
+        aggregates += [
+            func.min(case((durations.c.rank >= percentile * durations.c.total, durations.c.hours)))
+            .label(self._percentile_label(percentile))
+            for percentile in percentiles
+        ]
+        row = (await self.session.execute(select(*aggregates))).one()
+        stats = {"count": row.count, "average_hours": round(row.average or 0.0, 2)}
+        for percentile in percentiles:
+            value = getattr(row, self._percentile_label(percentile))
+            stats[self._percentile_label(percentile)] = round(value or 0.0, 2)
+        return stats
+
     async def get_average_duration_by_color(self, color: str) -> float:
+        stats = await self._duration_stats([SQLAlchemyVehicleRepository.color_condition(color)], join_vehicles=True)
+        return stats["average_hours"]
+
+    async def get_duration_stats_by_color(self, color: str, percentiles: Sequence[float] = (0.5, 0.9)) -> Dict:
+        return await self._duration_stats([SQLAlchemyVehicleRepository.color_condition(color)], percentiles, join_vehicles=True)
+
+    async def get_hourly_occupancy(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        bucket: timedelta = timedelta(hours=1)
+    ) -> List[Dict]:
+        """Number of sessions present in each ``bucket`` of ``[start, end)``.
+
+        Without a window, the hour-of-day profile over the whole history: for each hour
+        of the day, the sessions whose entry hour is at or before it and whose exit hour
+        (if any) is at or after it. Given only ``start`` or ``end``, the window spans one
+        day. A single query fetches the entry/exit boundaries of the sessions overlapping
+        the window; a sweep over a difference array then turns them into per-bucket
+        counts, so the cost is one bounded scan whatever the bucket count.
+        """
+        if bucket <= timedelta(0):
+            raise ValueError("bucket must be a positive duration")
+        if start is None and end is None:
+            if bucket != timedelta(hours=1):
+                raise ValueError("a bucket other than one hour needs a start or an end")
+            return await self._hour_of_day_profile()
+        if start is None:
+            start = end - timedelta(days=1)
+        if end is None:
+            end = start + timedelta(days=1)
+        # Naive bounds are read as local time, the same way UTCDateTime binds them
+        start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+        if end <= start:
+            return []
+
+        bucket_count = -(-(end - start) // bucket)
         result = await self.session.execute(
-            select(ORMParkingSession.entry_time, ORMParkingSession.exit_time).select_from(ORMParkingSession).join(ORMVehicle).where(
+            select(ORMParkingSession.entry_time, ORMParkingSession.exit_time).where(
                 and_(
-                    ORMVehicle.color.ilike(f"%{color}%"),
-                    ORMParkingSession.exit_time.is_not(None)
+                    ORMParkingSession.entry_time < end,
+                    or_(
+                        ORMParkingSession.exit_time.is_(None),
+                        ORMParkingSession.exit_time >= start
+                    )
                 )
             )
         )
-        durations = []
+
+        # deltas[i] is the change in occupancy when the sweep enters bucket i
+        deltas = [0] * (bucket_count + 1)
         for entry_time, exit_time in result:
-            if entry_time and exit_time:
-                duration = (exit_time - entry_time).total_seconds() / 3600
-                durations.append(duration)
-        
-        avg_hours = sum(durations) / len(durations) if durations else 0.0
-        return round(avg_hours, 2) if avg_hours else 0.0
+            first = max(0, (entry_time - start) // bucket)
+            last = bucket_count - 1 if exit_time is None else min(bucket_count - 1, (exit_time - start) // bucket)
+            if last < first:
+                continue
+            deltas[first] += 1
+            deltas[last + 1] -= 1
 
-    async def get_hourly_occupancy(self) -> List[Dict]:
         hourly_stats = []
-        
-        for hour in range(24):
-            result = await self.session.execute(
-                select(func.count(ORMParkingSession.id)).where(
-                    and_(
-                        extract('hour', ORMParkingSession.entry_time) <= hour,
-                        or_(
-                            ORMParkingSession.exit_time.is_(None),
-                            extract('hour', ORMParkingSession.exit_time) >= hour
-                        )
-                    )
-                )
-            )
-            count = result.scalar() or 0
+        occupancy = 0
+        for index in range(bucket_count):
+            occupancy += deltas[index]
+            bucket_start = start + index * bucket
             hourly_stats.append({
-                "hour": hour,
-                "occupancy": count
+                "hour": bucket_start.hour,
+                "bucket_start": bucket_start,
+                "occupancy": occupancy
             })
-        
+        return hourly_stats
+
+    async def _hour_of_day_profile(self) -> List[Dict]:
+        # One row per (entry hour, exit hour) pair, at most 24 x 25, swept like the buckets
+        entry_hour = extract('hour', ORMParkingSession.entry_time)
+        exit_hour = extract('hour', ORMParkingSession.exit_time)
+        result = await self.session.execute(
+            select(entry_hour, exit_hour, func.count()).group_by(entry_hour, exit_hour)
+        )
+
+        deltas = [0] * 25
+        for first, last, count in result:
+            # Still parked: present until the end of the day
+            last = 23 if last is None else last
+            if first is None or last < first:
+                continue
+            deltas[first] += count
+            deltas[last + 1] -= count
+
+        hourly_stats = []
+        occupancy = 0
+        for hour in range(24):
+            occupancy += deltas[hour]
+            hourly_stats.append({"hour": hour, "occupancy": occupancy})
         return hourly_stats
 
     async def get_revenue_by_day(self, days: int = 7) -> List[Dict]:
@@ -515,49 +1198,371 @@ class SQLAlchemyParkingSessionRepository(AbstractParkingSessionRepository):
         )
         return [{"month": row.month, "total_revenue": float(row.total_revenue) if row.total_revenue else 0.0} for row in result]
 
+    @staticmethod
+    def _period_activity(period_format: str, cutoff: Optional[datetime] = None):
+        """Entries on their entry period and paid exits on their exit period, as one row set."""
+        entries = select(
+            func.strftime(period_format, ORMParkingSession.entry_time).label("period"),
+            literal(1).label("entries"),
+            literal(0).label("exits"),
+            literal(0.0).label("revenue"),
+            literal(None, ORMParkingSession.vehicle_id.type).label("vehicle_id"),
+        )
+        exits = select(
+            func.strftime(period_format, ORMParkingSession.exit_time).label("period"),
+            literal(0).label("entries"),
+            literal(1).label("exits"),
+            func.coalesce(ORMParkingSession.amount_paid, 0.0).label("revenue"),
+            ORMParkingSession.vehicle_id,
+        ).where(ORMParkingSession.payment_status == PaymentStatus.PAID)
+        if cutoff is not None:
+            entries = entries.where(ORMParkingSession.entry_time >= cutoff)
+            exits = exits.where(ORMParkingSession.exit_time >= cutoff)
+        return union_all(entries, exits).subquery()
+
+    async def get_daily_report(self, days: int = 30) -> List[Dict]:
+        """Entry and payment counters per day, in one pass over the window."""
+        activity = self._period_activity('%Y-%m-%d', datetime.now(timezone.utc) - timedelta(days=days))
+        result = await self.session.execute(
+            select(
+                activity.c.period,
+                func.sum(activity.c.entries).label("entries"),
+                func.sum(activity.c.exits).label("exits"),
+                func.sum(activity.c.revenue).label("revenue"),
+                func.count(func.distinct(activity.c.vehicle_id)).label("distinct_vehicles"),
+            )
+            .group_by(activity.c.period)
+            .order_by(activity.c.period)
+        )
+        return [
+            {
+                "date": row.period,
+                "entries": row.entries,
+                "exits": row.exits,
+                "revenue": float(row.revenue or 0.0),
+                "distinct_vehicles": row.distinct_vehicles,
+            }
+            for row in result
+        ]
+
+    async def get_monthly_report(self) -> List[Dict]:
+        """Entry and payment counters per month, in one pass over the table."""
+        activity = self._period_activity('%Y-%m')
+        result = await self.session.execute(
+            select(
+                activity.c.period,
+                func.sum(activity.c.entries).label("entries"),
+                func.sum(activity.c.exits).label("exits"),
+                func.sum(activity.c.revenue).label("revenue"),
+            )
+            .group_by(activity.c.period)
+            .order_by(activity.c.period)
+        )
+        return [
+            {"month": row.period, "entries": row.entries, "exits": row.exits, "revenue": float(row.revenue or 0.0)}
+            for row in result
+        ]
+
     async def get_parking_analytics(self) -> Dict:
-        # Current occupancy
-        current_vehicles = await self.get_current_vehicle_count()
-        
-        # Today's revenue
+        """Top-row dashboard metrics in a single statement.
+
+        Occupancy and today's entries are indexed scalar subqueries; today's revenue
+        and average duration share one pass over today's exits with conditional
+        aggregates.
+        """
         today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-        today_revenue_result = await self.session.execute(
-            select(func.sum(ORMParkingSession.amount_paid)).where(
-                and_(
-                    ORMParkingSession.exit_time >= today_start,
-                    ORMParkingSession.payment_status == PaymentStatus.PAID
-                )
+        exited_today = (
+            select(
+                func.sum(case(
+                    (ORMParkingSession.payment_status == PaymentStatus.PAID, ORMParkingSession.amount_paid)
+                )).label("today_revenue"),
+                func.avg(hours_between(ORMParkingSession.entry_time, ORMParkingSession.exit_time)).label("average_duration_hours"),
             )
+            .where(ORMParkingSession.exit_time >= today_start)
+            .subquery()
         )
-        today_revenue = today_revenue_result.scalar() or 0.0
-        
-        # Today's vehicle count
-        today_vehicles_result = await self.session.execute(
-            select(func.count(ORMParkingSession.id)).where(
-                ORMParkingSession.entry_time >= today_start
+        statement = combine_scalars(
+            current_occupancy=select(func.count(ORMParkingSession.id)).where(ORMParkingSession.exit_time.is_(None)),
+            today_vehicles=select(func.count(ORMParkingSession.id)).where(ORMParkingSession.entry_time >= today_start),
+        ).add_columns(exited_today.c.today_revenue, exited_today.c.average_duration_hours)
+        row = (await self.session.execute(statement)).one()
+
+        return {
+            "current_occupancy": row.current_occupancy,
+            "today_revenue": round(row.today_revenue or 0.0, 2),
+            "today_vehicles": row.today_vehicles,
+            "average_duration_hours": round(row.average_duration_hours or 0.0, 2)
+        }
+
+
+def occupancy_counters_rebuild_statements() -> list:
+    """Statements that recompute ``occupancy_counters`` from ``parking_spots``.
+
+    The triggers keep the counters exact from then on; used when the table is
+    added to a database that already has spots.
+    """
+    spot_is_occupied = case((ORMParkingSpot.is_occupied == True, 1), else_=0)
+    return [
+        delete(ORMOccupancyCounter),
+        insert(ORMOccupancyCounter).from_select(
+            ["floor", "spot_type", "total", "occupied"],
+            select(
+                ORMParkingSpot.floor,
+                ORMParkingSpot.spot_type,
+                func.count(ORMParkingSpot.id),
+                func.sum(spot_is_occupied),
+            ).group_by(ORMParkingSpot.floor, ORMParkingSpot.spot_type)
+        ),
+    ]
+
+
+_DAILY_COUNTERS = ("entries", "exits", "revenue", "distinct_vehicles", "total_duration_hours")
+
+
+def daily_stats_rebuild_statements() -> list:
+    """Statements that recompute ``daily_stats`` and ``daily_vehicles`` from ``parking_sessions``.
+
+    Shared by ``SQLAlchemyDailyStatsRepository.rebuild`` and the migration that
+    backfills the rollups.
+    """
+    paid = ORMParkingSession.payment_status == PaymentStatus.PAID
+    exit_date = func.date(ORMParkingSession.exit_time)
+
+    entries = (
+        select(
+            func.date(ORMParkingSession.entry_time).label("date"),
+            ORMParkingSpot.floor,
+            ORMParkingSpot.spot_type,
+            literal(1).label("entries"),
+            literal(0).label("exits"),
+            literal(0.0).label("revenue"),
+            literal(0).label("distinct_vehicles"),
+            literal(0.0).label("total_duration_hours"),
+        )
+        .join(ORMParkingSpot, ORMParkingSession.parking_spot_id == ORMParkingSpot.id)
+    )
+    ranked_exits = (
+        select(
+            ORMParkingSession.entry_time,
+            ORMParkingSession.exit_time,
+            ORMParkingSession.amount_paid,
+            ORMParkingSession.payment_status,
+            ORMParkingSpot.floor,
+            ORMParkingSpot.spot_type,
+            # 1 for a vehicle's first paid exit of the day
+            func.row_number().over(
+                partition_by=(exit_date, ORMParkingSession.vehicle_id, ORMParkingSession.payment_status),
+                order_by=(ORMParkingSession.exit_time, ORMParkingSession.id),
+            ).label("exit_rank"),
+        )
+        .join(ORMParkingSpot, ORMParkingSession.parking_spot_id == ORMParkingSpot.id)
+        .where(ORMParkingSession.exit_time.is_not(None))
+        .subquery()
+    )
+    exits = select(
+        func.date(ranked_exits.c.exit_time).label("date"),
+        ranked_exits.c.floor,
+        ranked_exits.c.spot_type,
+        literal(0).label("entries"),
+        literal(1).label("exits"),
+        case((ranked_exits.c.payment_status == PaymentStatus.PAID, ranked_exits.c.amount_paid), else_=0.0).label("revenue"),
+        case(
+            (and_(ranked_exits.c.payment_status == PaymentStatus.PAID, ranked_exits.c.exit_rank == 1), 1), else_=0
+        ).label("distinct_vehicles"),
+        hours_between(ranked_exits.c.entry_time, ranked_exits.c.exit_time).label("total_duration_hours"),
+    )
+    events = union_all(entries, exits).subquery()
+    rollup = select(
+        events.c.date,
+        events.c.floor,
+        events.c.spot_type,
+        *(func.sum(events.c[name]) for name in _DAILY_COUNTERS),
+    ).group_by(events.c.date, events.c.floor, events.c.spot_type)
+
+    return [
+        delete(ORMDailyVehicle),
+        delete(ORMDailyStats),
+        insert(ORMDailyStats).from_select(["date", "floor", "spot_type", *_DAILY_COUNTERS], rollup),
+        insert(ORMDailyVehicle).from_select(
+            ["date", "vehicle_id"],
+            select(exit_date, ORMParkingSession.vehicle_id).where(paid).distinct(),
+        ),
+    ]
+
+
+class SQLAlchemyDailyStatsRepository(AbstractDailyStatsRepository):
+    """Reads and maintains the ``daily_stats`` rollup.
+
+    Writes are upserts, so a gate event costs one or two extra statements and never
+    reads the sessions table.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _insert(self, table):
+        dialect = self.session.bind.dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(table)
+        if dialect == "sqlite":
+            return sqlite.insert(table)
+        raise NotImplementedError(f"daily_stats upserts are not supported on {dialect}")
+
+    async def _upsert(self, rows: Dict[Tuple[date, int, str], Dict[str, float]]):
+        if not rows:
+            return
+        stmt = self._insert(ORMDailyStats).values([
+            {"date": day, "floor": floor, "spot_type": spot_type, **counters}
+            for (day, floor, spot_type), counters in rows.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ORMDailyStats.date, ORMDailyStats.floor, ORMDailyStats.spot_type],
+            set_={name: getattr(ORMDailyStats, name) + stmt.excluded[name] for name in _DAILY_COUNTERS},
+        )
+        await self.session.execute(stmt)
+
+    @staticmethod
+    def _empty_counters() -> Dict[str, float]:
+        return {"entries": 0, "exits": 0, "revenue": 0.0, "distinct_vehicles": 0, "total_duration_hours": 0.0}
+
+    @staticmethod
+    def _utc_date(value: datetime) -> date:
+        return (value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)).date()
+
+    async def record_entries(self, entries: List[Tuple[ParkingSpot, datetime]]):
+        rows = defaultdict(self._empty_counters)
+        for spot, entry_time in entries:
+            rows[(self._utc_date(entry_time), spot.floor, str(spot.spot_type))]["entries"] += 1
+        await self._upsert(rows)
+
+    async def record_exits(self, exits: List[Tuple[ParkingSession, ParkingSpot]]):
+        exits = sorted(exits, key=lambda pair: pair[0].exit_time)
+
+        # Vehicles paying for the first time that day; ON CONFLICT DO NOTHING only returns new rows
+        first_paid = set()
+        paid_keys = {
+            (self._utc_date(session.exit_time), session.vehicle_id)
+            for session, _ in exits if session.payment_status == PaymentStatus.PAID
+        }
+        if paid_keys:
+            result = await self.session.execute(
+                self._insert(ORMDailyVehicle)
+                .values([{"date": day, "vehicle_id": vehicle_id} for day, vehicle_id in paid_keys])
+                .on_conflict_do_nothing()
+                .returning(ORMDailyVehicle.date, ORMDailyVehicle.vehicle_id)
+            )
+            first_paid = {(row.date, row.vehicle_id) for row in result}
+
+        rows = defaultdict(self._empty_counters)
+        for session, spot in exits:
+            day = self._utc_date(session.exit_time)
+            counters = rows[(day, spot.floor, str(spot.spot_type))]
+            counters["exits"] += 1
+            counters["total_duration_hours"] += (session.exit_time - session.entry_time).total_seconds() / 3600
+            if session.payment_status == PaymentStatus.PAID:
+                counters["revenue"] += session.amount_paid or 0.0
+                if (day, session.vehicle_id) in first_paid:
+                    first_paid.discard((day, session.vehicle_id))
+                    counters["distinct_vehicles"] += 1
+        await self._upsert(rows)
+
+    async def rebuild(self) -> int:
+        """Recompute the rollups from ``parking_sessions``; returns the number of rollup rows."""
+        for stmt in daily_stats_rebuild_statements():
+            await self.session.execute(stmt)
+        return await self.session.scalar(select(func.count()).select_from(ORMDailyStats)) or 0
+
+    @staticmethod
+    def _cutoff_date(days: int) -> date:
+        return (datetime.now(timezone.utc) - timedelta(days=days)).date()
+
+    async def get_revenue_by_day(self, days: int = 7) -> List[Dict]:
+        result = await self.session.execute(
+            select(ORMDailyStats.date, func.sum(ORMDailyStats.revenue).label("revenue"))
+            .where(ORMDailyStats.date >= self._cutoff_date(days))
+            .group_by(ORMDailyStats.date)
+            .having(func.sum(ORMDailyStats.exits) > 0)
+            .order_by(ORMDailyStats.date)
+        )
+        return [{"date": row.date.isoformat(), "revenue": float(row.revenue or 0.0)} for row in result]
+
+    async def get_revenue_by_month(self) -> List[Dict]:
+        month = func.strftime('%Y-%m', ORMDailyStats.date)
+        result = await self.session.execute(
+            select(month.label("month"), func.sum(ORMDailyStats.revenue).label("total_revenue"))
+            .group_by(month)
+            .having(func.sum(ORMDailyStats.exits) > 0)
+            .order_by(month)
+        )
+        return [{"month": row.month, "total_revenue": float(row.total_revenue or 0.0)} for row in result]
+
+    async def get_monthly_parking_usage(self) -> List[Dict]:
+        month = func.strftime('%Y-%m', ORMDailyStats.date)
+        result = await self.session.execute(
+            select(month.label("month"), func.sum(ORMDailyStats.entries).label("session_count"))
+            .group_by(month)
+            .having(func.sum(ORMDailyStats.entries) > 0)
+            .order_by(month)
+        )
+        return [{"month": row.month, "session_count": row.session_count} for row in result]
+
+    async def get_daily_report(self, days: int = 30) -> List[Dict]:
+        result = await self.session.execute(
+            select(
+                ORMDailyStats.date,
+                func.sum(ORMDailyStats.entries).label("entries"),
+                func.sum(ORMDailyStats.exits).label("exits"),
+                func.sum(ORMDailyStats.revenue).label("revenue"),
+                func.sum(ORMDailyStats.distinct_vehicles).label("distinct_vehicles"),
             )
+            .where(ORMDailyStats.date >= self._cutoff_date(days))
+            .group_by(ORMDailyStats.date)
+            .order_by(ORMDailyStats.date)
         )
-        today_vehicles = today_vehicles_result.scalar() or 0
-        
-        # Average duration today
-        avg_duration_result = await self.session.execute(
-            select(ORMParkingSession.entry_time, ORMParkingSession.exit_time).where(
-                and_(
-                    ORMParkingSession.exit_time >= today_start,
-                    ORMParkingSession.exit_time.is_not(None)
-                )
+        return [
+            {
+                "date": row.date.isoformat(),
+                "entries": row.entries,
+                "exits": row.exits,
+                "revenue": float(row.revenue or 0.0),
+                "distinct_vehicles": row.distinct_vehicles,
+            }
+            for row in result
+        ]
+
+    async def get_monthly_report(self) -> List[Dict]:
+        month = func.strftime('%Y-%m', ORMDailyStats.date)
+        result = await self.session.execute(
+            select(
+                month.label("month"),
+                func.sum(ORMDailyStats.entries).label("entries"),
+                func.sum(ORMDailyStats.exits).label("exits"),
+                func.sum(ORMDailyStats.revenue).label("revenue"),
             )
+            .group_by(month)
+            .order_by(month)
         )
-        durations = []
-        for entry_time, exit_time in avg_duration_result:
-            if entry_time and exit_time:
-                duration = (exit_time - entry_time).total_seconds() / 3600
-                durations.append(duration)
-        avg_duration = sum(durations) / len(durations) if durations else 0.0
-        
-        return {
-            "current_occupancy": current_vehicles,
-            "today_revenue": round(today_revenue, 2),
-            "today_vehicles": today_vehicles,
-            "average_duration_hours": round(avg_duration, 2)
-        }
\ No newline at end of file
+        return [
+            {"month": row.month, "entries": row.entries, "exits": row.exits, "revenue": float(row.revenue or 0.0)}
+            for row in result
+        ]
+
+    async def get_daily_average_vehicles(self, days: int = 30) -> float:
+        result = await self.session.execute(
+            select(func.sum(ORMDailyStats.entries).label("count"))
+            .where(ORMDailyStats.date >= self._cutoff_date(days))
+            .group_by(ORMDailyStats.date)
+            .having(func.sum(ORMDailyStats.entries) > 0)
+        )
+        counts = [row.count for row in result]
+        return sum(counts) / len(counts) if counts else 0.0
+
+    async def get_average_daily_spending(self, days: int = 30) -> float:
+        result = await self.session.execute(
+            select(
+                func.sum(ORMDailyStats.revenue).label("revenue"),
+                func.sum(ORMDailyStats.distinct_vehicles).label("vehicles")
+            ).where(ORMDailyStats.date >= self._cutoff_date(days))
+        )
+        row = result.one()
+        return row.revenue / row.vehicles if row.vehicles else 0.0
@@ -0,0 +1,5 @@
+from .sqlalchemy_unit_of_work import SQLAlchemyUnitOfWork
+
+__all__ = [
+    "SQLAlchemyUnitOfWork",
+]
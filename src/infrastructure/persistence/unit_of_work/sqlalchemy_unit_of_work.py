@@ -0,0 +1,70 @@
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.application.unit_of_work import AbstractUnitOfWork
+from src.shared.cache import TTLCache
+from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import (
+    SQLAlchemyVehicleRepository,
+    SQLAlchemyParkingSpotRepository,
+    SQLAlchemyParkingSessionRepository,
+    SQLAlchemyDailyStatsRepository,
+)
+
+
+class SQLAlchemyUnitOfWork(AbstractUnitOfWork):
+    """Unit of work owning a single ``AsyncSession``.
+
+    Usage::
+
+        async with SQLAlchemyUnitOfWork(AsyncSessionLocal) as uow:
+            service = ParkingService.from_unit_of_work(uow)
+            await service.register_vehicle_entry(...)
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], identity_cache: Optional[TTLCache] = None):
+        self.session_factory = session_factory
+        # Process-wide cache of immutable rows (vehicles), shared across units of work
+        self.identity_cache = identity_cache
+        self.session: Optional[AsyncSession] = None
+        # False for a session handed over by the caller, who keeps closing it (see for_session)
+        self.owns_session = True
+
+    @classmethod
+    def for_session(cls, session: AsyncSession, identity_cache: Optional[TTLCache] = None) -> "SQLAlchemyUnitOfWork":
+        """Unit of work over a session the caller already holds.
+
+        Ready without ``async with``: ``commit`` and ``rollback`` act on ``session``,
+        which is left open for the caller to close.
+        """
+        uow = cls(lambda: session, identity_cache=identity_cache)
+        uow.owns_session = False
+        uow._bind(session)
+        return uow
+
+    def _bind(self, session: AsyncSession):
+        self.session = session
+        self.vehicle_repo = SQLAlchemyVehicleRepository(self.session, identity_cache=self.identity_cache)
+        self.parking_spot_repo = SQLAlchemyParkingSpotRepository(self.session)
+        self.parking_session_repo = SQLAlchemyParkingSessionRepository(self.session)
+        self.daily_stats_repo = SQLAlchemyDailyStatsRepository(self.session)
+
+    async def __aenter__(self) -> "SQLAlchemyUnitOfWork":
+        """Opens a session and the repositories sharing it."""
+        if self.owns_session:
+            self._bind(self.session_factory())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Rolls back if the block raised, then closes the session it opened."""
+        try:
+            await super().__aexit__(exc_type, exc, tb)
+        finally:
+            if self.owns_session:
+                await self.session.close()
+
+    async def commit(self):
+        await self.session.commit()
+
+    async def rollback(self):
+        await self.session.rollback()
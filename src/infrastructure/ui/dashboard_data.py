@@ -0,0 +1,207 @@
+"""Data behind the parking dashboard, fetched in one coroutine per section."""
+import asyncio
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.application.services.analytics_service import AnalyticsService
+from src.application.services.cached_analytics_service import CachedAnalyticsService
+from src.application.services.parking_service import ParkingService
+from src.infrastructure.persistence.models.models import (
+    OccupancyCounter as ORMOccupancyCounter,
+    ParkingSession as ORMParkingSession,
+    Vehicle as ORMVehicle,
+)
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
+from src.shared.cache import MISSING, SingleFlight, TTLCache
+from src.shared.sql_functions import combine_scalars
+
+
+def _frozen(value: Any) -> Any:
+    """Read-only copy of a loaded payload: mappings become ``MappingProxyType``, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _frozen(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(item) for item in value)
+    return value
+
+
+def _frozen_columns(columns: Mapping[str, tuple]) -> Mapping[str, tuple]:
+    """Read-only view of ``{column: (values...)}``; the tuples are kept, not copied value by value."""
+    return MappingProxyType(dict(columns))
+
+
+class Counters(NamedTuple):
+    """Occupancy, today's figures and what the parked vehicles would pay: the metric tiles.
+
+    Aggregates only; the parked vehicles themselves are ``load_active_sessions``'s.
+    """
+    status: Mapping
+    analytics: Mapping
+    potential_revenue: float
+    loaded_at: datetime
+
+    @property
+    def active_count(self) -> int:
+        return self.analytics["current_occupancy"]
+
+
+class MonthlyReport(NamedTuple):
+    revenue_by_month: Tuple[Mapping, ...]
+    monthly_parking_usage: Tuple[Mapping, ...]
+
+
+class DashboardDataLoader:
+    """Loads the dashboard one section at a time, running a section's independent reads concurrently.
+
+    Every read gets its own session from ``session_factory`` (a pooled read
+    engine), so a load waits for its slowest query rather than their sum. Sections
+    are shared between viewers, so their payloads are frozen (mappings are
+    ``MappingProxyType``, lists tuples) and a viewer cannot change another's copy.
+    """
+
+    COUNTER_METRICS = frozenset({"parking_status", "parking_analytics"})
+    MONTHLY_METRICS = frozenset({"revenue_by_month", "monthly_parking_usage"})
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        analytics_cache: Optional[TTLCache] = None,
+        history_page_size: int = 50
+    ):
+        self.session_factory = session_factory
+        self.analytics_cache = analytics_cache
+        self.history_page_size = history_page_size
+
+    # Changes with every entry (a new session id, one more occupied spot) and exit (one
+    # fewer), and with spots added or removed. Maxima come from the primary key indexes
+    # and sums from occupancy_counters (one row per floor and type), so the probe is a
+    # few index lookups, and writers never touch a shared row to keep it current.
+    _DATA_VERSION = combine_scalars(
+        last_session=select(func.max(ORMParkingSession.id)),
+        last_vehicle=select(func.max(ORMVehicle.id)),
+        occupied=select(func.sum(ORMOccupancyCounter.occupied)),
+        spots=select(func.sum(ORMOccupancyCounter.total)),
+    )
+
+    async def data_version(self) -> Tuple:
+        """Fingerprint of the dashboard's data: equal fingerprints, same dashboard.
+
+        In-place edits that move none of its parts (say, a corrected amount) are
+        picked up when the cached sections expire (``CachedDashboardDataLoader.MAX_AGES``).
+        """
+        async with self.session_factory() as session:
+            return tuple((await session.execute(self._DATA_VERSION)).one())
+
+    def _unit_of_work(self) -> SQLAlchemyUnitOfWork:
+        return SQLAlchemyUnitOfWork(self.session_factory)
+
+    async def _metrics(self, requested: frozenset) -> Dict:
+        async with self._unit_of_work() as uow:
+            analytics = AnalyticsService.from_unit_of_work(uow, unit_of_work_factory=self._unit_of_work)
+            if self.analytics_cache is not None:
+                analytics = CachedAnalyticsService(analytics, self.analytics_cache)
+            return await analytics.get_metrics(requested)
+
+    async def _potential_revenue(self, at: datetime) -> float:
+        async with self._unit_of_work() as uow:
+            return await ParkingService.from_unit_of_work(uow).get_potential_revenue(at)
+
+    async def load_counters(self) -> Counters:
+        loaded_at = datetime.now(timezone.utc)
+        metrics, potential_revenue = await asyncio.gather(
+            self._metrics(self.COUNTER_METRICS), self._potential_revenue(loaded_at)
+        )
+        return Counters(
+            status=_frozen(metrics["parking_status"]),
+            analytics=_frozen(metrics["parking_analytics"]),
+            potential_revenue=potential_revenue,
+            loaded_at=loaded_at,
+        )
+
+    async def load_active_sessions(self) -> Mapping[str, tuple]:
+        """Parked vehicles, newest first, column-oriented: ``{column: (values...)}``."""
+        async with self._unit_of_work() as uow:
+            return _frozen_columns(await ParkingService.from_unit_of_work(uow).get_active_sessions(columnar=True))
+
+    async def load_history(
+        self,
+        history_cursor: Optional[Tuple[datetime, int]] = None,
+        history_filters: Optional[Dict] = None
+    ) -> Mapping:
+        async with self._unit_of_work() as uow:
+            page = await ParkingService.from_unit_of_work(uow).get_sessions_page(
+                limit=self.history_page_size, cursor=history_cursor, columnar=True, **(history_filters or {})
+            )
+        return MappingProxyType({"items": _frozen_columns(page["items"]), "next_cursor": page["next_cursor"]})
+
+    async def load_monthly(self) -> MonthlyReport:
+        metrics = await self._metrics(self.MONTHLY_METRICS)
+        return MonthlyReport(
+            revenue_by_month=_frozen(metrics["revenue_by_month"]),
+            monthly_parking_usage=_frozen(metrics["monthly_parking_usage"]),
+        )
+
+
+class CachedDashboardDataLoader:
+    """``DashboardDataLoader`` shared by every viewer of the process.
+
+    Each section is cached by data version (``DashboardDataLoader.data_version``) and
+    arguments, so viewers reuse one copy until a write changes the data, and concurrent
+    misses for the same key are loaded once. A hit only costs the version probe;
+    database load follows the write rate rather than the number of viewers. ``MAX_AGES``
+    bounds how long a section is served without a version change, since "today", the
+    potential revenue and edits the version does not see also move.
+    """
+
+    MAX_AGES: Dict[str, float] = {
+        "counters": 30.0,
+        "active_sessions": 30.0,
+        "history": 30.0,
+        "monthly": 300.0,
+    }
+
+    def __init__(self, loader: DashboardDataLoader, cache: TTLCache, max_ages: Optional[Dict[str, float]] = None):
+        self.loader = loader
+        self.cache = cache
+        self.max_ages = {**self.MAX_AGES, **(max_ages or {})}
+        self._single_flight = SingleFlight()
+
+    async def _cached(self, section: str, arguments: tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+        key = (section, await self.loader.data_version(), *arguments)
+        value = self.cache.get(key)
+        if value is MISSING:
+            value = await self._single_flight.do(key, lambda: self._load(key, load))
+        return value
+
+    async def _load(self, key: tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = await load()
+        self.cache.set(key, value, ttl=self.max_ages[key[0]])
+        return value
+
+    @staticmethod
+    def _history_arguments(history_cursor, history_filters: Optional[Dict]) -> tuple:
+        return (history_cursor, tuple(sorted((history_filters or {}).items())))
+
+    async def load_counters(self) -> Counters:
+        return await self._cached("counters", (), self.loader.load_counters)
+
+    async def load_active_sessions(self) -> Mapping[str, tuple]:
+        return await self._cached("active_sessions", (), self.loader.load_active_sessions)
+
+    async def load_history(
+        self,
+        history_cursor: Optional[Tuple[datetime, int]] = None,
+        history_filters: Optional[Dict] = None
+    ) -> Mapping:
+        return await self._cached(
+            "history",
+            self._history_arguments(history_cursor, history_filters),
+            lambda: self.loader.load_history(history_cursor, history_filters),
+        )
+
+    async def load_monthly(self) -> MonthlyReport:
+        return await self._cached("monthly", (), self.loader.load_monthly)
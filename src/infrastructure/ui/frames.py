@@ -0,0 +1,75 @@
+"""DataFrames behind the dashboard tables, built column by column.
+
+The repository hands over ``{column: (values...)}`` (``columnar=True``), which the
+dashboard caches and shares between viewers as is; each render builds its own frame
+from those read-only columns. Durations and revenue are computed on whole arrays
+and values stay numeric, so display formatting (dates, currency) is left to the
+table's column configuration.
+"""
+from datetime import datetime
+from typing import Dict, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+HOUR = pd.Timedelta(hours=1)
+
+# Repeated, low-cardinality text: stored once per distinct value
+CATEGORY_COLUMNS = {"color": "Color", "brand": "Brand", "spot_number": "Spot"}
+
+
+def _timestamps(values: Sequence) -> pd.DatetimeIndex:
+    """Timezone-aware datetimes (``None`` for missing) as one UTC index."""
+    if isinstance(values, pd.DatetimeIndex):
+        return values
+    missing = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    if not missing.any():
+        timestamps = pd.DatetimeIndex(values)
+        return timestamps.tz_localize("UTC") if timestamps.tz is None else timestamps.tz_convert("UTC")
+    # A None sends pandas down its per-object path: convert the present values only
+    timestamps = np.full(len(values), np.datetime64("NaT", "ns"))
+    timestamps[~missing] = _timestamps([value for value in values if value is not None]).tz_convert(None)
+    return pd.DatetimeIndex(timestamps).tz_localize("UTC")
+
+
+def potential_revenue(entry_time: Sequence, hourly_rate: Sequence, at: datetime) -> np.ndarray:
+    """Fee of each session if it ended at ``at``: at least one hour at its rate."""
+    hours = ((at - _timestamps(entry_time)) / HOUR).to_numpy()
+    return np.maximum(1.0, hours) * np.asarray(hourly_rate, dtype=float)
+
+
+def _vehicle_columns(columns: Mapping[str, Sequence]) -> Dict[str, object]:
+    frame = {"License Plate": columns["license_plate"]}
+    for name, title in CATEGORY_COLUMNS.items():
+        frame[title] = pd.Categorical(columns[name])
+    return frame
+
+
+def active_sessions_frame(columns: Mapping[str, Sequence], at: datetime) -> pd.DataFrame:
+    """Currently parked vehicles, with their duration and potential revenue at ``at``."""
+    entry_time = _timestamps(columns["entry_time"])
+    return pd.DataFrame({
+        **_vehicle_columns(columns),
+        "Floor": columns["floor"],
+        "Entry Time": entry_time,
+        "Duration (hours)": ((at - entry_time) / HOUR).to_numpy().round(2),
+        "Potential Revenue": potential_revenue(entry_time, columns["hourly_rate"], at),
+    })
+
+
+def history_frame(columns: Mapping[str, Sequence], at: datetime) -> pd.DataFrame:
+    """History page; parked sessions are measured up to ``at`` and have no final revenue."""
+    entry_time = _timestamps(columns["entry_time"])
+    exit_time = _timestamps(columns["exit_time"])
+    parked = exit_time.isna()
+    return pd.DataFrame({
+        "Status": pd.Categorical.from_codes(parked.astype(np.int8), ["Exited", "Parked"]),
+        **_vehicle_columns(columns),
+        "Entry Time": entry_time,
+        "Exit Time": exit_time,
+        "Duration (hours)": ((exit_time.fillna(at) - entry_time) / HOUR).to_numpy().round(2),
+        "Final Revenue": np.asarray(columns["amount_paid"], dtype=float),
+        "Potential Revenue": np.where(
+            parked, potential_revenue(entry_time, columns["hourly_rate"], at), np.nan
+        ),
+    })
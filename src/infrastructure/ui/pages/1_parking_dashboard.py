@@ -1,20 +1,23 @@
-import asyncio
-import time
 from datetime import datetime, timezone
 from dateutil.relativedelta import relativedelta
 
 import pandas as pd
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 
 from src.infrastructure.persistence.database import AsyncSessionLocal
 from src.infrastructure.api.schemas.parking import SpotType, VehicleEntry, VehicleExit
-from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import (
-    SQLAlchemyVehicleRepository,
-    SQLAlchemyParkingSpotRepository,
-    SQLAlchemyParkingSessionRepository,
-)
-from src.application.services.analytics_service import AnalyticsService
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
+from src.application.services.cached_analytics_service import CachedAnalyticsService
 from src.application.services.parking_service import ParkingService
+from src.infrastructure.ui.frames import active_sessions_frame, history_frame
+from src.infrastructure.ui.shared_resources import (
+    get_analytics_cache,
+    get_async_runner,
+    get_dashboard_loader,
+    get_identity_cache,
+    get_spot_index,
+)
 
 
 st.set_page_config(
@@ -28,56 +31,37 @@ st.title("🚗 Parking Management Dashboard")
 
 
 
-async def get_parking_status():
-    async with AsyncSessionLocal() as db:
-        vehicle_repo = SQLAlchemyVehicleRepository(db)
-        spot_repo = SQLAlchemyParkingSpotRepository(db)
-        session_repo = SQLAlchemyParkingSessionRepository(db)
-        service = ParkingService(vehicle_repo, spot_repo, session_repo)
-        return await service.get_parking_status()
-
-
-async def get_active_sessions():
-    async with AsyncSessionLocal() as db:
-        vehicle_repo = SQLAlchemyVehicleRepository(db)
-        spot_repo = SQLAlchemyParkingSpotRepository(db)
-        session_repo = SQLAlchemyParkingSessionRepository(db)
-        service = ParkingService(vehicle_repo, spot_repo, session_repo)
-        return await service.get_active_sessions()
-
-
-async def get_all_sessions():
-    async with AsyncSessionLocal() as db:
-        vehicle_repo = SQLAlchemyVehicleRepository(db)
-        spot_repo = SQLAlchemyParkingSpotRepository(db)
-        session_repo = SQLAlchemyParkingSessionRepository(db)
-        service = ParkingService(vehicle_repo, spot_repo, session_repo)
-        return await service.get_all_sessions_for_dashboard()
-
+def history_filters_from_state() -> dict:
+    """History filters from the tab's widgets.
 
-async def get_analytics():
-    async with AsyncSessionLocal() as db:
-        vehicle_repo = SQLAlchemyVehicleRepository(db)
-        session_repo = SQLAlchemyParkingSessionRepository(db)
-        spot_repo = SQLAlchemyParkingSpotRepository(db)
-        analytics = AnalyticsService(vehicle_repo, session_repo, spot_repo)
-        return await analytics.get_parking_analytics()
+    Read before the widgets are drawn, so a changed filter resets the page cursor
+    before the page is loaded.
+    """
+    history_floor = st.session_state.get("history_floor", "All")
+    history_status = st.session_state.get("history_status", "All")
+    history_dates = st.session_state.get("history_dates", ())
+    history_filters = {
+        "license_plate": st.session_state.get("history_plate") or None,
+        "floor": None if history_floor == "All" else history_floor,
+        "status": None if history_status == "All" else history_status.lower(),
+    }
+    if len(history_dates) == 2:
+        history_filters["start"] = datetime.combine(history_dates[0], datetime.min.time(), tzinfo=timezone.utc)
+        history_filters["end"] = datetime.combine(history_dates[1] + relativedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    return history_filters
 
 
-async def get_analytics_service():
-    async with AsyncSessionLocal() as db:
-        vehicle_repo = SQLAlchemyVehicleRepository(db)
-        session_repo = SQLAlchemyParkingSessionRepository(db)
-        spot_repo = SQLAlchemyParkingSpotRepository(db)
-        return AnalyticsService(vehicle_repo, session_repo, spot_repo)
+def rerun_section():
+    """Rerun only the calling fragment, or the whole page when it is drawn by a full run."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
 
 
 async def register_entry(vehicle_data):
-    async with AsyncSessionLocal() as db:
-        vehicle_repo = SQLAlchemyVehicleRepository(db)
-        spot_repo = SQLAlchemyParkingSpotRepository(db)
-        session_repo = SQLAlchemyParkingSessionRepository(db)
-        service = ParkingService(vehicle_repo, spot_repo, session_repo)
+    async with SQLAlchemyUnitOfWork(AsyncSessionLocal, identity_cache=identity_cache) as uow:
+        service = ParkingService.from_unit_of_work(uow, spot_index=spot_index, listeners=[invalidate_analytics])
         return await service.register_vehicle_entry(
             license_plate=vehicle_data.license_plate,
             color=vehicle_data.color,
@@ -87,72 +71,90 @@ async def register_entry(vehicle_data):
 
 
 async def register_exit(exit_data):
-    async with AsyncSessionLocal() as db:
-        vehicle_repo = SQLAlchemyVehicleRepository(db)
-        spot_repo = SQLAlchemyParkingSpotRepository(db)
-        session_repo = SQLAlchemyParkingSessionRepository(db)
-        service = ParkingService(vehicle_repo, spot_repo, session_repo)
+    async with SQLAlchemyUnitOfWork(AsyncSessionLocal, identity_cache=identity_cache) as uow:
+        service = ParkingService.from_unit_of_work(uow, spot_index=spot_index, listeners=[invalidate_analytics])
         return await service.register_vehicle_exit(exit_data.license_plate)
 
 
-# Get current status
-status = asyncio.run(get_parking_status())
-analytics = asyncio.run(get_analytics())
-active_sessions = asyncio.run(get_active_sessions())
-all_sessions = asyncio.run(get_all_sessions())
-analytics_service_instance = asyncio.run(get_analytics_service())
-
-# Calculate potential revenue
-current_time = datetime.now(timezone.utc)
-potential_revenue = sum([
-    max(1.0, (current_time - s['entry_time']).total_seconds() / 3600) * s['hourly_rate']
-    for s in active_sessions
-]) if active_sessions else 0
-
-# Main dashboard metrics
-col1, col2, col3, col4, col5 = st.columns(5)
-
-with col1:
-    st.metric(
-        "Total Spots",
-        status['total_spots'],
-        delta=None
-    )
+HISTORY_PAGE_SIZE = 50
+
+# Seconds between refreshes of each dashboard section
+REFRESH_SECONDS = {
+    "tiles": 1,
+    "active_sessions": 5,
+    "floors": 5,
+    "analytics": 10,
+    "monthly": 300,
+}
+
+# Tables hold raw values; dates and amounts are formatted by the browser
+ENTRY_TIME_COLUMN = st.column_config.DatetimeColumn("Entry Time", format="YYYY-MM-DD HH:mm")
+ACTIVE_SESSIONS_COLUMN_CONFIG = {
+    "Entry Time": ENTRY_TIME_COLUMN,
+    "Potential Revenue": st.column_config.NumberColumn("Potential Revenue", format="$%.2f"),
+}
+HISTORY_COLUMN_CONFIG = {
+    **ACTIVE_SESSIONS_COLUMN_CONFIG,
+    "Exit Time": st.column_config.DatetimeColumn("Exit Time", format="YYYY-MM-DD HH:mm"),
+    "Final Revenue": st.column_config.NumberColumn("Final Revenue", format="$%.2f"),
+}
+
+# Seeded on the first run only; shared by every session of this process
+runner = get_async_runner()
+spot_index = get_spot_index()
+analytics_cache = get_analytics_cache()
+identity_cache = get_identity_cache()
+invalidate_analytics = CachedAnalyticsService.invalidation_listener(analytics_cache)
+loader = get_dashboard_loader(HISTORY_PAGE_SIZE)
+
+
+# Each section is a fragment with its own cadence: it reruns alone, on its timer or
+# on its own widgets, instead of the whole script. A refresh without new writes
+# only costs the data-version probe (see CachedDashboardDataLoader).
+@st.fragment(run_every=REFRESH_SECONDS["tiles"])
+def metrics_row():
+    counters = runner.run(loader.load_counters())
+    col1, col2, col3, col4, col5 = st.columns(5)
 
-with col2:
-    st.metric(
-        "Occupied",
-        status['occupied_spots'],
-        delta=f"{status['occupancy_rate']}%"
-    )
+    with col1:
+        st.metric(
+            "Total Spots",
+            counters.status['total_spots'],
+            delta=None
+        )
 
-with col3:
-    st.metric(
-        "Available",
-        status['available_spots'],
-        delta=None
-    )
+    with col2:
+        st.metric(
+            "Occupied",
+            counters.status['occupied_spots'],
+            delta=f"{counters.status['occupancy_rate']}%"
+        )
 
-with col4:
-    st.metric(
-        "Today's Revenue",
-        f"${analytics['today_revenue']:.2f}",
-        delta=f"{analytics['today_vehicles']} vehicles"
-    )
+    with col3:
+        st.metric(
+            "Available",
+            counters.status['available_spots'],
+            delta=None
+        )
 
-with col5:
-    st.metric(
-        "Potential Revenue",
-        f"${potential_revenue:.2f}",
-        delta=f"{len(active_sessions)} active",
-        help="Revenue if all current vehicles exit now"
-    )
+    with col4:
+        st.metric(
+            "Today's Revenue",
+            f"${counters.analytics['today_revenue']:.2f}",
+            delta=f"{counters.analytics['today_vehicles']} vehicles"
+        )
 
-# Tabs for different functions
-tab1, tab2, tab3, tab4, tab5 = st.tabs(
-    ["Vehicle Entry/Exit", "Current Status", "Parking History", "Floor Overview", "Analytics"])
+    with col5:
+        st.metric(
+            "Potential Revenue",
+            f"${counters.potential_revenue:.2f}",
+            delta=f"{counters.active_count} active",
+            help="Revenue if all current vehicles exit now"
+        )
 
-with tab1:
+
+@st.fragment
+def entry_exit_forms():
     col1, col2 = st.columns(2)
 
     with col1:
@@ -174,12 +176,10 @@ with tab1:
                             brand=brand,
                             spot_type=spot_type
                         )
-                        session = asyncio.run(register_entry(vehicle_data))
+                        session = runner.run(register_entry(vehicle_data))
                         st.success(
                             f"✅ Vehicle {license_plate} assigned to spot {session['parking_spot']['spot_number']}")
                         st.balloons()
-                        # Force refresh to update metrics
-                        st.rerun()
                     except Exception as e:
                         st.error(f"❌ Error: {str(e)}")
                 else:
@@ -195,73 +195,77 @@ with tab1:
                 if exit_license:
                     try:
                         exit_data = VehicleExit(license_plate=exit_license)
-                        payment = asyncio.run(register_exit(exit_data))
+                        payment = runner.run(register_exit(exit_data))
                         st.success(f"✅ Vehicle {payment['license_plate']} exited")
                         st.info(
                             f"Duration: {payment['duration_hours']:.2f} hours")
                         st.info(f"💰 Amount Due: ${payment['amount_due']:.2f}")
-                        # Wait a moment to show the info, then refresh
-                        time.sleep(2)
-                        st.rerun()
                     except Exception as e:
                         st.error(f"❌ Error: {str(e)}")
                 else:
                     st.error("Please enter license plate")
 
-with tab2:
+
+@st.fragment(run_every=REFRESH_SECONDS["active_sessions"])
+def active_sessions_table():
     st.subheader("🚗 Currently Parked Vehicles")
 
-    sessions = active_sessions # Use the already fetched active sessions
-
-    if sessions:
-        # Calculate potential revenue for each session
-        current_time = datetime.now(timezone.utc)
-        df_sessions = pd.DataFrame([
-            {
-                "License Plate": s['vehicle']['license_plate'],
-                "Color": s['vehicle']['color'],
-                "Brand": s['vehicle']['brand'],
-                "Spot": s['parking_spot']['spot_number'],
-                "Floor": s['parking_spot']['floor'],
-                "Entry Time": s['entry_time'].strftime("%Y-%m-%d %H:%M"),
-                "Duration (hours)": round((current_time - s['entry_time']).total_seconds() / 3600, 2),
-                "Potential Revenue": f"${max(1.0, (current_time - s['entry_time']).total_seconds() / 3600) * s['hourly_rate']:.2f}"
-            }
-            for s in sessions
-        ])
+    active_sessions = runner.run(loader.load_active_sessions())
 
-        st.dataframe(df_sessions, use_container_width=True)
+    if active_sessions["id"]:
+        df_sessions = active_sessions_frame(active_sessions, datetime.now(timezone.utc))
+        st.dataframe(df_sessions, use_container_width=True, column_config=ACTIVE_SESSIONS_COLUMN_CONFIG)
     else:
         st.info("No vehicles currently parked")
 
-with tab3:
-    st.subheader("📜 Parking History")
 
-    if all_sessions:
-        current_time = datetime.now(timezone.utc)
-        df_history = pd.DataFrame([
-            {
-                "Status": "Exited" if s['exit_time'] else "Parked",
-                "License Plate": s['vehicle']['license_plate'],
-                "Color": s['vehicle']['color'],
-                "Brand": s['vehicle']['brand'],
-                "Spot": s['parking_spot']['spot_number'],
-                "Entry Time": s['entry_time'].strftime("%Y-%m-%d %H:%M"),
-                "Exit Time": s['exit_time'].strftime("%Y-%m-%d %H:%M") if s['exit_time'] else "N/A",
-                "Duration (hours)": round((s['exit_time'] - s['entry_time']).total_seconds() / 3600, 2) if s['exit_time'] else round((current_time - s['entry_time']).total_seconds() / 3600, 2),
-                "Final Revenue": f"${s['amount_paid']:.2f}" if s['amount_paid'] is not None else "N/A",
-                "Potential Revenue": f"${max(1.0, (current_time - s['entry_time']).total_seconds() / 3600) * s['hourly_rate']:.2f}" if not s['exit_time'] else "N/A"
-            }
-            for s in all_sessions
-        ])
+@st.fragment
+def parking_history():
+    st.subheader("📜 Parking History")
 
-        st.dataframe(df_history, use_container_width=True)
+    # A new filter restarts from the first page; the cursor stack allows going back
+    history_filters = history_filters_from_state()
+    if st.session_state.get("history_filters") != history_filters:
+        st.session_state.history_filters = history_filters
+        st.session_state.history_cursors = [None]
+    floors = runner.run(loader.load_counters()).status['floors']
+
+    # Filters are applied in the query; pages are fetched with a keyset cursor
+    col_plate, col_floor, col_status, col_dates = st.columns(4)
+    with col_plate:
+        st.text_input("License plate", key="history_plate")
+    with col_floor:
+        st.selectbox("Floor", ["All"] + [floor['floor'] for floor in floors], key="history_floor")
+    with col_status:
+        st.selectbox("Status", ["All", "Parked", "Exited"], key="history_status")
+    with col_dates:
+        st.date_input("Entry date", value=(), key="history_dates")
+
+    history_page = runner.run(loader.load_history(st.session_state.history_cursors[-1], history_filters))
+
+    if history_page["items"]["id"]:
+        df_history = history_frame(history_page["items"], datetime.now(timezone.utc))
+        st.dataframe(df_history, use_container_width=True, column_config=HISTORY_COLUMN_CONFIG)
     else:
-        st.info("No parking sessions recorded yet.")
-
-
-with tab4:
+        st.info("No parking sessions match these filters.")
+
+    col_prev_page, col_page, col_next_page = st.columns([1, 2, 1])
+    with col_prev_page:
+        if st.button("Previous page", key="history_prev", disabled=len(st.session_state.history_cursors) == 1):
+            st.session_state.history_cursors.pop()
+            rerun_section()
+    with col_page:
+        st.caption(f"Page {len(st.session_state.history_cursors)}")
+    with col_next_page:
+        if st.button("Next page", key="history_next", disabled=history_page["next_cursor"] is None):
+            st.session_state.history_cursors.append(history_page["next_cursor"])
+            rerun_section()
+
+
+@st.fragment(run_every=REFRESH_SECONDS["floors"])
+def floor_overview():
     st.subheader("🏢 Floor Overview")
+    status = runner.run(loader.load_counters()).status
 
     # Create floor visualization
     floors_data = []
@@ -281,8 +285,12 @@ with tab4:
         color=["#FF6B6B", "#4ECDC4"]
     )
 
-with tab5:
+
+@st.fragment(run_every=REFRESH_SECONDS["analytics"])
+def analytics_overview():
     st.subheader("📊 Parking Analytics")
+    counters = runner.run(loader.load_counters())
+    status, analytics = counters.status, counters.analytics
 
     # Overview Section
     st.subheader("Overview")
@@ -308,14 +316,16 @@ with tab5:
             st.write(
                 f"Floor {floor['floor']}: {floor['occupied']}/{floor['total']} occupied")
 
-    st.markdown("---") # Separator
 
+@st.fragment(run_every=REFRESH_SECONDS["monthly"])
+def monthly_report():
     # Monthly Report Section
     st.subheader("Monthly Report")
 
     # Monthly Filter and Navigation
-    monthly_revenue_data = asyncio.run(analytics_service_instance.get_revenue_by_month())
-    monthly_usage_data = asyncio.run(analytics_service_instance.get_monthly_parking_usage())
+    monthly_report = runner.run(loader.load_monthly())
+    monthly_revenue_data = monthly_report.revenue_by_month
+    monthly_usage_data = monthly_report.monthly_parking_usage
 
     # Extract all unique months and sort them
     all_months_str = sorted(list(set([m['month'] for m in monthly_revenue_data] + [m['month'] for m in monthly_usage_data])), reverse=True)
@@ -343,18 +353,18 @@ with tab5:
                 current_month_dt = datetime.strptime(st.session_state.selected_month_analytics, '%Y-%m')
                 prev_month_dt = current_month_dt - relativedelta(months=1)
                 st.session_state.selected_month_analytics = prev_month_dt.strftime('%Y-%m')
-                st.rerun()
+                rerun_section()
         with col_month_select:
             selected_month_from_box = st.selectbox("Select Month", all_months_str, index=all_months_str.index(st.session_state.selected_month_analytics) if st.session_state.selected_month_analytics in all_months_str else 0, key="month_selector_report")
             if selected_month_from_box != st.session_state.selected_month_analytics:
                 st.session_state.selected_month_analytics = selected_month_from_box
-                st.rerun()
+                rerun_section()
     with col_nav_right:
         if st.button("Next Month", key="next_month_btn_report"):
             current_month_dt = datetime.strptime(st.session_state.selected_month_analytics, '%Y-%m')
             next_month_dt = current_month_dt + relativedelta(months=1)
             st.session_state.selected_month_analytics = next_month_dt.strftime('%Y-%m')
-            st.rerun()
+            rerun_section()
 
     selected_month_str = st.session_state.selected_month_analytics
 
@@ -415,5 +425,25 @@ with tab5:
             st.info("No monthly parking usage data available.")
 
 
+metrics_row()
 
+# Tabs for different functions
+tab1, tab2, tab3, tab4, tab5 = st.tabs(
+    ["Vehicle Entry/Exit", "Current Status", "Parking History", "Floor Overview", "Analytics"])
+
+with tab1:
+    entry_exit_forms()
+
+with tab2:
+    active_sessions_table()
 
+with tab3:
+    parking_history()
+
+with tab4:
+    floor_overview()
+
+with tab5:
+    analytics_overview()
+    st.markdown("---") # Separator
+    monthly_report()
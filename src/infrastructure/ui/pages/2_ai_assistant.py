@@ -1,8 +1,8 @@
 import streamlit as st
-import asyncio
 
-from src.infrastructure.persistence.database import AsyncSessionLocal
+from src.infrastructure.persistence.database import ReadSessionLocal
 from src.infrastructure.ml_agents.parking_agent_hybrid import HybridParkingAssistant
+from src.infrastructure.ui.shared_resources import get_analytics_cache, get_async_runner
 from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import SQLAlchemyVehicleRepository
 
 
@@ -43,27 +43,35 @@ for message in st.session_state.messages:
 if "pending_query" not in st.session_state:
     st.session_state.pending_query = None
 
-async def process_user_query(query: str):
-    async with AsyncSessionLocal() as db:
-        if "assistant" not in st.session_state or st.session_state.assistant is None:
-            st.session_state.assistant = HybridParkingAssistant(db)
-        
-        with st.chat_message("assistant"):
-            with st.spinner("🤔 Analyzing your question and checking parking data..."):
-                try:
-                    response = await st.session_state.assistant.process_query(query)
-                    st.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
-                except Exception as e:
-                    error_msg = f"Sorry, I encountered an error: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+async def answer_query(assistant: HybridParkingAssistant, query: str) -> str:
+    try:
+        return await assistant.process_query(query)
+    finally:
+        # Ends the read transaction; the session reconnects on the next query
+        await assistant.direct_assistant.session.close()
+
+
+def process_user_query(query: str):
+    # Streamlit calls stay on the script thread; only the query runs on the shared loop
+    if "assistant" not in st.session_state or st.session_state.assistant is None:
+        st.session_state.assistant = HybridParkingAssistant(ReadSessionLocal(), analytics_cache=get_analytics_cache())
+
+    with st.chat_message("assistant"):
+        with st.spinner("🤔 Analyzing your question and checking parking data..."):
+            try:
+                response = get_async_runner().run(answer_query(st.session_state.assistant, query))
+                st.markdown(response)
+                st.session_state.messages.append({"role": "assistant", "content": response})
+            except Exception as e:
+                error_msg = f"Sorry, I encountered an error: {str(e)}"
+                st.error(error_msg)
+                st.session_state.messages.append({"role": "assistant", "content": error_msg})
 
 # Process pending query from example buttons
 if st.session_state.pending_query:
     query = st.session_state.pending_query
     st.session_state.pending_query = None  # Clear the pending query
-    asyncio.run(process_user_query(query))
+    process_user_query(query)
 
 # Chat input
 if prompt := st.chat_input("Ask about parking..."):
@@ -72,7 +80,7 @@ if prompt := st.chat_input("Ask about parking..."):
     with st.chat_message("user"):
         st.markdown(prompt)
     
-    asyncio.run(process_user_query(prompt))
+    process_user_query(prompt)
 
 # Sidebar with example queries
 with st.sidebar:
@@ -0,0 +1,60 @@
+"""Process-wide objects shared by every Streamlit page and session."""
+import streamlit as st
+
+from src.application.services.spot_allocator import FreeSpotIndex
+from src.infrastructure.persistence.database import AsyncSessionLocal, ReadSessionLocal
+from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import SQLAlchemyParkingSpotRepository
+from src.infrastructure.ui.dashboard_data import CachedDashboardDataLoader, DashboardDataLoader
+from src.shared.async_runner import AsyncRunner, get_runner
+from src.shared.cache import TTLCache
+
+
+async def load_spot_index(spot_index: FreeSpotIndex):
+    async with AsyncSessionLocal() as db:
+        await spot_index.load(SQLAlchemyParkingSpotRepository(db))
+    return spot_index
+
+
+@st.cache_resource
+def get_async_runner() -> AsyncRunner:
+    """Event loop every page runs its database coroutines on.
+
+    One loop for the whole process, so the engines' pooled connections are
+    reused across reruns and sessions instead of reopened per ``asyncio.run``.
+    """
+    return get_runner()
+
+
+@st.cache_resource
+def get_spot_index() -> FreeSpotIndex:
+    """Process-wide free-spot index, seeded once from the database."""
+    return get_async_runner().run(load_spot_index(FreeSpotIndex()))
+
+
+@st.cache_resource
+def get_analytics_cache() -> TTLCache:
+    """Analytics cache shared by the dashboard and the assistant."""
+    return TTLCache(maxsize=256)
+
+
+@st.cache_resource
+def get_identity_cache() -> TTLCache:
+    """Vehicles by plate and id, shared by the gate units of work.
+
+    The TTL bounds how long a vehicle deleted by another process (e.g. the
+    duplicate cleanup script) can still be served.
+    """
+    return TTLCache(maxsize=10_000, default_ttl=600.0)
+
+
+@st.cache_resource
+def get_dashboard_loader(history_page_size: int = 50) -> CachedDashboardDataLoader:
+    """Dashboard sections shared by every viewer, recomputed when the data changes.
+
+    The section cache replaces the analytics cache for the dashboard: a section
+    keyed by data version must not be built from metrics cached before that version.
+    """
+    return CachedDashboardDataLoader(
+        DashboardDataLoader(ReadSessionLocal, history_page_size=history_page_size),
+        TTLCache(maxsize=64)
+    )
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+
+class AsyncRunner:
+    """One event loop running forever in a daemon thread, with a sync facade.
+
+    Synchronous callers (Streamlit scripts, CrewAI tools) hand coroutines to the
+    loop instead of starting one per call with ``asyncio.run``, so engines and their
+    connection pools, which bind to the loop that first used them, are reused.
+    """
+
+    def __init__(self, name: str = "async-runner"):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def _run_forever(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Schedule ``coro`` on the loop and return a ``concurrent.futures.Future``."""
+        if self._loop.is_closed():
+            raise RuntimeError("AsyncRunner is closed")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run ``coro`` on the loop and block until its result (or exception)."""
+        if threading.current_thread() is self._thread:
+            # Blocking the loop's own thread on the loop would never return
+            coro.close()
+            raise RuntimeError("AsyncRunner.run() called from its own event loop; await the coroutine instead")
+        return self.submit(coro).result(timeout)
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_runner: Optional[AsyncRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> AsyncRunner:
+    """The process-wide runner, started on first use."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = AsyncRunner()
+        return _runner
+
+
+def run_sync(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """Run ``coro`` on the process-wide loop from synchronous code."""
+    return get_runner().run(coro, timeout)
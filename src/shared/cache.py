@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+MISSING = object()
+
+
+class TTLCache:
+    """Bounded in-process cache with per-entry expiry and LRU eviction.
+
+    Thread-safe, so one instance can be shared by every Streamlit session of the
+    process. ``get`` returns ``MISSING`` for absent or expired keys.
+
+    ``generation`` counts invalidations. A loader reads it before computing and passes
+    it to ``set``, which then drops the value if an invalidation ran in between, so
+    a result computed from data older than the invalidation is never stored.
+    """
+
+    def __init__(self, maxsize: int = 256, default_ttl: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None) -> bool:
+        """Store ``value``, unless ``generation`` is given and the cache was invalidated since.
+
+        Returns whether the value was stored.
+        """
+        expires_at = self._clock() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove ``key`` and return its value (``MISSING`` if absent or expired).
+
+        A keyed removal: unlike ``invalidate`` it neither scans the entries nor
+        bumps ``generation``, so loads in flight for other keys still store.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None or entry[0] <= self._clock():
+            return MISSING
+        return entry[1]
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every key matching ``predicate``; returns how many were dropped."""
+        with self._lock:
+            self._generation += 1
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Number of stored entries, expired ones included until they are looked up."""
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+
+class SingleFlight:
+    """Coalesces concurrent loads of the same key into one.
+
+    The first caller for a key starts ``load()``; callers arriving while it runs
+    await the same result (or exception) instead of starting their own. Meant for
+    callers sharing one event loop (see ``src.shared.async_runner``).
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(load())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        # A cancelled waiter must not cancel the load the others wait for
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    def __len__(self) -> int:
+        """Number of keys with a load in flight."""
+        return len(self._in_flight)
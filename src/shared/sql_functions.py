@@ -0,0 +1,42 @@
+from sqlalchemy import Float, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class hours_between(FunctionElement):
+    """Dialect-portable ``(end - start)`` in fractional hours.
+
+    Lets duration and fee arithmetic run inside the database instead of pulling
+    datetimes into Python.
+    """
+    type = Float()
+    inherit_cache = True
+    name = "hours_between"
+
+
+@compiles(hours_between)
+def _hours_between_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "(EXTRACT(EPOCH FROM (%s - %s)) / 3600.0)" % (compiler.process(end, **kw), compiler.process(start, **kw))
+
+
+@compiles(hours_between, "sqlite")
+def _hours_between_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "((julianday(%s) - julianday(%s)) * 24.0)" % (compiler.process(end, **kw), compiler.process(start, **kw))
+
+
+@compiles(hours_between, "mysql")
+def _hours_between_mysql(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "(TIMESTAMPDIFF(MICROSECOND, %s, %s) / 3600000000.0)" % (compiler.process(start, **kw), compiler.process(end, **kw))
+
+
+def combine_scalars(**queries):
+    """One ``SELECT`` returning each single-value query as a named column.
+
+    ``combine_scalars(a=select(...), b=select(...))`` compiles to
+    ``SELECT (SELECT ...) AS a, (SELECT ...) AS b``: several metrics in one round
+    trip, each subquery still planned (and indexed) on its own.
+    """
+    return select(*(query.scalar_subquery().label(name) for name, query in queries.items()))
@@ -10,6 +10,7 @@ from src.infrastructure.persistence.models.models import Base
 from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import SQLAlchemyVehicleRepository, SQLAlchemyParkingSpotRepository, SQLAlchemyParkingSessionRepository
 from src.application.services.parking_service import ParkingService
 from src.application.services.analytics_service import AnalyticsService
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
 from src.config.settings_env import Settings
 
 
@@ -152,7 +153,8 @@ async def parking_service(db_session):
     return ParkingService(
         vehicle_repo=vehicle_repo,
         parking_spot_repo=parking_spot_repo,
-        parking_session_repo=parking_session_repo
+        parking_session_repo=parking_session_repo,
+        unit_of_work=SQLAlchemyUnitOfWork.for_session(db_session)
     )
 
 @pytest.fixture
@@ -2,10 +2,13 @@ import pytest
 from datetime import datetime, timedelta, timezone
 from freezegun import freeze_time
 
-from src.application.services.analytics_service import AnalyticsService
+from src.application.services.analytics_service import METRICS, AnalyticsService
+from src.application.services.parking_service import summarize_occupancy
 from src.domain.common import SpotType, PaymentStatus
 from src.infrastructure.persistence.models.models import ParkingSession as ORMParkingSession
-from sqlalchemy import delete
+from src.infrastructure.persistence.sqlalchemy_repositories.sqlalchemy_repositories import SQLAlchemyDailyStatsRepository
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
+from sqlalchemy import delete, event
 
 
 
@@ -123,6 +126,19 @@ class TestAnalyticsServiceVehicleCounts:
         # Test case insensitive
         red_count_lower = await analytics_service.count_vehicles_by_color("red", active_only=True)
         assert red_count_lower == red_count
+
+    async def test_colors_match_by_canonical_name(self, analytics_service, parking_service, init_parking_spots):
+        """Synonyms share one color; other colors containing the word do not match."""
+        await parking_service.register_vehicle_entry(license_plate="GREY1", color="grey", brand="vw", spot_type=SpotType.REGULAR)
+        await parking_service.register_vehicle_entry(license_plate="GRAY1", color="Gray", brand="Kia", spot_type=SpotType.REGULAR)
+        await parking_service.register_vehicle_entry(license_plate="LGRAY1", color="light gray", brand="Kia", spot_type=SpotType.REGULAR)
+
+        assert await analytics_service.count_vehicles_by_color("GREY") == 2
+        assert await analytics_service.get_color_distribution() == {"Gray": 2, "Light Gray": 1}
+        assert await analytics_service.get_brand_distribution() == {"Kia": 2, "Volkswagen": 1}
+        vehicle = await parking_service.get_vehicle_by_plate("GREY1")
+        # The registered text is kept; only the color and brand references are canonical
+        assert (vehicle.color, vehicle.brand) == ("grey", "vw")
     
     async def test_get_current_vehicle_count(self, analytics_service, setup_test_data):
         """Test getting current total vehicle count."""
@@ -186,6 +202,29 @@ class TestAnalyticsServiceDurations:
         
         avg_duration = await analytics_service.get_average_duration_by_color("Red")
         assert avg_duration == pytest.approx(3.0, 0.1)
+
+    async def test_get_duration_stats_by_color(self, analytics_service, parking_service, init_parking_spots):
+        """Test duration percentiles computed by the database."""
+        for i, hours in enumerate([1, 2, 3, 4, 10]):
+            session = await parking_service.register_vehicle_entry(
+                license_plate=f"BLACK{i}", color="Black", brand="Audi", spot_type=SpotType.REGULAR
+            )
+            session_obj = await parking_service.parking_session_repo.get_by_id(session['id'])
+            session_obj.exit_time = session_obj.entry_time + timedelta(hours=hours)
+            await parking_service.parking_session_repo.update(session_obj)
+        # Still parked: not part of the durations
+        await parking_service.register_vehicle_entry(
+            license_plate="BLACK9", color="Black", brand="Audi", spot_type=SpotType.REGULAR
+        )
+
+        stats = await analytics_service.get_duration_stats_by_color("black", percentiles=(0.5, 0.9, 1.0))
+
+        assert stats == {"count": 5, "average_hours": 4.0, "p50": 3.0, "p90": 10.0, "p100": 10.0}
+        assert await analytics_service.get_duration_stats_by_color("Purple") == {
+            "count": 0, "average_hours": 0.0, "p50": 0.0, "p90": 0.0
+        }
+        with pytest.raises(ValueError):
+            await analytics_service.get_duration_stats_by_color("Black", percentiles=(1.5,))
     
     async def test_get_average_daily_spending(self, analytics_service, parking_service, init_parking_spots):
         """Test calculating average spending per vehicle per day."""
@@ -269,4 +308,159 @@ class TestAnalyticsServiceDistributions:
             assert analytics["current_occupancy"] == 1
             assert analytics["today_revenue"] == pytest.approx(15.0, 0.1)
             assert analytics["today_vehicles"] == 2
-            assert analytics["average_duration_hours"] == pytest.approx(3.0, 0.1)
\ No newline at end of file
+            assert analytics["average_duration_hours"] == pytest.approx(3.0, 0.1)
+
+class TestAnalyticsServiceOccupancy:
+    """Test the hourly occupancy profile."""
+
+    async def test_get_hourly_occupancy(self, analytics_service, parking_service, init_parking_spots):
+        """Test that sessions are counted in every hour they overlap."""
+        day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        with freeze_time(day + timedelta(hours=8, minutes=30)):
+            await parking_service.register_vehicle_entry(
+                license_plate="HOUR1", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+        with freeze_time(day + timedelta(hours=10, minutes=15)):
+            await parking_service.register_vehicle_exit("HOUR1")
+        # Still parked at the end of the day
+        with freeze_time(day + timedelta(hours=22)):
+            await parking_service.register_vehicle_entry(
+                license_plate="HOUR2", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+
+        occupancy = await analytics_service.get_hourly_occupancy(start=day)
+
+        assert [item["hour"] for item in occupancy] == list(range(24))
+        by_hour = {item["hour"]: item["occupancy"] for item in occupancy}
+        assert [hour for hour, count in by_hour.items() if count] == [8, 9, 10, 22, 23]
+        assert occupancy[8]["bucket_start"] == day + timedelta(hours=8)
+
+    async def test_get_hourly_occupancy_custom_bucket(self, analytics_service, parking_service, init_parking_spots):
+        """Test a multi-day window with a larger bucket."""
+        day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        with freeze_time(day - timedelta(hours=1)):
+            await parking_service.register_vehicle_entry(
+                license_plate="SPAN1", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+        with freeze_time(day + timedelta(hours=13)):
+            await parking_service.register_vehicle_exit("SPAN1")
+
+        occupancy = await analytics_service.get_hourly_occupancy(
+            start=day, end=day + timedelta(days=2), bucket=timedelta(hours=6)
+        )
+
+        assert len(occupancy) == 8
+        assert [item["occupancy"] for item in occupancy] == [1, 1, 1, 0, 0, 0, 0, 0]
+
+    async def test_get_hourly_occupancy_profile_over_all_history(self, analytics_service, parking_service, init_parking_spots):
+        """Test that without a window the hour-of-day profile spans every day."""
+        day = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        for offset, plate in ((0, "PROF1"), (3, "PROF2")):
+            with freeze_time(day + timedelta(days=offset, hours=9)):
+                await parking_service.register_vehicle_entry(
+                    license_plate=plate, color="Red", brand="Kia", spot_type=SpotType.REGULAR
+                )
+            with freeze_time(day + timedelta(days=offset, hours=11, minutes=30)):
+                await parking_service.register_vehicle_exit(plate)
+        with freeze_time(day + timedelta(days=5, hours=21)):
+            await parking_service.register_vehicle_entry(
+                license_plate="PROF3", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+
+        occupancy = await analytics_service.get_hourly_occupancy()
+
+        assert [item["hour"] for item in occupancy] == list(range(24))
+        by_hour = {item["hour"]: item["occupancy"] for item in occupancy if item["occupancy"]}
+        assert by_hour == {9: 2, 10: 2, 11: 2, 21: 1, 22: 1, 23: 1}
+
+    async def test_get_hourly_occupancy_invalid_bucket(self, analytics_service):
+        with pytest.raises(ValueError):
+            await analytics_service.get_hourly_occupancy(bucket=timedelta(0))
+        with pytest.raises(ValueError):
+            await analytics_service.get_hourly_occupancy(bucket=timedelta(hours=6))
+
+
+class TestAnalyticsServiceMetrics:
+    """Test the batched metrics API."""
+
+    async def individual_metrics(self, analytics_service, window):
+        return {
+            "parking_status": summarize_occupancy(await analytics_service.parking_spot_repo.get_occupancy_counters()),
+            "floor_distribution": await analytics_service.get_floor_distribution(),
+            "parking_analytics": await analytics_service.get_parking_analytics(),
+            "current_vehicle_count": await analytics_service.get_current_vehicle_count(),
+            "active_sessions": await analytics_service.parking_session_repo.get_active_sessions(),
+            "revenue_by_day": await analytics_service.get_revenue_by_day(window),
+            "daily_average_vehicles": await analytics_service.get_daily_average_vehicles(window),
+            "average_daily_spending": await analytics_service.get_average_daily_spending(window),
+            "revenue_by_month": await analytics_service.get_revenue_by_month(),
+            "monthly_parking_usage": await analytics_service.get_monthly_parking_usage(),
+            "brand_distribution": await analytics_service.get_brand_distribution(),
+            "color_distribution": await analytics_service.get_color_distribution(),
+        }
+
+    async def test_get_metrics_matches_individual_metrics(self, analytics_service, setup_test_data):
+        metrics = await analytics_service.get_metrics(METRICS, window=7)
+
+        assert metrics == await self.individual_metrics(analytics_service, 7)
+        assert metrics["current_vehicle_count"] == 2
+        assert metrics["daily_average_vehicles"] == 5
+
+    async def test_get_metrics_from_daily_rollups(self, db_session, analytics_service, setup_test_data):
+        daily_stats_repo = SQLAlchemyDailyStatsRepository(db_session)
+        await daily_stats_repo.rebuild()
+        service = AnalyticsService(
+            analytics_service.vehicle_repo,
+            analytics_service.parking_session_repo,
+            analytics_service.parking_spot_repo,
+            daily_stats_repo=daily_stats_repo
+        )
+
+        metrics = await service.get_metrics({"revenue_by_day", "daily_average_vehicles", "average_daily_spending", "revenue_by_month", "monthly_parking_usage"})
+
+        assert metrics == {
+            name: value for name, value in (await self.individual_metrics(service, 30)).items() if name in metrics
+        }
+
+    async def test_get_metrics_shares_scans(self, test_db, db_session, analytics_service, setup_test_data):
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = test_db.kw["bind"].sync_engine
+        event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            metrics = await analytics_service.get_metrics({
+                "parking_status", "floor_distribution", "parking_analytics", "current_vehicle_count",
+                "active_sessions", "revenue_by_month", "monthly_parking_usage",
+            })
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+        assert len(metrics) == 7
+        # Occupancy counters, the analytics row, the monthly report, and the active
+        # sessions with their vehicles and spots
+        assert len(statements) == 6
+
+    async def test_get_metrics_runs_scans_in_units_of_work(self, test_db, db_session, analytics_service, setup_test_data):
+        # Units of work read the daily rollups, which the fixture service does not maintain
+        await SQLAlchemyDailyStatsRepository(db_session).rebuild()
+        await db_session.commit()
+        service = AnalyticsService(
+            analytics_service.vehicle_repo,
+            analytics_service.parking_session_repo,
+            analytics_service.parking_spot_repo,
+            unit_of_work_factory=lambda: SQLAlchemyUnitOfWork(test_db)
+        )
+
+        metrics = await service.get_metrics(METRICS)
+
+        assert metrics == await analytics_service.get_metrics(METRICS)
+
+    async def test_get_metrics_unknown_metric(self, analytics_service):
+        with pytest.raises(ValueError, match="nonsense"):
+            await analytics_service.get_metrics({"parking_status", "nonsense"})
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+
+from src.config.settings_env import Settings
+from src.infrastructure.persistence.database import create_app_engine
+from src.shared.async_runner import AsyncRunner, get_runner
+
+
+@pytest.fixture
+def runner():
+    runner = AsyncRunner()
+    yield runner
+    runner.close()
+
+
+class TestAsyncRunner:
+    """Test the shared background event loop."""
+
+    def test_runs_coroutines_on_one_loop(self, runner):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        assert runner.run(current_loop()) is runner.loop
+        assert runner.run(current_loop()) is runner.loop
+
+    def test_exceptions_propagate(self, runner):
+        async def failing():
+            raise KeyError("boom")
+
+        with pytest.raises(KeyError):
+            runner.run(failing())
+
+    def test_run_from_its_own_loop_is_refused(self, runner):
+        async def value():
+            return 1
+
+        async def nested():
+            return runner.run(value())
+
+        with pytest.raises(RuntimeError):
+            runner.run(nested())
+
+    def test_closed_runner_refuses_work(self, runner):
+        async def value():
+            return 1
+
+        runner.close()
+        coro = value()
+        with pytest.raises(RuntimeError):
+            runner.submit(coro)
+        coro.close()
+
+    def test_process_wide_runner_is_shared(self):
+        assert get_runner() is get_runner()
+
+    def test_pooled_connection_is_reused_across_calls(self, runner, tmp_path):
+        engine = create_app_engine(Settings(
+            DATABASE_URL=f"sqlite:///{tmp_path / 'runner.db'}",
+            ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'runner.db'}",
+            DB_POOL_SIZE=1,
+        ))
+        connects = []
+        event.listen(engine.sync_engine, "connect", lambda dbapi_connection, record: connects.append(1))
+
+        async def select_one():
+            async with engine.connect() as conn:
+                return (await conn.execute(text("SELECT 1"))).scalar()
+
+        try:
+            assert [runner.run(select_one()) for _ in range(3)] == [1, 1, 1]
+            assert len(connects) == 1
+        finally:
+            runner.run(engine.dispose())
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from src.shared.cache import MISSING, SingleFlight, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Test expiry, LRU eviction and counters of the in-process cache."""
+
+    def test_get_and_set(self):
+        cache = TTLCache(maxsize=2)
+        assert cache.get("a") is MISSING
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=2, default_ttl=5.0, clock=clock)
+        cache.set("short", 1, ttl=1.0)
+        cache.set("default", 2)
+
+        clock.now = 2.0
+        assert cache.get("short") is MISSING
+        assert cache.get("default") == 2
+
+        clock.now = 5.0
+        assert cache.get("default") is MISSING
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate(self):
+        cache = TTLCache()
+        cache.set(("count",), 1)
+        cache.set(("revenue", 24), 2)
+
+        assert cache.invalidate(lambda key: key[0] == "count") == 1
+        assert cache.get(("count",)) is MISSING
+        assert cache.get(("revenue", 24)) == 2
+
+    def test_pop_removes_one_key_without_a_new_generation(self):
+        cache = TTLCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        generation = cache.generation
+
+        assert cache.pop("a") == 1
+        assert cache.pop("a") is MISSING
+        assert cache.get("b") == 2
+        assert cache.set("c", 3, generation=generation) is True
+
+    def test_set_after_invalidation_is_dropped(self):
+        cache = TTLCache()
+        generation = cache.generation
+        cache.invalidate(lambda key: True)
+
+        assert cache.set("count", 1, generation=generation) is False
+        assert cache.get("count") is MISSING
+        assert cache.set("count", 2, generation=cache.generation) is True
+        assert cache.get("count") == 2
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            TTLCache(maxsize=0)
+
+
+class TestSingleFlight:
+    """Test that concurrent loads of one key are coalesced."""
+
+    async def test_concurrent_calls_share_one_load(self):
+        single_flight = SingleFlight()
+        calls = []
+        release = asyncio.Event()
+
+        async def load():
+            calls.append(1)
+            await release.wait()
+            return "snapshot"
+
+        waiters = [asyncio.ensure_future(single_flight.do("key", load)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*waiters) == ["snapshot"] * 5
+        assert len(calls) == 1
+        assert len(single_flight) == 0
+
+    async def test_later_calls_load_again(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            return len(calls)
+
+        assert await single_flight.do("key", load) == 1
+        assert await single_flight.do("key", load) == 2
+
+    async def test_failure_reaches_every_waiter(self):
+        single_flight = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0)
+            raise RuntimeError("database unavailable")
+
+        results = await asyncio.gather(*(single_flight.do("key", load) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len(single_flight) == 0
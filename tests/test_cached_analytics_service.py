@@ -0,0 +1,161 @@
+import pytest
+
+from src.application.services.cached_analytics_service import CachedAnalyticsService
+from src.application.services.parking_service import ParkingService
+from src.domain.common import SpotType
+from src.shared.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def analytics_cache(clock):
+    return TTLCache(maxsize=32, clock=clock)
+
+
+@pytest.fixture
+def cached_analytics(analytics_service, analytics_cache):
+    return CachedAnalyticsService(analytics_service, analytics_cache)
+
+
+@pytest.fixture
+def notifying_parking_service(parking_service, analytics_cache):
+    return ParkingService(
+        vehicle_repo=parking_service.vehicle_repo,
+        parking_spot_repo=parking_service.parking_spot_repo,
+        parking_session_repo=parking_service.parking_session_repo,
+        unit_of_work=parking_service.unit_of_work,
+        listeners=[CachedAnalyticsService.invalidation_listener(analytics_cache)]
+    )
+
+
+class TestCachedAnalyticsService:
+    """Test the read-through analytics cache."""
+
+    async def test_repeated_reads_hit_the_cache(self, cached_analytics, analytics_service, init_parking_spots, monkeypatch):
+        calls = []
+        original = analytics_service.get_current_vehicle_count
+
+        async def counting():
+            calls.append(1)
+            return await original()
+
+        monkeypatch.setattr(analytics_service, "get_current_vehicle_count", counting)
+
+        for _ in range(5):
+            assert await cached_analytics.get_current_vehicle_count() == 0
+
+        assert len(calls) == 1
+        assert cached_analytics.stats()["hits"] == 4
+        assert cached_analytics.stats()["misses"] == 1
+
+    async def test_arguments_are_part_of_the_key(self, cached_analytics, init_parking_spots):
+        await cached_analytics.get_revenue_last_hours(1)
+        await cached_analytics.get_revenue_last_hours(24)
+        await cached_analytics.get_revenue_last_hours(24)
+
+        assert cached_analytics.stats()["misses"] == 2
+        assert cached_analytics.stats()["hits"] == 1
+
+    async def test_metric_expires_after_its_ttl(self, cached_analytics, clock, init_parking_spots):
+        await cached_analytics.get_current_vehicle_count()
+        await cached_analytics.get_revenue_by_month()
+
+        clock.now = 10.0
+        await cached_analytics.get_current_vehicle_count()
+        await cached_analytics.get_revenue_by_month()
+
+        # The live counter was recomputed, the monthly report was not
+        assert cached_analytics.stats()["misses"] == 3
+        assert cached_analytics.stats()["hits"] == 1
+
+    async def test_entry_and_exit_invalidate(self, cached_analytics, notifying_parking_service, init_parking_spots):
+        assert await cached_analytics.get_current_vehicle_count() == 0
+        revenue_before = await cached_analytics.get_revenue_last_hours(24)
+
+        await notifying_parking_service.register_vehicle_entry(
+            license_plate="CACHE1", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+        )
+        assert await cached_analytics.get_current_vehicle_count() == 1
+        # An entry does not change revenue, so it stays cached
+        assert await cached_analytics.get_revenue_last_hours(24) == revenue_before
+        assert cached_analytics.stats()["hits"] == 1
+
+        await notifying_parking_service.register_vehicle_exit("CACHE1")
+        assert await cached_analytics.get_current_vehicle_count() == 0
+        assert await cached_analytics.get_revenue_last_hours(24) == 5.0
+
+    async def test_invalidation_during_compute_is_not_overwritten(
+        self, cached_analytics, analytics_service, analytics_cache, init_parking_spots, monkeypatch
+    ):
+        on_event = CachedAnalyticsService.invalidation_listener(analytics_cache)
+        calls = []
+
+        async def slow_count():
+            # Counted before an entry that is reported while the computation is in flight
+            calls.append(1)
+            on_event("entry")
+            return 0
+
+        async def slow_metrics(requested, window=30):
+            on_event("entry")
+            return {"current_vehicle_count": 0}
+
+        monkeypatch.setattr(analytics_service, "get_current_vehicle_count", slow_count)
+        monkeypatch.setattr(analytics_service, "get_metrics", slow_metrics)
+
+        assert await cached_analytics.get_current_vehicle_count() == 0
+        assert await cached_analytics.get_metrics(["current_vehicle_count"]) == {"current_vehicle_count": 0}
+
+        # The stale results were returned but not stored
+        assert len(analytics_cache) == 0
+        await cached_analytics.get_current_vehicle_count()
+        assert len(calls) == 2
+
+    async def test_failing_listener_does_not_fail_the_event(self, parking_service, init_parking_spots):
+        def broken_listener(event):
+            raise RuntimeError("cache unavailable")
+
+        service = ParkingService(
+            vehicle_repo=parking_service.vehicle_repo,
+            parking_spot_repo=parking_service.parking_spot_repo,
+            parking_session_repo=parking_service.parking_session_repo,
+            unit_of_work=parking_service.unit_of_work,
+            listeners=[broken_listener]
+        )
+        response = await service.register_vehicle_entry(
+            license_plate="CACHE2", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+        )
+        assert response["parking_spot_id"]
+
+    async def test_get_metrics_plans_only_cache_misses(self, cached_analytics, analytics_service, init_parking_spots, monkeypatch):
+        planned = []
+        original = analytics_service.get_metrics
+
+        async def recording(requested, window=30):
+            planned.append(set(requested))
+            return await original(requested, window)
+
+        monkeypatch.setattr(analytics_service, "get_metrics", recording)
+
+        assert await cached_analytics.get_current_vehicle_count() == 0
+        metrics = await cached_analytics.get_metrics({"current_vehicle_count", "revenue_by_month", "parking_status"})
+        assert metrics["current_vehicle_count"] == 0
+        assert metrics["revenue_by_month"] == []
+        assert metrics["parking_status"]["total_spots"] == 15
+
+        # Shared with the single-metric call; the live status is never cached
+        await cached_analytics.get_metrics({"current_vehicle_count", "revenue_by_month", "parking_status"})
+        assert planned == [{"revenue_by_month", "parking_status"}, {"parking_status"}]
+        assert await cached_analytics.get_revenue_by_month() == []
@@ -0,0 +1,138 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from freezegun import freeze_time
+from sqlalchemy import select
+
+from src.application.services.analytics_service import AnalyticsService
+from src.application.services.parking_service import ParkingService
+from src.domain.common import SpotType
+from src.infrastructure.persistence.models.models import DailyStats as ORMDailyStats
+from src.infrastructure.persistence.sqlalchemy_repositories import SQLAlchemyDailyStatsRepository
+
+
+@pytest.fixture
+def daily_stats_repo(db_session):
+    return SQLAlchemyDailyStatsRepository(db_session)
+
+
+@pytest.fixture
+def rollup_parking_service(parking_service, daily_stats_repo):
+    return ParkingService(
+        vehicle_repo=parking_service.vehicle_repo,
+        parking_spot_repo=parking_service.parking_spot_repo,
+        parking_session_repo=parking_service.parking_session_repo,
+        unit_of_work=parking_service.unit_of_work,
+        daily_stats_repo=daily_stats_repo
+    )
+
+
+@pytest.fixture
+def rollup_analytics_service(analytics_service, daily_stats_repo):
+    return AnalyticsService(
+        vehicle_repo=analytics_service.vehicle_repo,
+        parking_session_repo=analytics_service.parking_session_repo,
+        parking_spot_repo=analytics_service.parking_spot_repo,
+        daily_stats_repo=daily_stats_repo
+    )
+
+
+async def visit(service, plate, entry_time, hours, spot_type=SpotType.REGULAR):
+    with freeze_time(entry_time):
+        await service.register_vehicle_entry(license_plate=plate, color="Red", brand="Kia", spot_type=spot_type)
+    if hours is not None:
+        with freeze_time(entry_time + timedelta(hours=hours)):
+            await service.register_vehicle_exit(plate)
+
+
+@pytest.fixture
+async def parking_history(rollup_parking_service, init_parking_spots):
+    """Sessions over two months, including a vehicle paying twice on the same day."""
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    yesterday = now - timedelta(days=1)
+    last_month = now - timedelta(days=40)
+
+    await visit(rollup_parking_service, "ROLL1", yesterday.replace(hour=8), 2)
+    await visit(rollup_parking_service, "ROLL1", yesterday.replace(hour=12), 3)
+    await visit(rollup_parking_service, "ROLL2", yesterday.replace(hour=9), 1, SpotType.VIP)
+    await visit(rollup_parking_service, "ROLL3", last_month.replace(hour=10), 4)
+    # Still parked
+    await visit(rollup_parking_service, "ROLL4", now - timedelta(hours=1), None)
+
+
+class TestDailyStatsMaintenance:
+    """Test that gate events keep the rollups in step."""
+
+    async def test_entry_and_exit_update_rollup(self, rollup_parking_service, init_parking_spots, db_session):
+        entry_time = datetime(2025, 3, 1, 10, 0, tzinfo=timezone.utc)
+        await visit(rollup_parking_service, "DAY001", entry_time, 2)
+
+        row = (await db_session.execute(select(ORMDailyStats))).scalars().one()
+        assert (row.date, row.floor, row.spot_type) == (date(2025, 3, 1), 1, "regular")
+        assert row.entries == 1
+        assert row.exits == 1
+        assert row.revenue == pytest.approx(10.0)
+        assert row.distinct_vehicles == 1
+        assert row.total_duration_hours == pytest.approx(2.0)
+
+    async def test_vehicle_paying_twice_is_counted_once(self, parking_history, db_session):
+        rows = (await db_session.execute(select(ORMDailyStats))).scalars().all()
+        yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).date()
+
+        assert sum(row.distinct_vehicles for row in rows if row.date == yesterday) == 2
+        assert sum(row.exits for row in rows if row.date == yesterday) == 3
+
+    async def test_bulk_events_update_rollup(self, rollup_parking_service, init_parking_spots, db_session):
+        with freeze_time(datetime(2025, 3, 1, 10, 0, tzinfo=timezone.utc)):
+            await rollup_parking_service.register_vehicle_entries_bulk([
+                {"license_plate": "BULK1", "color": "Red", "brand": "Kia"},
+                {"license_plate": "BULK2", "color": "Red", "brand": "Kia", "spot_type": "vip"},
+            ])
+        with freeze_time(datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)):
+            await rollup_parking_service.register_vehicle_exits_bulk(["BULK1", "BULK2"])
+
+        rows = (await db_session.execute(select(ORMDailyStats))).scalars().all()
+        assert sum(row.entries for row in rows) == 2
+        assert sum(row.exits for row in rows) == 2
+        assert sum(row.distinct_vehicles for row in rows) == 2
+        assert sum(row.revenue for row in rows) == pytest.approx(20.0)
+
+    async def test_rebuild_matches_incremental_rollup(self, parking_history, daily_stats_repo, db_session):
+        def snapshot(rows):
+            return sorted(
+                (row.date, row.floor, row.spot_type, row.entries, row.exits, round(row.revenue, 2),
+                 row.distinct_vehicles, round(row.total_duration_hours, 2))
+                for row in rows
+            )
+
+        incremental = snapshot((await db_session.execute(select(ORMDailyStats))).scalars().all())
+        rows_written = await daily_stats_repo.rebuild()
+        db_session.expire_all()
+        rebuilt = snapshot((await db_session.execute(select(ORMDailyStats))).scalars().all())
+
+        assert rows_written == len(rebuilt)
+        assert rebuilt == incremental
+
+
+class TestAnalyticsFromDailyStats:
+    """Test that rollup-backed reports agree with the session scans they replace."""
+
+    async def test_reports_match_session_scans(self, parking_history, analytics_service, rollup_analytics_service):
+        assert await rollup_analytics_service.get_revenue_by_day(60) == await analytics_service.get_revenue_by_day(60)
+        assert await rollup_analytics_service.get_revenue_by_month() == await analytics_service.get_revenue_by_month()
+        assert (
+            await rollup_analytics_service.get_monthly_parking_usage()
+            == await analytics_service.get_monthly_parking_usage()
+        )
+        assert await rollup_analytics_service.get_average_daily_spending(60) == pytest.approx(
+            await analytics_service.get_average_daily_spending(60)
+        )
+        assert await rollup_analytics_service.get_daily_average_vehicles(60) == pytest.approx(
+            await analytics_service.get_daily_average_vehicles(60)
+        )
+
+    async def test_reports_on_empty_rollup(self, rollup_analytics_service, init_parking_spots):
+        assert await rollup_analytics_service.get_revenue_by_day(7) == []
+        assert await rollup_analytics_service.get_revenue_by_month() == []
+        assert await rollup_analytics_service.get_monthly_parking_usage() == []
+        assert await rollup_analytics_service.get_daily_average_vehicles(30) == 0.0
+        assert await rollup_analytics_service.get_average_daily_spending(30) == 0.0
@@ -0,0 +1,203 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from src.application.services.parking_service import ParkingService
+from src.domain.common import SpotType
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
+from src.infrastructure.ui.dashboard_data import CachedDashboardDataLoader, Counters, DashboardDataLoader
+from src.shared.cache import TTLCache
+
+
+@pytest.fixture
+async def parked(test_db, init_parking_spots):
+    async with SQLAlchemyUnitOfWork(test_db) as uow:
+        service = ParkingService.from_unit_of_work(uow)
+        for plate in ("DASH1", "DASH2", "DASH3"):
+            await service.register_vehicle_entry(license_plate=plate, color="Red", brand="Kia", spot_type=SpotType.REGULAR)
+    async with SQLAlchemyUnitOfWork(test_db) as uow:
+        await ParkingService.from_unit_of_work(uow).register_vehicle_exit("DASH1")
+
+
+class TestDashboardDataLoader:
+    """Test the per-section dashboard loads."""
+
+    async def test_load_counters(self, test_db, parked):
+        counters = await DashboardDataLoader(test_db).load_counters()
+
+        assert isinstance(counters, Counters)
+        assert counters.status["occupied_spots"] == 2
+        assert counters.analytics["current_occupancy"] == 2
+        assert counters.active_count == 2
+        assert counters.potential_revenue == pytest.approx(10.0)
+
+        with pytest.raises(AttributeError):
+            counters.status = {}
+
+    async def test_counters_do_not_read_the_parked_vehicles(self, test_db, parked):
+        engine = test_db.kw["bind"]
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            await DashboardDataLoader(test_db).load_counters()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        assert not any("license_plate" in statement for statement in statements)
+
+    async def test_load_active_sessions(self, test_db, parked):
+        active_sessions = await DashboardDataLoader(test_db).load_active_sessions()
+
+        assert sorted(active_sessions["license_plate"]) == ["DASH2", "DASH3"]
+        assert len(active_sessions["hourly_rate"]) == 2
+
+    async def test_sections_are_read_only(self, test_db, parked):
+        loader = DashboardDataLoader(test_db)
+        counters = await loader.load_counters()
+        active_sessions = await loader.load_active_sessions()
+        history_page = await loader.load_history()
+        monthly = await loader.load_monthly()
+
+        with pytest.raises(AttributeError):
+            active_sessions["license_plate"].append("INTRUDER")
+        with pytest.raises(TypeError):
+            history_page["items"]["license_plate"] = ()
+        with pytest.raises(TypeError):
+            counters.status["floors"][0]["occupied"] = 0
+        with pytest.raises(TypeError):
+            monthly.revenue_by_month[0]["total_revenue"] = 0.0
+
+    async def test_load_history_filters_and_cursor(self, test_db, parked):
+        loader = DashboardDataLoader(test_db, history_page_size=1)
+        first = await loader.load_history(history_filters={"status": "parked"})
+        second = await loader.load_history(first["next_cursor"], {"status": "parked"})
+
+        plates = [page["items"]["license_plate"][0] for page in (first, second)]
+        assert sorted(plates) == ["DASH2", "DASH3"]
+
+    async def test_load_monthly(self, test_db, parked):
+        monthly = await DashboardDataLoader(test_db).load_monthly()
+
+        assert monthly.revenue_by_month[0]["total_revenue"] == 5.0
+        assert monthly.monthly_parking_usage[0]["session_count"] == 3
+
+    async def test_data_version_follows_entries_and_exits(self, test_db, parked):
+        loader = DashboardDataLoader(test_db)
+        versions = [await loader.data_version()]
+
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            await ParkingService.from_unit_of_work(uow).register_vehicle_entry(
+                license_plate="DASH4", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+        versions.append(await loader.data_version())
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            service = ParkingService.from_unit_of_work(uow)
+            await service.register_vehicle_exit("DASH4")
+            await service.get_parking_status()
+        versions.append(await loader.data_version())
+
+        assert len(set(versions)) == 3
+        assert await loader.data_version() == versions[-1]
+
+    async def test_data_version_is_one_read(self, test_db, parked):
+        engine = test_db.kw["bind"]
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        try:
+            await DashboardDataLoader(test_db).data_version()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+        assert len(statements) == 1
+        assert statements[0].lstrip().upper().startswith("SELECT")
+
+    async def test_load_reuses_the_analytics_cache(self, test_db, parked):
+        cache = TTLCache(maxsize=32)
+        loader = DashboardDataLoader(test_db, analytics_cache=cache)
+
+        await loader.load_counters()
+        await loader.load_counters()
+
+        assert cache.stats()["hits"] >= 1
+
+
+class TestCachedDashboardDataLoader:
+    """Test the section cache shared by all viewers."""
+
+    @pytest.fixture
+    def counted_loader(self, test_db, monkeypatch):
+        loader = DashboardDataLoader(test_db)
+        loads = []
+        for name in ("load_counters", "load_history"):
+            original = getattr(loader, name)
+
+            def counting(*args, original=original):
+                loads.append((original.__name__, args))
+                return original(*args)
+
+            monkeypatch.setattr(loader, name, counting)
+        return loader, loads
+
+    async def test_counters_are_shared_until_the_data_changes(self, test_db, parked, counted_loader):
+        loader, loads = counted_loader
+        cached = CachedDashboardDataLoader(loader, TTLCache(maxsize=8))
+
+        first = await cached.load_counters()
+        assert await cached.load_counters() is first
+        assert len(loads) == 1
+
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            await ParkingService.from_unit_of_work(uow).register_vehicle_exit("DASH2")
+
+        second = await cached.load_counters()
+        assert second is not first
+        assert second.status["occupied_spots"] == 1
+        assert len(loads) == 2
+
+    async def test_history_pages_are_cached_separately(self, parked, counted_loader):
+        loader, loads = counted_loader
+        cached = CachedDashboardDataLoader(loader, TTLCache(maxsize=8))
+
+        await cached.load_history(None, {"status": "parked"})
+        await cached.load_history(None, {"status": "exited"})
+        await cached.load_history(None, {"status": "parked"})
+
+        assert len(loads) == 2
+
+    async def test_concurrent_misses_load_once(self, parked, counted_loader):
+        loader, loads = counted_loader
+        cached = CachedDashboardDataLoader(loader, TTLCache(maxsize=8))
+
+        results = await asyncio.gather(*(cached.load_counters() for _ in range(10)))
+
+        assert len(loads) == 1
+        assert all(counters is results[0] for counters in results)
+
+    async def test_sections_are_cached_independently(self, test_db, parked):
+        loader = DashboardDataLoader(test_db)
+        cached = CachedDashboardDataLoader(loader, TTLCache(maxsize=8), max_ages={"monthly": 600.0})
+
+        counters = await cached.load_counters()
+        active_sessions = await cached.load_active_sessions()
+        monthly = await cached.load_monthly()
+        assert await cached.load_counters() is counters
+        assert await cached.load_active_sessions() is active_sessions
+        assert await cached.load_monthly() is monthly
+        assert counters.status["occupied_spots"] == 2
+        assert monthly.monthly_parking_usage[0]["session_count"] == 3
+
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            await ParkingService.from_unit_of_work(uow).register_vehicle_exit("DASH2")
+
+        assert (await cached.load_counters()).status["occupied_spots"] == 1
+        assert (await cached.load_active_sessions())["license_plate"] == ("DASH3",)
+        assert cached.max_ages["monthly"] == 600.0
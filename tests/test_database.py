@@ -316,6 +316,93 @@ def init_db_fixture():
     importlib.reload(database)
 
 
+class TestParkingSessionStreaming:
+    """Test chunked streaming of parking sessions."""
+
+    @pytest.fixture
+    async def many_sessions(self, parking_service, init_parking_spots):
+        await parking_service.register_vehicle_entries_bulk([
+            {"license_plate": f"STR{i}", "color": "Red", "brand": "Kia"} for i in range(7)
+        ])
+        await parking_service.register_vehicle_exits_bulk(["STR0", "STR1"])
+
+    async def test_stream_sessions_in_chunks(self, parking_service, many_sessions, db_session):
+        objects_before = len(db_session.identity_map)
+        chunks = [chunk async for chunk in parking_service.parking_session_repo.stream_sessions(chunk_size=3)]
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        ids = [session.id for chunk in chunks for session in chunk]
+        assert ids == sorted(ids)
+        # Plain rows: streaming does not fill the identity map
+        assert len(db_session.identity_map) == objects_before
+
+    async def test_stream_sessions_with_filters(self, parking_service, many_sessions):
+        repo = parking_service.parking_session_repo
+        exited = [s async for chunk in repo.stream_sessions(status="exited") for s in chunk]
+        assert len(exited) == 2
+        assert all(s.exit_time is not None for s in exited)
+
+        plate = [s async for chunk in repo.stream_sessions(license_plate="STR6") for s in chunk]
+        assert len(plate) == 1
+
+    async def test_stream_session_rows(self, parking_service, many_sessions):
+        rows = [row async for chunk in parking_service.parking_session_repo.stream_session_rows(chunk_size=4, floor=1)
+                for row in chunk]
+        assert rows
+        assert all(row.floor == 1 for row in rows)
+        assert rows[0].license_plate.startswith("STR")
+
+    async def test_invalid_chunk_size(self, parking_service):
+        with pytest.raises(ValueError):
+            async for _ in parking_service.parking_session_repo.stream_sessions(chunk_size=0):
+                pass
+
+
+class TestOccupancyCounters:
+    """Test the trigger-maintained occupancy counters."""
+
+    async def counters_from_spots(self, db_session):
+        result = await db_session.execute(select(ParkingSpot.floor, ParkingSpot.spot_type, ParkingSpot.is_occupied))
+        expected = {}
+        for floor, spot_type, is_occupied in result:
+            counter = expected.setdefault((floor, spot_type), [0, 0])
+            counter[0] += 1
+            counter[1] += int(bool(is_occupied))
+        return expected
+
+    async def counters(self, parking_service):
+        return {
+            (row["floor"], row["spot_type"]): [row["total"], row["occupied"]]
+            for row in await parking_service.parking_spot_repo.get_occupancy_counters()
+        }
+
+    async def test_counters_follow_gate_events(self, parking_service, init_parking_spots, db_session):
+        await parking_service.register_vehicle_entry(license_plate="CNT1", color="Red", brand="Kia", spot_type="regular")
+        await parking_service.register_vehicle_entries_bulk([
+            {"license_plate": f"CNT{i}", "color": "Red", "brand": "Kia", "spot_type": "vip"} for i in range(2, 4)
+        ])
+        await parking_service.register_vehicle_exit("CNT1")
+        await parking_service.register_vehicle_exits_bulk(["CNT2"])
+        await parking_service.parking_spot_repo.update_all_occupied_by_type("disabled", True)
+
+        assert await self.counters(parking_service) == await self.counters_from_spots(db_session)
+        status = await parking_service.get_parking_status()
+        assert status["total_spots"] == 15
+        assert status["occupied_spots"] == 1 + 3  # one vip, three disabled
+        assert await parking_service.parking_spot_repo.get_occupied_spots_count() == 4
+
+    async def test_counters_follow_spot_changes(self, parking_service, init_parking_spots, db_session):
+        spot = (await db_session.execute(select(ParkingSpot).where(ParkingSpot.spot_number == "1-02"))).scalar_one()
+        spot.floor, spot.spot_type, spot.is_occupied = 3, "regular", True
+        db_session.add(ParkingSpot(spot_number="4-01", floor=4, spot_type="regular", is_occupied=False))
+        await db_session.flush()
+        await db_session.delete(spot)
+        await db_session.flush()
+
+        assert await self.counters(parking_service) == await self.counters_from_spots(db_session)
+        assert await parking_service.parking_spot_repo.get_total_spots_count() == 15
+
+
 class TestDatabaseFunctions:
     """Tests for functions in src/database/database.py."""
 
@@ -337,3 +424,32 @@ class TestDatabaseFunctions:
         with Session(engine) as session:
             spot_count = session.query(ParkingSpot).count()
             assert spot_count == 60 # 3 floors * 20 spots
+
+    def test_init_db_rebuilds_daily_stats_behind_the_sessions(self, init_db_fixture):
+        """Sessions written outside ParkingService's unit of work are rolled up by the next init_db."""
+        from sqlalchemy.orm import Session
+        from src.infrastructure.persistence.models.models import DailyStats
+
+        engine = init_db_fixture
+        init_db()
+        entry = datetime(2025, 1, 1, 8, 0)
+        with Session(engine) as session:
+            vehicle = Vehicle(license_plate="RAW1", color="Red", brand="Kia")
+            spot = session.scalars(select(ParkingSpot)).first()
+            session.add(vehicle)
+            session.add_all([
+                ParkingSession(vehicle=vehicle, parking_spot=spot, entry_time=entry,
+                               exit_time=entry + timedelta(hours=2), amount_paid=10.0, payment_status="paid"),
+                ParkingSession(vehicle=vehicle, parking_spot=spot, entry_time=entry + timedelta(hours=3)),
+            ])
+            session.commit()
+            assert session.query(DailyStats).count() == 0
+
+        init_db()
+
+        with Session(engine) as session:
+            stats = session.query(DailyStats).all()
+            assert sum(row.entries for row in stats) == 2
+            assert sum(row.exits for row in stats) == 1
+            assert sum(row.revenue for row in stats) == 10.0
+
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
+
+from src.config.settings_env import Settings
+from src.infrastructure.persistence.database import create_app_engine, create_read_engine, sqlite_pragmas
+
+
+@pytest.fixture
+def engine_settings(tmp_path):
+    def make(**overrides):
+        return Settings(
+            DATABASE_URL=f"sqlite:///{tmp_path / 'engine.db'}",
+            ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'engine.db'}",
+            **overrides
+        )
+    return make
+
+
+async def pragma(conn, name):
+    return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+class TestAppEngine:
+    """Test the settings-driven engine factory."""
+
+    async def test_high_throughput_profile(self, engine_settings):
+        engine = create_app_engine(engine_settings(DB_PROFILE="high_throughput", DB_POOL_SIZE=5))
+        try:
+            async with engine.connect() as conn:
+                assert await pragma(conn, "journal_mode") == "wal"
+                assert await pragma(conn, "synchronous") == 1  # NORMAL
+                assert await pragma(conn, "busy_timeout") == 5000
+                assert await pragma(conn, "cache_size") == -64 * 1024
+                assert await pragma(conn, "temp_store") == 2  # MEMORY
+            assert engine.pool.size() == 5
+        finally:
+            await engine.dispose()
+
+    async def test_overrides_win_over_profile(self, engine_settings):
+        engine = create_app_engine(engine_settings(DB_PROFILE="default", DB_BUSY_TIMEOUT_MS=250, DB_POOL_SIZE=2))
+        try:
+            async with engine.connect() as conn:
+                assert await pragma(conn, "journal_mode") == "delete"
+                assert await pragma(conn, "synchronous") == 2  # FULL
+                assert await pragma(conn, "busy_timeout") == 250
+            assert engine.pool.size() == 2
+        finally:
+            await engine.dispose()
+
+    async def test_pool_size_zero_disables_pooling(self, engine_settings):
+        engine = create_app_engine(engine_settings(DB_POOL_SIZE=0))
+        try:
+            assert isinstance(engine.pool, NullPool)
+            async with engine.connect() as conn:
+                # Every new connection gets the PRAGMAs
+                assert await pragma(conn, "busy_timeout") == 5000
+        finally:
+            await engine.dispose()
+
+    async def test_reads_proceed_during_write_in_wal(self, engine_settings):
+        engine = create_app_engine(engine_settings(DB_PROFILE="high_throughput", DB_BUSY_TIMEOUT_MS=0))
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE TABLE gate (id INTEGER PRIMARY KEY)"))
+                await conn.execute(text("INSERT INTO gate (id) VALUES (1)"))
+
+            async with engine.connect() as writer, engine.connect() as reader:
+                await writer.execute(text("BEGIN IMMEDIATE"))
+                await writer.execute(text("INSERT INTO gate (id) VALUES (2)"))
+                # Would raise "database is locked" under the rollback journal
+                assert (await reader.execute(text("SELECT count(*) FROM gate"))).scalar() == 1
+                await writer.execute(text("COMMIT"))
+        finally:
+            await engine.dispose()
+
+    async def test_default_profile_writer_waits_for_the_lock(self, engine_settings):
+        engine = create_app_engine(engine_settings(DB_PROFILE="default", DB_POOL_SIZE=2))
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text("CREATE TABLE gate (id INTEGER PRIMARY KEY)"))
+
+            async with engine.connect() as first, engine.connect() as second:
+                assert await pragma(second, "busy_timeout") == 5000
+                await first.execute(text("BEGIN IMMEDIATE"))
+                await first.execute(text("INSERT INTO gate (id) VALUES (1)"))
+
+                async def release_lock():
+                    await asyncio.sleep(0.2)
+                    await first.execute(text("COMMIT"))
+
+                async def write():
+                    # Blocks on the lock until the first writer commits, rather than raising
+                    await second.execute(text("INSERT INTO gate (id) VALUES (2)"))
+                    await second.commit()
+
+                await asyncio.gather(release_lock(), write())
+                assert (await second.execute(text("SELECT count(*) FROM gate"))).scalar() == 2
+        finally:
+            await engine.dispose()
+
+    def test_unknown_profile(self, engine_settings):
+        with pytest.raises(ValueError, match="DB_PROFILE"):
+            sqlite_pragmas(engine_settings(DB_PROFILE="turbo"))
+
+
+class TestReadEngine:
+    """Test the read-only engine used by analytics and dashboard queries."""
+
+    async def test_read_engine_rejects_writes(self, engine_settings):
+        config = engine_settings()
+        writer, reader = create_app_engine(config), create_read_engine(config)
+        try:
+            async with writer.begin() as conn:
+                await conn.execute(text("CREATE TABLE gate (id INTEGER PRIMARY KEY)"))
+                await conn.execute(text("INSERT INTO gate (id) VALUES (1)"))
+
+            async with reader.connect() as conn:
+                assert await pragma(conn, "query_only") == 1
+                assert (await conn.execute(text("SELECT count(*) FROM gate"))).scalar() == 1
+                with pytest.raises(OperationalError, match="readonly"):
+                    await conn.execute(text("INSERT INTO gate (id) VALUES (2)"))
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+
+    async def test_reader_does_not_block_gate_writes(self, engine_settings):
+        config = engine_settings(DB_BUSY_TIMEOUT_MS=0)
+        writer, reader = create_app_engine(config), create_read_engine(config)
+        try:
+            async with writer.begin() as conn:
+                await conn.execute(text("CREATE TABLE gate (id INTEGER PRIMARY KEY)"))
+                await conn.execute(text("INSERT INTO gate (id) VALUES (1)"))
+
+            async with reader.connect() as report:
+                # An open read transaction, as during a long aggregate scan
+                await report.execute(text("BEGIN"))
+                assert (await report.execute(text("SELECT count(*) FROM gate"))).scalar() == 1
+                async with writer.begin() as gate:
+                    await gate.execute(text("INSERT INTO gate (id) VALUES (2)"))
+                # The report keeps its snapshot
+                assert (await report.execute(text("SELECT count(*) FROM gate"))).scalar() == 1
+                await report.execute(text("COMMIT"))
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+
+    def test_replica_url(self, engine_settings, tmp_path):
+        reader = create_read_engine(engine_settings(READ_DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"))
+        assert reader.url.database.endswith("replica.db")
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from src.infrastructure.ui.frames import active_sessions_frame, history_frame, potential_revenue
+
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def session_columns(count: int) -> dict:
+    """``count`` sessions entered every 30 minutes before ``NOW``; every other one exited."""
+    entry_time = [NOW - timedelta(minutes=30 * (i + 1)) for i in range(count)]
+    exited = [i % 2 == 1 for i in range(count)]
+    return {
+        "id": list(range(count)),
+        "entry_time": entry_time,
+        "exit_time": [entry + timedelta(hours=2) if done else None for entry, done in zip(entry_time, exited)],
+        "amount_paid": [10.0 if done else None for done in exited],
+        "payment_status": ["paid" if done else "pending" for done in exited],
+        "hourly_rate": [5.0] * count,
+        "license_plate": [f"PLT{i}" for i in range(count)],
+        "color": [("Red", "Blue")[i % 2] for i in range(count)],
+        "brand": [("Kia", "Ford", "Audi")[i % 3] for i in range(count)],
+        "spot_number": [f"1-{i % 20:02d}" for i in range(count)],
+        "floor": [1] * count,
+    }
+
+
+class TestFrames:
+    """Test the column-wise dashboard tables."""
+
+    def test_potential_revenue_bills_at_least_an_hour(self):
+        revenue = potential_revenue([NOW - timedelta(minutes=30), NOW - timedelta(hours=3)], [5.0, 2.0], NOW)
+        np.testing.assert_allclose(revenue, [5.0, 6.0])
+
+    def test_active_sessions_frame(self):
+        columns = session_columns(2)
+        frame = active_sessions_frame(columns, NOW)
+
+        assert list(frame["License Plate"]) == ["PLT0", "PLT1"]
+        assert list(frame["Duration (hours)"]) == [0.5, 1.0]
+        assert list(frame["Potential Revenue"]) == [5.0, 5.0]
+        assert frame["Entry Time"].iloc[0] == pd.Timestamp(columns["entry_time"][0])
+        for column in ("Color", "Brand", "Spot"):
+            assert isinstance(frame[column].dtype, pd.CategoricalDtype)
+
+    def test_history_frame(self):
+        frame = history_frame(session_columns(2), NOW)
+
+        assert list(frame["Status"]) == ["Parked", "Exited"]
+        assert pd.isna(frame["Exit Time"].iloc[0])
+        # Parked: measured up to now; exited: up to its exit
+        assert list(frame["Duration (hours)"]) == [0.5, 2.0]
+        assert np.isnan(frame["Final Revenue"].iloc[0]) and frame["Final Revenue"].iloc[1] == 10.0
+        assert frame["Potential Revenue"].iloc[0] == 5.0 and np.isnan(frame["Potential Revenue"].iloc[1])
+
+    def test_frames_build_from_shared_read_only_columns(self):
+        columns = MappingProxyType({name: tuple(values) for name, values in session_columns(4).items()})
+
+        history = history_frame(columns, NOW)
+        active = active_sessions_frame(columns, NOW)
+
+        assert list(history["License Plate"]) == list(columns["license_plate"])
+        assert list(history["Duration (hours)"]) == [0.5, 2.0, 1.5, 2.0]
+        assert list(active["Potential Revenue"]) == [5.0, 5.0, 7.5, 10.0]
+
+    def test_empty_columns(self):
+        columns = {name: [] for name in session_columns(0)}
+        assert history_frame(columns, NOW).empty
+        assert active_sessions_frame(columns, NOW).empty
+
+    def test_large_history_stores_repeated_text_once(self):
+        count = 100_000
+        frame = history_frame(session_columns(count), NOW)
+
+        assert len(frame) == count
+        assert frame["Status"].value_counts().to_dict() == {"Parked": count // 2, "Exited": count // 2}
+        # Category codes instead of one Python string per row
+        assert frame["Brand"].memory_usage(deep=True) < count * 2
@@ -0,0 +1,145 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+from src.domain import normalization
+from src.infrastructure.persistence.models.models import Base
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'migrations.db'}"
+
+
+@pytest.fixture
+def alembic_config(database_url):
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", database_url)
+    return config
+
+
+def index_names(database_url, table):
+    engine = create_engine(database_url)
+    try:
+        return {index["name"] for index in inspect(engine).get_indexes(table)}
+    finally:
+        engine.dispose()
+
+
+class TestMigrations:
+    """Test that the Alembic history builds the same schema as the models."""
+
+    def test_upgrade_empty_database(self, alembic_config, database_url):
+        command.upgrade(alembic_config, "head")
+
+        model_indexes = {index.name for index in Base.metadata.tables["parking_sessions"].indexes}
+        assert model_indexes <= index_names(database_url, "parking_sessions")
+        assert "ix_parking_spots_type_free" in index_names(database_url, "parking_spots")
+
+    def test_upgrade_database_created_by_init_db(self, alembic_config, database_url):
+        # Databases created by init_db before migrations existed have the tables but not the indexes
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            for table in ("parking_spots", "parking_sessions"):
+                for index in Base.metadata.tables[table].indexes:
+                    if index.name.startswith(("ix_parking_spots_", "ix_parking_sessions_")):
+                        index.drop(conn)
+        engine.dispose()
+
+        command.upgrade(alembic_config, "head")
+
+        assert "ix_parking_sessions_active" in index_names(database_url, "parking_sessions")
+
+    def test_downgrade_drops_indexes(self, alembic_config, database_url):
+        command.upgrade(alembic_config, "head")
+        command.downgrade(alembic_config, "0001_initial_schema")
+
+        assert "ix_parking_sessions_active" not in index_names(database_url, "parking_sessions")
+        assert "ix_parking_sessions_parking_spot_id" not in index_names(database_url, "parking_sessions")
+
+    def test_color_brand_backfill(self, alembic_config, database_url):
+        command.upgrade(alembic_config, "0003_daily_stats")
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO vehicles (license_plate, color, brand) VALUES "
+                "('OLD1', 'grey', 'vw'), ('OLD2', 'Gray ', 'Volkswagen'), ('OLD3', 'red', 'bmw')"
+            )
+        engine.dispose()
+
+        command.upgrade(alembic_config, "head")
+
+        engine = create_engine(database_url)
+        try:
+            with engine.connect() as conn:
+                rows = conn.exec_driver_sql(
+                    "SELECT v.license_plate, v.color, c.name, v.brand, b.name FROM vehicles v "
+                    "JOIN colors c ON c.id = v.color_id JOIN brands b ON b.id = v.brand_id ORDER BY v.license_plate"
+                ).all()
+        finally:
+            engine.dispose()
+        assert [tuple(row) for row in rows] == [
+            ("OLD1", "grey", "Gray", "vw", "Volkswagen"),
+            ("OLD2", "Gray ", "Gray", "Volkswagen", "Volkswagen"),
+            ("OLD3", "red", "Red", "bmw", "BMW"),
+        ]
+        assert {"ix_vehicles_color_id", "ix_vehicles_brand_id"} <= index_names(database_url, "vehicles")
+
+        command.downgrade(alembic_config, "0003_daily_stats")
+        assert "ix_vehicles_color_id" not in index_names(database_url, "vehicles")
+        engine = create_engine(database_url)
+        try:
+            with engine.connect() as conn:
+                colors = conn.exec_driver_sql("SELECT color, brand FROM vehicles ORDER BY license_plate").all()
+        finally:
+            engine.dispose()
+        # Nothing the downgrade would have to restore
+        assert [tuple(row) for row in colors] == [("grey", "vw"), ("Gray ", "Volkswagen"), ("red", "bmw")]
+
+    def test_color_brand_backfill_ignores_the_live_mapping(self, alembic_config, database_url, monkeypatch):
+        monkeypatch.setitem(normalization.COLOR_SYNONYMS, "navy", "blue")
+        command.upgrade(alembic_config, "0003_daily_stats")
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("INSERT INTO vehicles (license_plate, color, brand) VALUES ('OLD1', 'navy', 'Kia')")
+        engine.dispose()
+
+        command.upgrade(alembic_config, "0004_color_brand_dimensions")
+
+        engine = create_engine(database_url)
+        try:
+            with engine.connect() as conn:
+                colors = conn.exec_driver_sql("SELECT name FROM colors").scalars().all()
+        finally:
+            engine.dispose()
+        assert colors == ["Navy"]
+
+    def test_occupancy_counters_backfill(self, alembic_config, database_url):
+        command.upgrade(alembic_config, "0004_color_brand_dimensions")
+        engine = create_engine(database_url)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO parking_spots (spot_number, floor, spot_type, is_occupied) VALUES "
+                "('1-01', 1, 'regular', 1), ('1-02', 1, 'regular', 0), ('2-01', 2, 'vip', 0)"
+            )
+        engine.dispose()
+
+        command.upgrade(alembic_config, "head")
+
+        engine = create_engine(database_url)
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql("UPDATE parking_spots SET is_occupied = 1 WHERE spot_number = '2-01'")
+                counters = conn.exec_driver_sql(
+                    "SELECT floor, spot_type, total, occupied FROM occupancy_counters ORDER BY floor"
+                ).all()
+        finally:
+            engine.dispose()
+        assert [tuple(row) for row in counters] == [(1, "regular", 2, 1), (2, "vip", 1, 1)]
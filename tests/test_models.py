@@ -1,8 +1,8 @@
 import pytest
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from src.infrastructure.persistence.models.models import Base, Vehicle, ParkingSpot, ParkingSession
+from src.infrastructure.persistence.models.models import Base, Color, Vehicle, ParkingSpot, ParkingSession, resolve_dimension_ids
 
 
 @pytest.fixture(scope="function")
@@ -34,6 +34,27 @@ def test_vehicle_model(db_session):
     assert vehicle.created_at.tzinfo == timezone.utc
 
 
+def test_resolve_dimension_ids_when_another_writer_adds_the_name(db_session):
+    connection = db_session.connection()
+    lookups = []
+
+    # Another gate entry commits "Teal" between our lookup and our INSERT
+    def concurrent_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and not lookups:
+            lookups.append(statement)
+            cursor.connection.execute("INSERT INTO colors (name) VALUES ('Teal')")
+
+    event.listen(connection, "after_cursor_execute", concurrent_insert)
+    try:
+        ids = resolve_dimension_ids(connection, Color, ["Teal", "Red"])
+    finally:
+        event.remove(connection, "after_cursor_execute", concurrent_insert)
+
+    assert set(ids) == {"Teal", "Red"}
+    assert db_session.query(Color).count() == 2
+    assert ids["Teal"] == db_session.query(Color.id).filter(Color.name == "Teal").scalar()
+
+
 def test_parking_spot_model(db_session):
     spot = ParkingSpot(
         spot_number="A1", floor=1, is_occupied=False, spot_type="regular"
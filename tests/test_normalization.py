@@ -0,0 +1,18 @@
+from src.domain.normalization import canonical_brand, canonical_color
+
+
+def test_canonical_color():
+    assert canonical_color("grey") == "Gray"
+    assert canonical_color("  GRAY ") == "Gray"
+    assert canonical_color("light  grey") == "Light Gray"
+    assert canonical_color("Red") == "Red"
+    # Different colors, not different spellings
+    assert canonical_color("navy") == "Navy"
+    assert canonical_color("maroon") == "Maroon"
+
+
+def test_canonical_brand():
+    assert canonical_brand("vw") == "Volkswagen"
+    assert canonical_brand("Mercedes-Benz") == "Mercedes"
+    assert canonical_brand("bmw") == "BMW"
+    assert canonical_brand(" land rover ") == "Land Rover"
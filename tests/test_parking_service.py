@@ -1,5 +1,5 @@
 import pytest
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from freezegun import freeze_time
 
 from src.domain.common import SpotType, PaymentStatus
@@ -160,6 +160,12 @@ class TestParkingServiceVehicleExit:
         # Should charge for minimum 1 hour
         assert payment_info['amount_due'] == 5.0  # 1 hour * 5.0 hourly rate
     
+    async def test_register_vehicle_exit_normalizes_plate(self, parking_service, parked_vehicle):
+        """Test that the exit plate is normalized like the bulk path and echoed as registered."""
+        payment_info = await parking_service.register_vehicle_exit(" parked123 ")
+
+        assert payment_info['license_plate'] == "PARKED123"
+
     async def test_register_vehicle_exit_not_found(self, parking_service):
         """Test exit for vehicle not in parking."""
         with pytest.raises(ValueError, match="No active session"):
@@ -249,4 +255,210 @@ class TestParkingServiceStatus:
         
         # Test not found
         vehicle_none = await parking_service.get_vehicle_by_plate("NOTEXIST")
-        assert vehicle_none is None
\ No newline at end of file
+        assert vehicle_none is None
+
+class TestParkingSpotClaim:
+    """Test the atomic spot claim used by vehicle entry."""
+
+    async def test_claim_spot_marks_lowest_free_spot(self, parking_service, init_parking_spots):
+        spot = await parking_service.parking_spot_repo.claim_spot("regular")
+        assert spot.spot_number == "1-03"
+        assert spot.is_occupied is True
+
+        stored = await parking_service.parking_spot_repo.get_by_id(spot.id)
+        assert stored.is_occupied is True
+
+        next_spot = await parking_service.parking_spot_repo.claim_spot("regular")
+        assert next_spot.spot_number == "1-04"
+
+    async def test_claim_specific_spot_only_once(self, parking_service, init_parking_spots):
+        first = await parking_service.parking_spot_repo.claim_spot("regular", spot_id=3)
+        second = await parking_service.parking_spot_repo.claim_spot("regular", spot_id=3)
+        assert first.id == 3
+        assert second is None
+
+    async def test_claim_spot_wrong_type(self, parking_service, init_parking_spots):
+        # Spot 1 is a disabled spot and cannot be claimed as regular
+        assert await parking_service.parking_spot_repo.claim_spot("regular", spot_id=1) is None
+
+    async def test_claim_spot_none_free(self, parking_service, init_parking_spots):
+        await parking_service.parking_spot_repo.update_all_occupied_by_type("vip", True)
+        assert await parking_service.parking_spot_repo.claim_spot("vip") is None
+
+
+class TestCloseActiveSession:
+    """Test the single-statement session close used by vehicle exit."""
+
+    async def test_fee_is_computed_in_sql(self, parking_service, parked_vehicle):
+        exit_time = parked_vehicle['entry_time'] + timedelta(hours=2, minutes=30)
+        session = await parking_service.parking_session_repo.close_active_session("PARKED123", exit_time)
+
+        assert session.id == parked_vehicle['id']
+        assert session.exit_time == exit_time
+        assert session.amount_paid == 12.5
+        assert session.payment_status == PaymentStatus.PAID
+
+    async def test_no_active_session(self, parking_service, parked_vehicle):
+        exit_time = parked_vehicle['entry_time'] + timedelta(hours=1)
+        assert await parking_service.parking_session_repo.close_active_session("PARKED123", exit_time) is not None
+        assert await parking_service.parking_session_repo.close_active_session("PARKED123", exit_time) is None
+
+    async def test_release_spot(self, parking_service, parked_vehicle):
+        spot = await parking_service.parking_spot_repo.release_spot(parked_vehicle['parking_spot_id'])
+        assert spot.spot_number == parked_vehicle['parking_spot']['spot_number']
+        assert spot.is_occupied is False
+        assert await parking_service.parking_spot_repo.release_spot(9999) is None
+
+
+class TestParkingServiceBulk:
+    """Test bulk registration of buffered gate events."""
+
+    async def test_bulk_entries(self, parking_service, init_parking_spots, parked_vehicle):
+        results = await parking_service.register_vehicle_entries_bulk([
+            {"license_plate": "BULK1", "color": "Red", "brand": "Kia", "spot_type": SpotType.REGULAR},
+            {"license_plate": "bulk2", "color": "Blue", "brand": "Fiat"},
+            {"license_plate": "PARKED123", "color": "Silver", "brand": "Mercedes"},
+            {"license_plate": "BULK1", "color": "Red", "brand": "Kia"},
+            {"license_plate": "VIP1", "color": "Black", "brand": "BMW", "spot_type": "vip"},
+        ])
+
+        assert [r["status"] for r in results] == ["ok", "ok", "error", "error", "ok"]
+        assert results[0]["parking_spot"]["spot_number"] == "1-04"
+        assert results[1]["license_plate"] == "BULK2"
+        assert results[1]["parking_spot"]["spot_number"] == "1-05"
+        assert "already in the parking" in results[2]["error"]
+        assert "already in the parking" in results[3]["error"]
+        assert results[4]["parking_spot"]["spot_number"] == "1-02"
+
+        session = await parking_service.parking_session_repo.get_active_session_by_license_plate("BULK2")
+        assert session.id == results[1]["id"]
+        assert session.payment_status == PaymentStatus.PENDING
+        vehicle = await parking_service.vehicle_repo.get_by_license_plate("BULK2")
+        assert vehicle.id == results[1]["vehicle_id"]
+
+    async def test_bulk_entries_reuse_existing_vehicle(self, parking_service, sample_vehicle, init_parking_spots):
+        results = await parking_service.register_vehicle_entries_bulk([
+            {"license_plate": sample_vehicle.license_plate, "color": "Red", "brand": "Toyota"},
+        ])
+        assert results[0]["vehicle_id"] == sample_vehicle.id
+
+    async def test_bulk_entries_run_out_of_spots(self, parking_service, init_parking_spots):
+        results = await parking_service.register_vehicle_entries_bulk([
+            {"license_plate": f"DIS{i}", "color": "Red", "brand": "Kia", "spot_type": SpotType.DISABLED}
+            for i in range(4)
+        ])
+
+        assert [r["status"] for r in results] == ["ok", "ok", "ok", "error"]
+        assert "No available" in results[3]["error"]
+
+    async def test_bulk_entries_report_malformed_events(self, parking_service, init_parking_spots):
+        results = await parking_service.register_vehicle_entries_bulk([
+            {"license_plate": "GOOD1", "color": "Red", "brand": "Kia"},
+            {"license_plate": "BAD1", "color": "Red", "brand": "Kia", "spot_type": "compact"},
+            {"license_plate": "BAD2", "brand": "Kia"},
+            {"color": "Red", "brand": "Kia"},
+            {"license_plate": "GOOD2", "color": "Blue", "brand": "Fiat", "spot_type": "vip"},
+        ])
+
+        assert [r["status"] for r in results] == ["ok", "error", "error", "error", "ok"]
+        assert "Unknown spot type 'compact'" in results[1]["error"]
+        assert "missing color" in results[2]["error"]
+        assert results[2]["license_plate"] == "BAD2"
+        assert "missing license_plate" in results[3]["error"]
+
+        # The valid events were committed despite the malformed ones
+        for plate in ("GOOD1", "GOOD2"):
+            assert await parking_service.parking_session_repo.get_active_session_by_license_plate(plate)
+        assert await parking_service.vehicle_repo.get_by_license_plate("BAD1") is None
+
+    async def test_bulk_exits(self, parking_service, init_parking_spots):
+        with freeze_time("2025-01-01 08:00:00"):
+            await parking_service.register_vehicle_entries_bulk([
+                {"license_plate": "OUT1", "color": "Red", "brand": "Kia"},
+                {"license_plate": "OUT2", "color": "Red", "brand": "Kia"},
+            ])
+
+        with freeze_time("2025-01-01 11:00:00"):
+            results = await parking_service.register_vehicle_exits_bulk(["OUT1", "GHOST", "out2", "OUT1"])
+
+        assert [r["status"] for r in results] == ["ok", "error", "ok", "error"]
+        assert results[0]["amount_due"] == 15.0
+        assert results[0]["duration_hours"] == 3.0
+        assert "No active session" in results[1]["error"]
+
+        status = await parking_service.get_parking_status()
+        assert status["occupied_spots"] == 0
+
+
+class TestParkingServiceHistory:
+    """Test keyset-paginated, filtered session history."""
+
+    @pytest.fixture
+    async def history(self, parking_service, init_parking_spots):
+        # Six visits one hour apart, two of them at the same instant to exercise the id tie-break
+        base = datetime(2025, 1, 1, 8, 0, tzinfo=timezone.utc)
+        entry_times = [base, base + timedelta(hours=1), base + timedelta(hours=2),
+                       base + timedelta(hours=2), base + timedelta(hours=3), base + timedelta(days=1)]
+        for i, entry_time in enumerate(entry_times):
+            with freeze_time(entry_time):
+                await parking_service.register_vehicle_entry(
+                    license_plate=f"HIS{i}", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+                )
+        with freeze_time(base + timedelta(days=2)):
+            for i in (0, 1):
+                await parking_service.register_vehicle_exit(f"HIS{i}")
+        return base
+
+    async def test_pages_cover_history_once_newest_first(self, parking_service, history):
+        plates, cursor, pages = [], None, 0
+        while True:
+            page = await parking_service.get_sessions_page(limit=4, cursor=cursor)
+            plates.extend(item["vehicle"]["license_plate"] for item in page["items"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert pages == 2
+        assert plates == ["HIS5", "HIS4", "HIS3", "HIS2", "HIS1", "HIS0"]
+
+    async def test_exact_page_size_has_no_next_cursor(self, parking_service, history):
+        page = await parking_service.get_sessions_page(limit=6)
+        assert len(page["items"]) == 6
+        assert page["next_cursor"] is None
+
+    async def test_filters(self, parking_service, history):
+        exited = await parking_service.get_sessions_page(status="exited")
+        assert {item["vehicle"]["license_plate"] for item in exited["items"]} == {"HIS0", "HIS1"}
+
+        parked = await parking_service.get_sessions_page(status="parked")
+        assert len(parked["items"]) == 4
+
+        by_plate = await parking_service.get_sessions_page(license_plate="his3")
+        assert [item["vehicle"]["license_plate"] for item in by_plate["items"]] == ["HIS3"]
+
+        first_day = await parking_service.get_sessions_page(start=history, end=history + timedelta(days=1))
+        assert len(first_day["items"]) == 5
+
+        floor_one = await parking_service.get_sessions_page(floor=1)
+        assert all(item["parking_spot"]["floor"] == 1 for item in floor_one["items"])
+        assert len(floor_one["items"]) == 3
+
+    async def test_columnar_pages_match_row_pages(self, parking_service, history):
+        rows = await parking_service.get_sessions_page(limit=4)
+        columns = await parking_service.get_sessions_page(limit=4, columnar=True)
+
+        assert columns["next_cursor"] == rows["next_cursor"]
+        assert columns["items"]["license_plate"] == tuple(item["vehicle"]["license_plate"] for item in rows["items"])
+        assert columns["items"]["exit_time"] == tuple(item["exit_time"] for item in rows["items"])
+
+        empty = await parking_service.get_sessions_page(license_plate="NOPE", columnar=True)
+        assert empty["items"]["id"] == () and empty["items"]["floor"] == ()
+
+    async def test_columnar_active_sessions(self, parking_service, history):
+        active = await parking_service.get_active_sessions(columnar=True)
+        assert active["license_plate"] == ("HIS5", "HIS4", "HIS3", "HIS2")
+
+    async def test_unknown_status(self, parking_service, history):
+        with pytest.raises(ValueError):
+            await parking_service.get_sessions_page(status="lost")
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from freezegun import freeze_time
+
+from src.domain.common import SpotType
+from src.infrastructure.export.parquet_exporter import MANIFEST_NAME, ParquetSessionExporter, read_sessions
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+async def visit(parking_service, plate, entry, exit=None, color="Red"):
+    with freeze_time(entry):
+        await parking_service.register_vehicle_entry(
+            license_plate=plate, color=color, brand="Kia", spot_type=SpotType.REGULAR
+        )
+    if exit:
+        with freeze_time(exit):
+            await parking_service.register_vehicle_exit(plate)
+
+
+@pytest.fixture
+async def two_months(parking_service, init_parking_spots):
+    await visit(parking_service, "JAN1", "2025-01-10 08:00:00", "2025-01-10 10:00:00")
+    await visit(parking_service, "JAN2", "2025-01-20 08:00:00", "2025-01-20 09:00:00", color="Blue")
+    await visit(parking_service, "FEB1", "2025-02-03 08:00:00")
+
+
+@pytest.fixture
+def exporter(parking_service, tmp_path):
+    return ParquetSessionExporter(parking_service.parking_session_repo, tmp_path / "sessions", chunk_size=1)
+
+
+class TestParquetSessionExporter:
+    """Test the monthly-partitioned Parquet export."""
+
+    async def test_export_writes_one_partition_per_month(self, exporter, two_months):
+        summary = await exporter.export()
+        assert summary == {"written": ["2025-01", "2025-02"], "skipped": [], "removed": []}
+
+        january = pq.read_table(exporter.output_dir / "month=2025-01" / "sessions.parquet")
+        assert january.num_rows == 2
+        # chunk_size=1: one row group per streamed chunk
+        assert pq.ParquetFile(exporter.output_dir / "month=2025-01" / "sessions.parquet").num_row_groups == 2
+        assert pa.types.is_dictionary(january.schema.field("color").type)
+        assert pa.types.is_string(january.schema.field("license_plate").type)
+        assert sorted(january.column("license_plate").to_pylist()) == ["JAN1", "JAN2"]
+        assert january.column("entry_time").to_pylist()[0].tzinfo is not None
+
+    async def test_second_run_only_rewrites_changed_months(self, exporter, two_months, parking_service):
+        await exporter.export()
+        assert (await exporter.export())["written"] == []
+
+        # Closing the February session changes only February
+        with freeze_time("2025-02-03 12:00:00"):
+            await parking_service.register_vehicle_exit("FEB1")
+        summary = await exporter.export()
+        assert summary["written"] == ["2025-02"]
+        assert summary["skipped"] == ["2025-01"]
+
+        manifest = json.loads((exporter.output_dir / MANIFEST_NAME).read_text())
+        assert set(manifest) == {"2025-01", "2025-02"}
+
+    async def test_read_sessions_prunes_months(self, exporter, two_months):
+        await exporter.export()
+
+        table = read_sessions(exporter.output_dir, start_month="2025-02", columns=["license_plate", "amount_paid"])
+        assert table.column("license_plate").to_pylist() == ["FEB1"]
+        assert read_sessions(exporter.output_dir).num_rows == 3
@@ -0,0 +1,117 @@
+"""EXPLAIN QUERY PLAN checks: each index must be used by the repository query it exists for."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, func, select
+
+from src.infrastructure.persistence.models.models import ParkingSpot as ORMParkingSpot
+from src.infrastructure.persistence.sqlalchemy_repositories import (
+    SQLAlchemyParkingSessionRepository,
+    SQLAlchemyParkingSpotRepository,
+    SQLAlchemyVehicleRepository,
+)
+
+
+@pytest.fixture
+def query_plans(test_db):
+    """Run a repository call and return the query plan of every SELECT/UPDATE it issued."""
+    engine = test_db.kw["bind"]
+
+    async def explain(call):
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            async with test_db() as db:
+                await call(db)
+                await db.rollback()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+        plans = []
+        async with engine.connect() as conn:
+            for statement, parameters in statements:
+                result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                plans.append(" | ".join(row[-1] for row in result))
+        return plans
+
+    return explain
+
+
+def cutoff():
+    return datetime.now(timezone.utc) - timedelta(days=1)
+
+
+class TestParkingSessionIndexes:
+    """Each parking_sessions index is justified by a query plan."""
+
+    async def test_current_vehicle_count_uses_partial_index(self, query_plans):
+        plans = await query_plans(lambda db: SQLAlchemyParkingSessionRepository(db).get_current_vehicle_count())
+        assert "ix_parking_sessions_active" in plans[0]
+
+    async def test_active_session_by_plate_uses_partial_index(self, query_plans):
+        plans = await query_plans(
+            lambda db: SQLAlchemyParkingSessionRepository(db).get_active_session_by_license_plate("ABC123")
+        )
+        assert "ix_vehicles_license_plate" in plans[0]
+        assert "ix_parking_sessions_active" in plans[0]
+
+    async def test_close_active_session_uses_partial_index(self, query_plans):
+        plans = await query_plans(
+            lambda db: SQLAlchemyParkingSessionRepository(db).close_active_session("ABC123", datetime.now(timezone.utc))
+        )
+        assert "ix_parking_sessions_active" in plans[0]
+
+    async def test_revenue_uses_status_exit_time_index(self, query_plans):
+        plans = await query_plans(lambda db: SQLAlchemyParkingSessionRepository(db).get_revenue_last_hours(24))
+        assert "COVERING INDEX ix_parking_sessions_status_exit_time" in plans[0]
+
+    async def test_daily_average_uses_entry_time_index(self, query_plans):
+        plans = await query_plans(lambda db: SQLAlchemyParkingSessionRepository(db).get_daily_average_vehicles(30))
+        assert "ix_parking_sessions_entry_time" in plans[0]
+
+    async def test_parking_analytics_is_one_statement(self, query_plans):
+        plans = await query_plans(lambda db: SQLAlchemyParkingSessionRepository(db).get_parking_analytics())
+        assert len(plans) == 1
+        assert "ix_parking_sessions_active" in plans[0]
+        assert "ix_parking_sessions_entry_time" in plans[0]
+
+    async def test_floor_distribution_reads_counters(self, query_plans):
+        plans = await query_plans(lambda db: SQLAlchemyParkingSpotRepository(db).get_floor_distribution(True))
+        assert "occupancy_counters" in plans[0]
+        assert "parking_sessions" not in plans[0]
+
+    async def test_vehicle_join_uses_vehicle_id_index(self, query_plans):
+        plans = await query_plans(lambda db: SQLAlchemyVehicleRepository(db).count_by_color("red", active_only=False))
+        assert "ix_parking_sessions_vehicle_id" in plans[0]
+
+    async def test_spot_sessions_use_parking_spot_id_index(self, query_plans):
+        # From a spot to its sessions (ParkingSpot.parking_sessions)
+        plans = await query_plans(lambda db: db.execute(
+            select(func.count())
+            .select_from(ORMParkingSpot)
+            .join(ORMParkingSpot.parking_sessions)
+            .where(ORMParkingSpot.spot_number == "1-01")
+        ))
+        assert "ix_parking_sessions_parking_spot_id" in plans[0]
+
+    async def test_color_filter_uses_color_id_index(self, query_plans):
+        plans = await query_plans(lambda db: SQLAlchemyVehicleRepository(db).count_by_color("red", active_only=False))
+        assert "ix_vehicles_color_id" in plans[0]
+
+
+class TestParkingSpotIndexes:
+    async def test_claim_spot_uses_type_free_index(self, query_plans):
+        plans = await query_plans(lambda db: SQLAlchemyParkingSpotRepository(db).claim_spot("regular"))
+        assert "ix_parking_spots_type_free" in plans[0]
+
+
+class TestHistoryPagination:
+    async def test_history_page_walks_entry_time_index(self, query_plans):
+        cursor = (datetime.now(timezone.utc), 10)
+        plans = await query_plans(lambda db: SQLAlchemyParkingSessionRepository(db).get_sessions_page(cursor=cursor))
+        assert "ix_parking_sessions_entry_time" in plans[0]
+        assert "TEMP B-TREE" not in plans[0]
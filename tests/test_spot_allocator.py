@@ -0,0 +1,180 @@
+import pytest
+from sqlalchemy import update
+
+from src.application.services.parking_service import ParkingService
+from src.application.services.spot_allocator import FreeSpotIndex
+from src.domain.common import SpotType
+from src.domain.entities import ParkingSpot
+from src.infrastructure.persistence.models.models import ParkingSpot as ORMParkingSpot
+
+
+def make_spot(spot_id, floor, number, spot_type="regular", is_occupied=False):
+    return ParkingSpot(
+        id=spot_id, spot_number=f"{floor}-{number:02d}", floor=floor,
+        spot_type=spot_type, is_occupied=is_occupied
+    )
+
+
+class FakeSpotRepository:
+    def __init__(self, spots):
+        self.spots = spots
+
+    async def get_all(self):
+        return list(self.spots)
+
+
+@pytest.fixture
+async def spot_index(parking_service, init_parking_spots):
+    index = FreeSpotIndex()
+    await index.load(parking_service.parking_spot_repo)
+    return index
+
+
+@pytest.fixture
+async def indexed_parking_service(db_session, parking_service, spot_index):
+    return ParkingService(
+        vehicle_repo=parking_service.vehicle_repo,
+        parking_spot_repo=parking_service.parking_spot_repo,
+        parking_session_repo=parking_service.parking_session_repo,
+        unit_of_work=parking_service.unit_of_work,
+        spot_index=spot_index
+    )
+
+
+class TestFreeSpotIndex:
+    """Test the in-memory free-spot index."""
+
+    async def test_acquire_returns_lowest_floor_and_number(self):
+        index = FreeSpotIndex()
+        await index.load(FakeSpotRepository([
+            make_spot(1, 2, 1), make_spot(2, 1, 3), make_spot(3, 1, 2), make_spot(4, 1, 1, is_occupied=True)
+        ]))
+
+        assert [index.acquire(SpotType.REGULAR).id for _ in range(3)] == [3, 2, 1]
+        assert index.acquire(SpotType.REGULAR) is None
+
+    async def test_acquire_filters_by_type(self):
+        index = FreeSpotIndex()
+        await index.load(FakeSpotRepository([make_spot(1, 1, 1, "vip"), make_spot(2, 1, 2)]))
+
+        spot = index.acquire(SpotType.VIP)
+        assert spot.id == 1
+        assert spot.spot_type == "vip"
+        assert index.acquire(SpotType.VIP) is None
+        assert index.acquire(SpotType.DISABLED) is None
+
+    async def test_release_and_discard(self):
+        index = FreeSpotIndex()
+        await index.load(FakeSpotRepository([make_spot(1, 1, 1), make_spot(2, 1, 2)]))
+
+        first = index.acquire(SpotType.REGULAR)
+        index.release(first)
+        index.release(first)  # releasing twice must not duplicate the spot
+        assert index.free_count(SpotType.REGULAR) == 2
+
+        index.discard(1)
+        assert index.acquire(SpotType.REGULAR).id == 2
+        assert index.acquire(SpotType.REGULAR) is None
+
+    async def test_reconcile_reports_drift(self):
+        spots = [make_spot(1, 1, 1), make_spot(2, 1, 2)]
+        repo = FakeSpotRepository(spots)
+        index = FreeSpotIndex()
+        await index.load(repo)
+
+        # Spot 1 was taken by another process, spot 3 was added to the garage
+        spots[0].is_occupied = True
+        spots.append(make_spot(3, 1, 3))
+
+        drift = await index.reconcile(repo)
+        assert drift == {"added": 1, "removed": 1}
+        assert index.free_count(SpotType.REGULAR) == 2
+
+
+class TestParkingServiceWithSpotIndex:
+    """Test that ParkingService keeps the index in step with the table."""
+
+    async def test_entry_and_exit_update_index(self, indexed_parking_service, spot_index):
+        free_before = spot_index.free_count(SpotType.REGULAR)
+
+        response = await indexed_parking_service.register_vehicle_entry(
+            license_plate="IDX123", color="Blue", brand="Audi", spot_type=SpotType.REGULAR
+        )
+        assert response["parking_spot"]["spot_number"] == "1-03"
+        assert spot_index.free_count(SpotType.REGULAR) == free_before - 1
+
+        spot = await indexed_parking_service.parking_spot_repo.get_by_id(response["parking_spot_id"])
+        assert spot.is_occupied is True
+
+        await indexed_parking_service.register_vehicle_exit("IDX123")
+        assert spot_index.free_count(SpotType.REGULAR) == free_before
+
+    async def test_empty_index_falls_back_to_database(self, indexed_parking_service, spot_index):
+        while spot_index.acquire(SpotType.VIP):
+            pass
+
+        response = await indexed_parking_service.register_vehicle_entry(
+            license_plate="VIP001", color="Black", brand="BMW", spot_type=SpotType.VIP
+        )
+        assert response["parking_spot"]["spot_number"] == "1-02"
+
+    async def test_stale_index_candidate_is_skipped(self, indexed_parking_service, spot_index, db_session):
+        # Another process took spot 1-03 without this index knowing
+        await db_session.execute(
+            update(ORMParkingSpot).where(ORMParkingSpot.spot_number == "1-03").values(is_occupied=True)
+        )
+
+        response = await indexed_parking_service.register_vehicle_entry(
+            license_plate="STALE1", color="Black", brand="BMW", spot_type=SpotType.REGULAR
+        )
+        assert response["parking_spot"]["spot_number"] == "1-04"
+
+    async def test_entry_fails_when_no_spot_free(self, indexed_parking_service, db_session):
+        await db_session.execute(
+            update(ORMParkingSpot).where(ORMParkingSpot.spot_type == "vip").values(is_occupied=True)
+        )
+
+        with pytest.raises(ValueError, match="No available"):
+            await indexed_parking_service.register_vehicle_entry(
+                license_plate="NOVIP1", color="Black", brand="BMW", spot_type=SpotType.VIP
+            )
+
+    async def test_reconcile_after_out_of_band_change(self, indexed_parking_service, spot_index, db_session):
+        await db_session.execute(
+            update(ORMParkingSpot).where(ORMParkingSpot.spot_type == "disabled").values(is_occupied=True)
+        )
+        await db_session.commit()
+
+        drift = await spot_index.reconcile(indexed_parking_service.parking_spot_repo)
+        assert drift["removed"] == 3
+        assert spot_index.free_count(SpotType.DISABLED) == 0
+
+    async def test_repeated_stale_candidates_reconcile_the_index(self, indexed_parking_service, spot_index, db_session):
+        # Another worker filled all regular spots of floor 1
+        await db_session.execute(
+            update(ORMParkingSpot)
+            .where(ORMParkingSpot.spot_number.in_(["1-03", "1-04", "1-05"]))
+            .values(is_occupied=True)
+        )
+        await db_session.commit()
+        reconciles = []
+        original = spot_index.reconcile
+
+        async def counting(repo):
+            reconciles.append(await original(repo))
+            return reconciles[-1]
+
+        spot_index.reconcile = counting
+
+        response = await indexed_parking_service.register_vehicle_entry(
+            license_plate="DRIFT1", color="Black", brand="BMW", spot_type=SpotType.REGULAR
+        )
+
+        assert response["parking_spot"]["spot_number"] == "2-03"
+        assert len(reconciles) == 1
+        # The third out-of-band claim was repaired without trying it
+        assert reconciles[0]["removed"] == 1
+        spots = await indexed_parking_service.parking_spot_repo.get_all()
+        free_regular = {spot.id for spot in spots if spot.spot_type == "regular" and not spot.is_occupied}
+        assert spot_index.free_count(SpotType.REGULAR) == len(free_regular)
+
@@ -0,0 +1,262 @@
+import asyncio
+import pytest
+from sqlalchemy import select, func, event
+from sqlalchemy.orm import Session
+
+from src.application.services.parking_service import ParkingService
+from src.domain.common import SpotType
+from src.domain.entities import Vehicle
+from src.infrastructure.persistence.models.models import ParkingSession as ORMParkingSession, ParkingSpot as ORMParkingSpot
+from src.infrastructure.persistence.sqlalchemy_repositories import SQLAlchemyVehicleRepository
+from src.infrastructure.persistence.unit_of_work import SQLAlchemyUnitOfWork
+from src.shared.cache import MISSING, TTLCache
+
+
+@pytest.fixture
+def commit_counter():
+    """Count COMMITs issued by any session."""
+    counts = {"commits": 0}
+
+    def on_commit(session):
+        counts["commits"] += 1
+
+    event.listen(Session, "after_commit", on_commit)
+    yield counts
+    event.remove(Session, "after_commit", on_commit)
+
+
+class TestSQLAlchemyUnitOfWork:
+    """Test one-transaction-per-gate-event behaviour."""
+
+    async def test_entry_commits_once(self, test_db, init_parking_spots, commit_counter):
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            service = ParkingService.from_unit_of_work(uow)
+            await service.register_vehicle_entry(
+                license_plate="UOW123", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+        assert commit_counter["commits"] == 1
+
+        # The entry is durable and visible from a fresh session
+        async with test_db() as db:
+            count = await db.scalar(select(func.count(ORMParkingSession.id)))
+            occupied = await db.scalar(select(func.count(ORMParkingSpot.id)).where(ORMParkingSpot.is_occupied == True))
+        assert count == 1
+        assert occupied == 1
+
+    async def test_exit_commits_once(self, test_db, init_parking_spots, commit_counter):
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            await ParkingService.from_unit_of_work(uow).register_vehicle_entry(
+                license_plate="UOW456", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            payment = await ParkingService.from_unit_of_work(uow).register_vehicle_exit("UOW456")
+
+        assert payment["amount_due"] == 5.0
+        assert commit_counter["commits"] == 2
+
+    async def test_failed_entry_rolls_back(self, test_db, init_parking_spots, monkeypatch):
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            service = ParkingService.from_unit_of_work(uow)
+
+            async def failing_add(session):
+                raise RuntimeError("disk full")
+
+            monkeypatch.setattr(uow.parking_session_repo, "add", failing_add)
+            with pytest.raises(RuntimeError):
+                await service.register_vehicle_entry(
+                    license_plate="HALF123", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+                )
+
+        # Neither the vehicle, the session nor the spot claim survived the failed gate event
+        async with test_db() as db:
+            assert await db.scalar(select(func.count(ORMParkingSession.id))) == 0
+            assert await db.scalar(select(func.count(ORMParkingSpot.id)).where(ORMParkingSpot.is_occupied == True)) == 0
+            assert await SQLAlchemyVehicleRepository(db).get_by_license_plate("HALF123") is None
+
+    async def test_service_requires_a_unit_of_work(self, db_session):
+        uow = SQLAlchemyUnitOfWork.for_session(db_session)
+        with pytest.raises(TypeError):
+            ParkingService(uow.vehicle_repo, uow.parking_spot_repo, uow.parking_session_repo)
+
+    async def test_caller_session_is_committed_and_rolled_back(self, test_db, init_parking_spots, monkeypatch):
+        async with test_db() as db:
+            uow = SQLAlchemyUnitOfWork.for_session(db)
+            service = ParkingService.from_unit_of_work(uow)
+            await service.register_vehicle_entry(
+                license_plate="OWN123", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+
+            async def failing_add(session):
+                raise RuntimeError("disk full")
+
+            monkeypatch.setattr(uow.parking_session_repo, "add", failing_add)
+            with pytest.raises(RuntimeError):
+                await service.register_vehicle_entry(
+                    license_plate="HALF456", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+                )
+
+            # The caller's session is still usable and holds nothing of the failed entry
+            assert not db.new and not db.dirty
+            assert await SQLAlchemyVehicleRepository(db).get_by_license_plate("HALF456") is None
+
+        # The first entry is durable; the failed one left no claimed spot behind
+        async with test_db() as db:
+            assert await db.scalar(select(func.count(ORMParkingSession.id))) == 1
+            assert await db.scalar(select(func.count(ORMParkingSpot.id)).where(ORMParkingSpot.is_occupied == True)) == 1
+
+    async def test_exception_in_block_rolls_back(self, test_db, init_parking_spots):
+        with pytest.raises(ValueError):
+            async with SQLAlchemyUnitOfWork(test_db) as uow:
+                await uow.parking_spot_repo.update_all_occupied(True)
+                raise ValueError("abort")
+
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            assert await uow.parking_spot_repo.get_occupied_spots_count() == 0
+
+    async def test_concurrent_entries_get_distinct_spots(self, test_db, init_parking_spots):
+        async def enter(plate):
+            async with SQLAlchemyUnitOfWork(test_db) as uow:
+                return await ParkingService.from_unit_of_work(uow).register_vehicle_entry(
+                    license_plate=plate, color="Red", brand="Kia", spot_type=SpotType.REGULAR
+                )
+
+        responses = await asyncio.gather(*(enter(f"RACE{i}") for i in range(6)))
+
+        spot_ids = [response["parking_spot_id"] for response in responses]
+        assert len(set(spot_ids)) == 6
+
+    async def test_exit_uses_two_statements(self, test_db, init_parking_spots):
+        async with SQLAlchemyUnitOfWork(test_db) as uow:
+            await ParkingService.from_unit_of_work(uow).register_vehicle_entry(
+                license_plate="FAST1", color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = test_db.kw["bind"].sync_engine
+        event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            async with SQLAlchemyUnitOfWork(test_db) as uow:
+                payment = await ParkingService.from_unit_of_work(uow).register_vehicle_exit("FAST1")
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+        assert payment["license_plate"] == "FAST1"
+        assert payment["amount_due"] == 5.0
+        # Close the session and free the spot; the rest maintains the daily rollups and
+        # reads the registered plate (a cache hit when the unit of work has an identity cache)
+        writes = [
+            statement for statement in statements
+            if "daily_" not in statement and not statement.lstrip().upper().startswith("SELECT")
+        ]
+        assert len(writes) == 2
+        assert all(statement.lstrip().upper().startswith("UPDATE") for statement in writes)
+        assert len(statements) == 5
+
+    async def test_bulk_entry_statements_do_not_grow_with_batch(self, test_db, init_parking_spots):
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        async def run_batch(prefix, size):
+            statements.clear()
+            async with SQLAlchemyUnitOfWork(test_db) as uow:
+                results = await ParkingService.from_unit_of_work(uow).register_vehicle_entries_bulk([
+                    {"license_plate": f"{prefix}{i}", "color": "Red", "brand": "Kia"} for i in range(size)
+                ])
+            assert all(result["status"] == "ok" for result in results)
+            return len(statements)
+
+        engine = test_db.kw["bind"].sync_engine
+        event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            # Creates the color and brand rows, which later batches only look up
+            await run_batch("W", 1)
+            small = await run_batch("S", 2)
+            large = await run_batch("L", 6)
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+        assert small == large
+
+
+class TestVehicleIdentityCache:
+    """Test the process-wide vehicle cache shared by units of work."""
+
+    async def visit(self, test_db, identity_cache, plate):
+        async with SQLAlchemyUnitOfWork(test_db, identity_cache=identity_cache) as uow:
+            await ParkingService.from_unit_of_work(uow).register_vehicle_entry(
+                license_plate=plate, color="Red", brand="Kia", spot_type=SpotType.REGULAR
+            )
+        async with SQLAlchemyUnitOfWork(test_db, identity_cache=identity_cache) as uow:
+            await ParkingService.from_unit_of_work(uow).register_vehicle_exit(plate)
+
+    async def test_returning_vehicle_is_not_queried(self, test_db, init_parking_spots):
+        identity_cache = TTLCache(maxsize=100, default_ttl=600)
+        # First visit inserts the vehicle, its exit reads (and caches) it
+        await self.visit(test_db, identity_cache, "DAILY1")
+        hits = identity_cache.stats()["hits"]
+
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = test_db.kw["bind"].sync_engine
+        event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            await self.visit(test_db, identity_cache, "DAILY1")
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+        assert not any("FROM vehicles" in statement and "JOIN" not in statement for statement in statements)
+        # By plate on entry, by id on exit
+        assert identity_cache.stats()["hits"] - hits == 2
+
+        async with test_db() as db:
+            assert await db.scalar(select(func.count(ORMParkingSession.id))) == 2
+
+    async def test_bulk_lookup_queries_only_misses(self, test_db, init_parking_spots, db_session):
+        identity_cache = TTLCache(maxsize=100, default_ttl=600)
+        # The exit of the visit reads (and caches) the vehicle
+        await self.visit(test_db, identity_cache, "KNOWN1")
+        repo = SQLAlchemyVehicleRepository(db_session, identity_cache=identity_cache)
+        hits = identity_cache.stats()["hits"]
+
+        vehicles = await repo.get_by_license_plates(["known1", "UNKNOWN"])
+
+        assert list(vehicles) == ["KNOWN1"]
+        assert identity_cache.stats()["hits"] - hits == 1
+
+    async def test_uncommitted_vehicle_is_not_cached(self, test_db, init_parking_spots):
+        identity_cache = TTLCache(maxsize=100, default_ttl=600)
+        async with SQLAlchemyUnitOfWork(test_db, identity_cache=identity_cache) as uow:
+            await uow.vehicle_repo.add(Vehicle(license_plate="GHOST1", color="Red", brand="Kia"))
+            # Read back inside the transaction that inserted it, then rolled back
+            assert await uow.vehicle_repo.get_by_license_plate("GHOST1") is not None
+            await uow.rollback()
+
+        assert len(identity_cache) == 0
+
+    async def test_insert_drops_only_the_stale_entry_of_its_plate(self, test_db, init_parking_spots):
+        identity_cache = TTLCache(maxsize=100, default_ttl=600)
+        # A vehicle deleted by another process is still cached under its plate and id
+        stale = Vehicle(id=999, license_plate="REUSED1", color="Red", brand="Kia")
+        identity_cache.set(("vehicle_plate", "REUSED1"), stale)
+        identity_cache.set(("vehicle_id", 999), stale)
+        identity_cache.set(("vehicle_plate", "OTHER1"), Vehicle(id=5, license_plate="OTHER1", color="Red", brand="Kia"))
+        generation = identity_cache.generation
+
+        async with SQLAlchemyUnitOfWork(test_db, identity_cache=identity_cache) as uow:
+            await uow.vehicle_repo.add(Vehicle(license_plate="REUSED1", color="Red", brand="Kia"))
+            await uow.commit()
+
+        assert identity_cache.get(("vehicle_plate", "REUSED1")) is MISSING
+        assert identity_cache.get(("vehicle_id", 999)) is MISSING
+        assert identity_cache.get(("vehicle_plate", "OTHER1")) is not MISSING
+        # Loads in flight elsewhere are not discarded
+        assert identity_cache.generation == generation